@@ -0,0 +1,72 @@
+import asyncio
+
+from app.config import settings
+
+
+class AdmissionGate:
+    """
+    Concurrency limit with a short bounded wait queue.
+    Up to limit requests run at once and up to queue_size more wait at most
+    queue_timeout seconds for a slot; anything beyond that is turned away
+    immediately instead of piling up in front of the connection pool.
+    """
+
+    def __init__(self, limit: int, queue_size: int, queue_timeout: float) -> None:
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+
+    async def acquire(self) -> bool:
+        """Take a slot; False means the request must be rejected."""
+
+        if self._slots.locked() and self.waiting >= self.queue_size:
+            self.rejected_full += 1
+            return False
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            return False
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        self._slots.release()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected_full": self.rejected_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
+
+
+def _gate(limit: int) -> AdmissionGate:
+    return AdmissionGate(
+        limit=limit,
+        queue_size=settings.admission_queue_size,
+        queue_timeout=settings.admission_queue_timeout,
+    )
+
+
+"""Admission gates by route class, shared by the middleware and the stats endpoints"""
+gates = {
+    "read": _gate(settings.admission_read_limit),
+    "write": _gate(settings.admission_write_limit),
+}
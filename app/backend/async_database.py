@@ -1,25 +1,240 @@
-from typing import AsyncGenerator
+import asyncio
+import itertools
+import logging
+import os
+import time
+from typing import AsyncGenerator, Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+    async_sessionmaker,
+)
 
+from app.backend.pool import InstrumentedQueuePool
 from app.config import settings
 
-"""Creating an async engine for the database"""
-engine = create_async_engine(settings.async_database_url, echo=settings.db_echo)
+logger = logging.getLogger("app.database")
 
-"""Creating an async session with the engine"""
-local_session = async_sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autoflush=False,
-    autocommit=False,
-)
+"""Cookie holding the time until which a client's reads stay on the primary"""
+STICKY_COOKIE = "db_primary_until"
+
+
+def create_engine(url: str) -> AsyncEngine:
+    """Create an async engine with the pool configured from the settings."""
+
+    return create_async_engine(
+        url,
+        echo=settings.db_echo,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args={
+            # asyncpg's own cache and SQLAlchemy's adapter cache; both must be
+            # 0 behind a transaction-mode pgbouncer.
+            "statement_cache_size": settings.db_statement_cache_size,
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+        },
+    )
+
+
+def create_session_factory(bind: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        bind=bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+        autocommit=False,
+    )
+
+
+class ReplicaRouter:
+    """
+    Hands out read sessions round-robin across replicas.
+    A replica that fails to connect within connect_timeout is skipped for
+    retry_seconds; when no replica is usable, or the client asked to stay
+    sticky, the primary is used.
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker[AsyncSession],
+        replicas: list[async_sessionmaker[AsyncSession]],
+        retry_seconds: float,
+        connect_timeout: float = 0.5,
+    ) -> None:
+        self.primary = primary
+        self.replicas = replicas
+        self.retry_seconds = retry_seconds
+        self.connect_timeout = connect_timeout
+        self._down_until = [0.0] * len(replicas)
+        self._turn = itertools.count()
+
+    async def session(self, sticky: bool = False) -> AsyncSession:
+        if self.replicas and not sticky:
+            start = next(self._turn)
+            for offset in range(len(self.replicas)):
+                index = (start + offset) % len(self.replicas)
+                if self._down_until[index] > time.monotonic():
+                    continue
+
+                session = self.replicas[index]()
+                try:
+                    # Connect eagerly so a dead replica is noticed here rather
+                    # than halfway through the request, and give up quickly
+                    # on one that silently drops packets.
+                    await asyncio.wait_for(session.connection(), self.connect_timeout)
+                except (DBAPIError, OSError, asyncio.TimeoutError) as error:
+                    logger.warning(
+                        "replica %d skipped for %.0fs: %r", index, self.retry_seconds, error
+                    )
+                    await session.close()
+                    self._down_until[index] = time.monotonic() + self.retry_seconds
+                    continue
+                return session
+
+        return self.primary()
+
+
+async def _warm_up(connection: AsyncConnection) -> None:
+    await connection.start()
+    await connection.execute(text("SELECT 1"))
+
+
+class Database:
+    """
+    Owns the primary engine, its session factory and the replica router.
+    Nothing is created at import time: the lifespan opens them in each
+    worker, and a process that finds state inherited across fork() drops it
+    without closing the parent's connections and starts afresh.
+    """
+
+    def __init__(self) -> None:
+        self._pid: Optional[int] = None
+        self._engine: Optional[AsyncEngine] = None
+        self._replica_engines: list[AsyncEngine] = []
+        self._sessions: Optional[async_sessionmaker[AsyncSession]] = None
+        self._read_router: Optional[ReplicaRouter] = None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        self._ensure_open()
+        return self._engine
+
+    @property
+    def sessions(self) -> async_sessionmaker[AsyncSession]:
+        self._ensure_open()
+        return self._sessions
+
+    @property
+    def read_router(self) -> ReplicaRouter:
+        self._ensure_open()
+        return self._read_router
+
+    def _ensure_open(self) -> None:
+        if self._pid == os.getpid():
+            return
+        if self._engine is not None:
+            # Inherited from the parent process: its sockets are not ours.
+            for engine in (self._engine, *self._replica_engines):
+                engine.sync_engine.dispose(close=False)
+
+        self._engine = create_engine(settings.async_database_url)
+        self._replica_engines = [create_engine(url) for url in settings.replica_database_urls]
+        self._sessions = create_session_factory(self._engine)
+        self._read_router = ReplicaRouter(
+            primary=self._sessions,
+            replicas=[create_session_factory(engine) for engine in self._replica_engines],
+            retry_seconds=settings.db_replica_retry_seconds,
+            connect_timeout=settings.db_replica_connect_timeout,
+        )
+        self._pid = os.getpid()
+
+    async def prewarm(self, connections: int) -> None:
+        """Open up to connections per pool and run a warm-up query on each."""
+
+        self._ensure_open()
+        count = min(connections, settings.db_pool_size + settings.db_max_overflow)
+        for engine in (self._engine, *self._replica_engines):
+            opened = [engine.connect() for _ in range(count)]
+            # Held at the same time, so each one is a distinct pooled connection.
+            outcomes = await asyncio.gather(
+                *(
+                    asyncio.wait_for(_warm_up(connection), settings.db_pool_timeout)
+                    for connection in opened
+                ),
+                return_exceptions=True,
+            )
+            await asyncio.gather(
+                *(
+                    connection.close()
+                    for connection in opened
+                    if connection.sync_connection is not None
+                )
+            )
+            failures = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+            if failures:
+                logger.warning(
+                    "prewarmed %d of %d connections to %s: %r",
+                    count - len(failures),
+                    count,
+                    engine.url.render_as_string(hide_password=True),
+                    failures[0],
+                )
+
+    async def close(self) -> None:
+        """Dispose every pool; the next use opens new ones."""
+
+        if self._pid != os.getpid():
+            return
+        for engine in (self._engine, *self._replica_engines):
+            await engine.dispose()
+        self._pid = None
+        self._engine = None
+        self._replica_engines = []
+
+
+"""Engines and sessions of the current process, opened by the app lifespan"""
+db = Database()
+
+
+def _is_sticky(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_database(response: Response) -> AsyncGenerator[AsyncSession, None]:
+    """Generates an async session for the primary database, used for writes"""
+    if db.read_router.replicas:
+        # Read-your-writes: keep this client's reads on the primary for a while.
+        response.set_cookie(
+            STICKY_COOKIE,
+            str(time.time() + settings.read_your_writes_seconds),
+            max_age=max(int(settings.read_your_writes_seconds), 1),
+            httponly=True,
+        )
+    async with db.sessions() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
 
 
-async def get_database() -> AsyncGenerator[AsyncSession, None]:
-    """Generates an async session for the database"""
-    async with local_session() as session:
+async def get_read_database(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Generates an async session for reads, served by a replica when possible"""
+    session = await db.read_router.session(sticky=_is_sticky(request))
+    async with session:
         try:
             yield session
         except Exception:
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.backend.counters import answers_added
+from app.models.Answer import Answer
+
+logger = logging.getLogger("app.batcher")
+
+# deadlock_detected and serialization_failure: the transaction was rolled
+# back whole and can simply be run again.
+RETRYABLE_SQLSTATES = {"40P01", "40001"}
+
+
+def _is_retryable(error: DBAPIError) -> bool:
+    code = getattr(error.orig, "sqlstate", None) or getattr(error.orig, "pgcode", None)
+    return code in RETRYABLE_SQLSTATES
+
+
+class QuestionNotFound(LookupError):
+    """The answer's question does not exist."""
+
+
+class BatcherOverloaded(RuntimeError):
+    """No room in the queue within the enqueue timeout, or shutting down."""
+
+
+@dataclass
+class _Pending:
+    values: dict[str, Any]
+    future: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+
+
+class AnswerBatcher:
+    """
+    Write-behind queue for answer inserts with group commit.
+    Answers are collected until max_items are waiting or max_delay seconds
+    have passed since the first one, then written as one multi-row INSERT in
+    one transaction. Every caller awaits its own row, so a request still gets
+    its 201 only after the commit. At most queue_size answers wait at a time;
+    further callers wait up to enqueue_timeout for room and are then refused.
+    """
+
+    def __init__(
+        self,
+        sessions: async_sessionmaker[AsyncSession],
+        max_items: int = 100,
+        max_delay: float = 0.005,
+        queue_size: int = 1000,
+        enqueue_timeout: float = 1.0,
+    ) -> None:
+        self.sessions = sessions
+        self.max_items = max_items
+        self.max_delay = max_delay
+        self.enqueue_timeout = enqueue_timeout
+        self._slots = asyncio.Semaphore(queue_size)
+        self._queue: asyncio.Queue[Optional[_Pending]] = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="answer-batcher")
+
+    async def stop(self) -> None:
+        """Refuse new answers and write everything already queued."""
+
+        self._closing = True
+        self._queue.put_nowait(None)
+        if self._task is not None:
+            await self._task
+
+    async def submit(self, values: dict[str, Any]) -> Answer:
+        """Queue one answer and wait until it is committed."""
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            raise BatcherOverloaded("Answer queue is full")
+
+        try:
+            # No await between the check and the put: nothing can be queued
+            # behind the shutdown marker.
+            if self._closing:
+                raise BatcherOverloaded("Answer queue is shutting down")
+            pending = _Pending(values)
+            self._queue.put_nowait(pending)
+            return await pending.future
+        finally:
+            self._slots.release()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            deadline = loop.time() + self.max_delay
+            stopping = False
+            while len(batch) < self.max_items:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if pending is None:
+                    stopping = True
+                    break
+                batch.append(pending)
+
+            await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, batch: list[_Pending]) -> None:
+        try:
+            try:
+                answers = await self._write_batch(batch)
+            except DBAPIError as error:
+                if not _is_retryable(error):
+                    raise
+                logger.warning("retrying a batch of %d answers after %r", len(batch), error.orig)
+                answers = await self._write_batch(batch)
+        except Exception as error:
+            logger.exception("writing a batch of %d answers failed", len(batch))
+            answers = [error] * len(batch)
+
+        for pending, answer in zip(batch, answers):
+            if pending.future.done():
+                continue  # the caller went away; the answer is stored anyway
+            if isinstance(answer, Exception):
+                pending.future.set_exception(answer)
+            else:
+                pending.future.set_result(answer)
+
+    async def _write_batch(self, batch: list[_Pending]) -> list[Answer | Exception]:
+        async with self.sessions() as database:
+            return await self._write(database, batch)
+
+    async def _write(
+        self, database: AsyncSession, batch: list[_Pending]
+    ) -> list[Answer | Exception]:
+        by_question: dict[int, list[_Pending]] = defaultdict(list)
+        for pending in batch:
+            by_question[pending.values["question_id"]].append(pending)
+
+        # One counter update per question, which is also its existence check;
+        # a spike on a popular question is a single UPDATE. Questions are
+        # locked in id order, so batches of different workers cannot deadlock.
+        found = set()
+        for question_id, pendings in sorted(by_question.items()):
+            latest = max(pending.values["created_at"] for pending in pendings)
+            if await database.scalar(answers_added(question_id, len(pendings), latest)):
+                found.add(question_id)
+
+        accepted = [pending for pending in batch if pending.values["question_id"] in found]
+        created = iter([])
+        if accepted:
+            created = iter(
+                (
+                    await database.scalars(
+                        insert(Answer).returning(Answer, sort_by_parameter_order=True),
+                        [pending.values for pending in accepted],
+                    )
+                ).all()
+            )
+        await database.commit()
+
+        return [
+            next(created)
+            if pending.values["question_id"] in found
+            else QuestionNotFound(pending.values["question_id"])
+            for pending in batch
+        ]
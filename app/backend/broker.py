@@ -0,0 +1,282 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Callable, Iterator, Optional
+
+import asyncpg
+
+from app.config import settings
+
+logger = logging.getLogger("app.broker")
+
+_CONNECT_ERRORS = (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError)
+
+
+class Subscription:
+    """
+    Messages of one channel for one subscriber, buffered up to size.
+    A subscriber that falls further behind is closed rather than allowed to
+    hold memory or slow the publisher; it is expected to reconnect and catch
+    up from the database.
+    """
+
+    def __init__(self, size: int, on_close: Callable[["Subscription"], None]) -> None:
+        self._queue: asyncio.Queue[Optional[str]] = asyncio.Queue(size + 1)
+        self._size = size
+        self._on_close = on_close
+        self.closed = False
+        self.overflowed = False
+
+    def deliver(self, message: str) -> None:
+        if self.closed:
+            return
+        if self._queue.qsize() >= self._size:
+            self.overflowed = True
+            self.close()
+            return
+        self._queue.put_nowait(message)
+
+    def close(self) -> None:
+        """End the subscription and unsubscribe; buffered messages are dropped."""
+
+        if self.closed:
+            return
+        self.closed = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+        self._on_close(self)
+
+    async def get(self, timeout: float) -> Optional[str]:
+        """
+        The next message, or None once the subscription is closed.
+        Raises asyncio.TimeoutError when nothing arrives within timeout.
+        """
+
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+
+class Broker(ABC):
+    """
+    Publish/subscribe of short text messages on named channels.
+    Subscribers are always local to the process; an implementation decides
+    how a published message reaches the subscribers of every process.
+    """
+
+    # Largest message the transport carries, if it has a limit.
+    max_message_bytes: Optional[int] = None
+
+    def __init__(self, buffer_size: int) -> None:
+        self.buffer_size = buffer_size
+        self.dropped = 0
+        self._subscribers: dict[str, set[Subscription]] = {}
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        self.disconnect_all()
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str, wait: bool = False) -> None:
+        """
+        Send message to the subscribers of channel in every process. A
+        transport that queues may drop the message when full; with wait
+        the caller waits for room instead.
+        """
+
+    def subscribe(self, channel: str) -> Subscription:
+        """Start buffering the messages of channel; the caller must close it."""
+
+        def unsubscribe(subscription: Subscription) -> None:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+        subscription = Subscription(self.buffer_size, unsubscribe)
+        self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def disconnect_all(self) -> None:
+        """Close every subscription, e.g. so clients move to another instance."""
+
+        for subscribers in tuple(self._subscribers.values()):
+            for subscription in tuple(subscribers):
+                subscription.close()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "channels": len(self._subscribers),
+            "subscribers": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "dropped": self.dropped,
+        }
+
+    def _fan_out(self, channel: str, message: str) -> None:
+        for subscription in tuple(self._subscribers.get(channel, ())):
+            subscription.deliver(message)
+            if subscription.overflowed:
+                self.dropped += 1
+                logger.info("dropped a slow subscriber of %s", channel)
+
+
+class InMemoryBroker(Broker):
+    """Delivers messages to the subscribers of this process only."""
+
+    async def publish(self, channel: str, message: str, wait: bool = False) -> None:
+        self._fan_out(channel, message)
+
+
+class PostgresBroker(Broker):
+    """
+    Carries messages between processes with LISTEN/NOTIFY.
+    Every process keeps one dedicated connection listening on a single
+    PostgreSQL channel; the broker channel travels in the payload, so the
+    number of LISTENs does not grow with the number of subscribed channels.
+    Publishing only queues the message: one sender task issues the NOTIFYs,
+    so requests never wait on the broker connection, and packs the queued
+    messages into as few payloads as fit, so a burst costs few NOTIFYs. If
+    the connection is lost every subscription is closed, since messages may
+    have been missed, and the broker reconnects in the background.
+    """
+
+    # NOTIFY payloads must be shorter than 8000 bytes; a message leaves
+    # room for its channel and framing.
+    max_message_bytes = 7900
+    max_payload_bytes = 7999
+
+    def __init__(
+        self,
+        dsn: str,
+        buffer_size: int,
+        outbox_size: int = 10_000,
+        pg_channel: str = "app_events",
+    ) -> None:
+        super().__init__(buffer_size)
+        self.dsn = dsn
+        self.pg_channel = pg_channel
+        self._outbox: asyncio.Queue[str] = asyncio.Queue(outbox_size)
+        self._connection: Optional[asyncpg.Connection] = None
+        self._connecting = asyncio.Lock()
+        self._tasks: list[asyncio.Task] = []
+        self._stopping = False
+
+    async def start(self) -> None:
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._keep_connected(), name="broker-listen"),
+            asyncio.create_task(self._send(), name="broker-notify"),
+        ]
+
+    async def stop(self, flush_timeout: float = 5.0) -> None:
+        """Send what is still queued, for up to flush_timeout, then disconnect."""
+
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self._outbox.join(), flush_timeout)
+            except asyncio.TimeoutError:
+                logger.warning("event broker stopped with %d messages unsent", self._outbox.qsize())
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            await connection.close()
+        await super().stop()
+
+    async def publish(self, channel: str, message: str, wait: bool = False) -> None:
+        if wait:
+            await self._outbox.put(f"{channel}\n{message}")
+            return
+        try:
+            self._outbox.put_nowait(f"{channel}\n{message}")
+        except asyncio.QueueFull:
+            logger.warning("event broker outbox is full, dropped a message for %s", channel)
+
+    async def _ensure_connected(self) -> asyncpg.Connection:
+        async with self._connecting:
+            if self._connection is None or self._connection.is_closed():
+                connection = await asyncpg.connect(self.dsn, timeout=settings.db_pool_timeout)
+                await connection.add_listener(self.pg_channel, self._on_notify)
+                connection.add_termination_listener(self._on_terminate)
+                self._connection = connection
+            return self._connection
+
+    async def _keep_connected(self) -> None:
+        delay = 1.0
+        while not self._stopping:
+            try:
+                await self._ensure_connected()
+                delay = 1.0
+            except _CONNECT_ERRORS as error:
+                logger.warning("event broker could not connect: %r", error)
+                delay = min(delay * 2, 30.0)
+            await asyncio.sleep(delay)
+
+    async def _send(self) -> None:
+        carried: Optional[str] = None
+        while True:
+            item = carried if carried is not None else await self._outbox.get()
+            carried = None
+            records = [_frame(item)]
+            size = len(records[0].encode())
+            while not self._outbox.empty():
+                item = self._outbox.get_nowait()
+                record = _frame(item)
+                if size + len(record.encode()) > self.max_payload_bytes:
+                    carried = item
+                    break
+                records.append(record)
+                size += len(record.encode())
+            try:
+                connection = await self._ensure_connected()
+                await connection.execute(
+                    "SELECT pg_notify($1, $2)", self.pg_channel, "".join(records)
+                )
+            except _CONNECT_ERRORS as error:
+                logger.warning("event broker could not publish %d messages: %r", len(records), error)
+            finally:
+                for _ in records:
+                    self._outbox.task_done()
+
+    def _on_notify(self, connection, pid: int, pg_channel: str, payload: str) -> None:
+        for item in _unframe(payload):
+            channel, _, message = item.partition("\n")
+            self._fan_out(channel, message)
+
+    def _on_terminate(self, connection) -> None:
+        if self._stopping:
+            return
+        logger.warning("event broker connection lost")
+        self._connection = None
+        self.disconnect_all()
+
+
+def _frame(item: str) -> str:
+    # Payloads are "<length>\n<channel>\n<message>" records back to back;
+    # the length counts characters of the channel and message.
+    return f"{len(item)}\n{item}"
+
+
+def _unframe(payload: str) -> Iterator[str]:
+    position = 0
+    while position < len(payload):
+        newline = payload.index("\n", position)
+        end = newline + 1 + int(payload[position:newline])
+        yield payload[newline + 1 : end]
+        position = end
+
+
+def create_broker() -> Broker:
+    """Build the event broker described by the settings."""
+
+    if settings.event_broker == "postgres":
+        return PostgresBroker(settings.listen_database_url, settings.event_buffer_size)
+    return InMemoryBroker(settings.event_buffer_size)
+
+
+"""Event broker shared by the routers, started by the app lifespan"""
+broker = create_broker()
@@ -0,0 +1,303 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from app.backend.broker import Broker, broker
+from app.config import settings
+
+logger = logging.getLogger("app.cache")
+
+# Broker channel that carries invalidations between workers.
+INVALIDATION_CHANNEL = "cache-invalidations"
+
+
+def question_key(question_id: int) -> str:
+    return f"question:{question_id}"
+
+
+def answer_key(answer_id: int) -> str:
+    return f"answer:{answer_id}"
+
+
+class CacheBackend(ABC):
+    """
+    Interface for the read-through cache of serialized responses.
+    Values are opaque bytes, so an implementation may live in an external store.
+    Tags group keys that must be invalidated together.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, tags: Iterable[str] = ()) -> None: ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None: ...
+
+    @abstractmethod
+    async def delete_tag(self, *tags: str) -> None: ...
+
+    @abstractmethod
+    async def clear(self) -> None: ...
+
+    @abstractmethod
+    def stats(self) -> dict[str, int]: ...
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class NullCache(CacheBackend):
+    """Backend used when caching is disabled: every lookup is a miss."""
+
+    def __init__(self) -> None:
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: bytes, tags: Iterable[str] = ()) -> None:
+        pass
+
+    async def delete(self, *keys: str) -> None:
+        pass
+
+    async def delete_tag(self, *tags: str) -> None:
+        pass
+
+    async def clear(self) -> None:
+        pass
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": 0, "misses": self.misses, "evictions": 0, "entries": 0, "bytes": 0}
+
+
+class LRUTTLCache(CacheBackend):
+    """
+    In-process cache bounded by entry count and total payload size.
+    Least recently used entries are evicted first; entries older than ttl
+    are treated as misses. For settle seconds after an invalidation, writes
+    to the same key or tag are ignored, so a lagging read replica cannot put
+    the old payload back.
+    """
+
+    def __init__(
+        self, max_entries: int, max_bytes: int, ttl: float, settle: float = 0.0
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.settle = settle
+        self._entries: OrderedDict[str, tuple[float, bytes, tuple[str, ...]]] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        # Every tombstone lasts settle seconds, so in insertion order the
+        # oldest expire first; at most max_entries are kept.
+        self._tombstones: OrderedDict[str, float] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    async def set(self, key: str, value: bytes, tags: Iterable[str] = ()) -> None:
+        tags = tuple(tags)
+        if len(value) > self.max_bytes or self._settling(key, *tags):
+            return
+
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, value, tags)
+        self._bytes += len(value)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._remove(key)
+            self._tombstone(key)
+
+    async def delete_tag(self, *tags: str) -> None:
+        for tag in tags:
+            for key in self._tags.pop(tag, set()):
+                self._remove(key)
+            self._tombstone(tag)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+        self._tombstones.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    def _tombstone(self, name: str) -> None:
+        if self.settle <= 0:
+            return
+
+        now = time.monotonic()
+        while self._tombstones and next(iter(self._tombstones.values())) <= now:
+            self._tombstones.popitem(last=False)
+        self._tombstones[name] = now + self.settle
+        self._tombstones.move_to_end(name)
+        if len(self._tombstones) > self.max_entries:
+            self._tombstones.popitem(last=False)
+
+    def _settling(self, *names: str) -> bool:
+        if not self._tombstones:
+            return False
+
+        now = time.monotonic()
+        return any(self._tombstones.get(name, 0.0) > now for name in names)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        self._bytes -= len(entry[1])
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class BroadcastCache(CacheBackend):
+    """
+    Per-process cache whose invalidations reach every worker through the
+    event broker. A delete applies here at once and is published; the
+    listener started by start() applies those of the other workers. If the
+    subscription is lost, invalidations may have been missed, so the local
+    entries are dropped before subscribing again.
+    """
+
+    def __init__(self, local: CacheBackend, broker: Broker) -> None:
+        self.local = local
+        self.broker = broker
+        self._task: Optional[asyncio.Task] = None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.local.get(key)
+
+    async def set(self, key: str, value: bytes, tags: Iterable[str] = ()) -> None:
+        await self.local.set(key, value, tags)
+
+    async def delete(self, *keys: str) -> None:
+        await self.local.delete(*keys)
+        await self._publish("keys", keys)
+
+    async def delete_tag(self, *tags: str) -> None:
+        await self.local.delete_tag(*tags)
+        await self._publish("tag", tags)
+
+    async def clear(self) -> None:
+        await self.local.clear()
+
+    def stats(self) -> dict[str, int]:
+        return self.local.stats()
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._listen(), name="cache-invalidations")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _listen(self) -> None:
+        while True:
+            subscription = self.broker.subscribe(INVALIDATION_CHANNEL)
+            try:
+                while (message := await self._next(subscription)) is not None:
+                    kind, *names = message.split("\n")
+                    # Our own invalidations come back too; applying them
+                    # again only renews their tombstones.
+                    if kind == "tag":
+                        await self.local.delete_tag(*names)
+                    else:
+                        await self.local.delete(*names)
+            finally:
+                subscription.close()
+            logger.warning("cache invalidations may have been missed, clearing the cache")
+            await self.local.clear()
+            await asyncio.sleep(1.0)
+
+    async def _publish(self, kind: str, names: Iterable[str]) -> None:
+        # As few messages as fit the broker's transport. A lost invalidation
+        # would leave other workers serving stale data, so publishing waits
+        # for room rather than dropping it.
+        limit = self.broker.max_message_bytes
+        message = [kind]
+        size = len(kind)
+        for name in names:
+            if limit and len(message) > 1 and size + 1 + len(name) > limit:
+                await self.broker.publish(INVALIDATION_CHANNEL, "\n".join(message), wait=True)
+                message, size = [kind], len(kind)
+            message.append(name)
+            size += 1 + len(name)
+        if len(message) > 1:
+            await self.broker.publish(INVALIDATION_CHANNEL, "\n".join(message), wait=True)
+
+    @staticmethod
+    async def _next(subscription) -> Optional[str]:
+        while True:
+            try:
+                return await subscription.get(timeout=3600)
+            except asyncio.TimeoutError:
+                continue
+
+
+def create_cache() -> CacheBackend:
+    """Build the cache backend described by the settings."""
+
+    if not settings.cache_enabled:
+        return NullCache()
+    local = LRUTTLCache(
+        max_entries=settings.cache_max_entries,
+        max_bytes=settings.cache_max_bytes,
+        ttl=settings.cache_ttl_seconds,
+        # A read that started before a write must not cache its old result,
+        # and replicas may serve pre-write data for as long as reads stay sticky.
+        settle=max(
+            settings.cache_settle_seconds,
+            settings.read_your_writes_seconds if settings.replica_database_urls else 0.0,
+        ),
+    )
+    if settings.event_broker == "postgres":
+        return BroadcastCache(local, broker)
+    return local
+
+
+"""Response cache shared by the routers"""
+cache = create_cache()
@@ -0,0 +1,151 @@
+import asyncio
+import gzip
+import time
+from typing import Callable, Iterable, Optional
+
+from app.backend.cache import CacheBackend, LRUTTLCache
+from app.config import settings
+
+try:
+    import zstandard
+except ImportError:  # optional: zstd is offered only when installed
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # optional: br is offered only when installed
+    brotli = None
+
+# Bodies this large are compressed in a worker thread; zlib, zstd and brotli
+# release the GIL, so the event loop keeps serving meanwhile.
+OFFLOAD_BYTES = 64 * 1024
+
+
+def available_codecs(
+    gzip_level: int, zstd_level: int, brotli_level: int
+) -> dict[str, Callable[[bytes], bytes]]:
+    """Content codings this process can produce, most preferred first."""
+
+    codecs: dict[str, Callable[[bytes], bytes]] = {}
+    if zstandard is not None:
+        codecs["zstd"] = lambda body: zstandard.ZstdCompressor(level=zstd_level).compress(body)
+    if brotli is not None:
+        codecs["br"] = lambda body: brotli.compress(body, quality=brotli_level)
+    # mtime=0 keeps the output a function of the body alone.
+    codecs["gzip"] = lambda body: gzip.compress(body, compresslevel=gzip_level, mtime=0)
+    return codecs
+
+
+def negotiate(accept_encoding: str, codings: Iterable[str]) -> Optional[str]:
+    """
+    Pick a content coding for an Accept-Encoding header: the highest q value
+    wins and ties go to the earlier of codings. None means identity.
+    """
+
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, parameters = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for parameter in parameters.split(";"):
+            name, _, value = parameter.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights["gzip" if coding == "x-gzip" else coding] = weight
+
+    best, best_weight = None, 0.0
+    for coding in codings:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    if best_weight < weights.get("identity", 0.0):
+        return None
+    return best
+
+
+class Compressor:
+    """
+    Compresses response bodies for CompressionMiddleware.
+    A body sent with an ETag is compressed once per coding and kept under
+    that ETag, which changes whenever the body does; a hot question is then
+    served from the cache until its next answer.
+    """
+
+    def __init__(
+        self,
+        codecs: dict[str, Callable[[bytes], bytes]],
+        cache: CacheBackend,
+        min_bytes: int,
+    ) -> None:
+        self.codecs = codecs
+        self.cache = cache
+        self.min_bytes = min_bytes
+        self.responses = 0
+        self.compressions = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.compress_seconds = 0.0
+
+    async def compress(self, coding: str, body: bytes, etag: Optional[str] = None) -> bytes:
+        # ETags of this app name their resource ("q12-...", "a7-..."), so
+        # they are unique across routes and need no path in the key.
+        key = f"{coding}:{etag}" if etag else None
+        compressed = await self.cache.get(key) if key else None
+
+        if compressed is None:
+            codec = self.codecs[coding]
+            started = time.perf_counter()
+            if len(body) >= OFFLOAD_BYTES:
+                compressed = await asyncio.to_thread(codec, body)
+            else:
+                compressed = codec(body)
+            self.compress_seconds += time.perf_counter() - started
+            self.compressions += 1
+            if key:
+                await self.cache.set(key, compressed)
+
+        self.responses += 1
+        self.bytes_in += len(body)
+        self.bytes_out += len(compressed)
+        return compressed
+
+    def stats(self) -> dict[str, float]:
+        cache = self.cache.stats()
+        return {
+            "responses": self.responses,
+            "compressions": self.compressions,
+            "cache_hits": cache["hits"],
+            "cache_entries": cache["entries"],
+            "cache_bytes": cache["bytes"],
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved": self.bytes_in - self.bytes_out,
+            "compress_ms": round(self.compress_seconds * 1000, 3),
+        }
+
+
+def create_compressor() -> Compressor:
+    """Build the response compressor described by the settings."""
+
+    return Compressor(
+        available_codecs(
+            settings.compression_gzip_level,
+            settings.compression_zstd_level,
+            settings.compression_brotli_level,
+        ),
+        LRUTTLCache(
+            max_entries=settings.compression_cache_max_entries,
+            max_bytes=settings.compression_cache_max_bytes,
+            ttl=settings.compression_cache_ttl_seconds,
+        ),
+        min_bytes=settings.compression_min_bytes,
+    )
+
+
+"""Compresses responses for CompressionMiddleware, caching bodies by ETag"""
+compressor = create_compressor()
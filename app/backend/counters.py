@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from sqlalchemy import Update, bindparam, case, func, or_, select, update
+
+from app.models.Answer import Answer
+from app.models.Question import Question
+
+
+def answers_added(question_id: int, count: int, created_at: datetime) -> Update:
+    """
+    Count new answers on their question. Returns the question id, so the
+    statement doubles as the existence check and locks the row until commit.
+    """
+
+    return (
+        update(Question)
+        .where(Question.id == question_id)
+        .values(
+            answer_count=Question.answer_count + count,
+            last_answer_at=case(
+                (
+                    or_(
+                        Question.last_answer_at.is_(None),
+                        Question.last_answer_at < created_at,
+                    ),
+                    created_at,
+                ),
+                else_=Question.last_answer_at,
+            ),
+        )
+        .returning(Question.id)
+    )
+
+
+def answer_removed(question_id: int, created_at: datetime) -> Update:
+    """Uncount a deleted answer, looking for the new latest one only if needed."""
+
+    latest = (
+        select(func.max(Answer.created_at))
+        .where(Answer.question_id == question_id)
+        .scalar_subquery()
+    )
+    return (
+        update(Question)
+        .where(Question.id == question_id)
+        .values(
+            answer_count=Question.answer_count - 1,
+            last_answer_at=case(
+                (Question.last_answer_at <= created_at, latest),
+                else_=Question.last_answer_at,
+            ),
+        )
+    )
+
+
+def answers_removed() -> Update:
+    """
+    Uncount answers deleted in bulk. Executed with one parameter set per
+    question: question_id, removed (how many) and newest_removed (the latest
+    created_at among them).
+    """
+
+    questions = Question.__table__
+    latest = (
+        select(func.max(Answer.created_at))
+        .where(Answer.question_id == bindparam("question_id"))
+        .scalar_subquery()
+    )
+    return (
+        update(questions)
+        .where(questions.c.id == bindparam("question_id"))
+        .values(
+            answer_count=questions.c.answer_count - bindparam("removed"),
+            last_answer_at=case(
+                (questions.c.last_answer_at <= bindparam("newest_removed"), latest),
+                else_=questions.c.last_answer_at,
+            ),
+        )
+    )
@@ -0,0 +1,29 @@
+from sqlalchemy import any_, literal
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def dialect_insert(database: AsyncSession, model):
+    """
+    Build an INSERT for the session's dialect, so ON CONFLICT clauses are
+    available on both PostgreSQL and the SQLite test engine.
+    """
+
+    dialect = database.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"ON CONFLICT is not supported for {dialect}")
+
+
+def id_in(database: AsyncSession, column, ids: list[int]):
+    """
+    column IN ids. On PostgreSQL this is column = ANY(:ids) with a single
+    array parameter, so the statement, and its prepared plan, stay the same
+    however many ids are asked for.
+    """
+
+    if database.get_bind().dialect.name == "postgresql":
+        return column == any_(literal(ids, postgresql.ARRAY(column.type)))
+    return column.in_(ids)
@@ -0,0 +1,273 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.backend.async_database import db
+from app.backend.dialects import dialect_insert
+from app.config import settings
+from app.models.IdempotencyKey import IdempotencyKey
+
+
+@dataclass
+class StoredResponse:
+    """What is replayed for a completed request."""
+
+    status_code: int
+    headers: list[tuple[str, str]]
+    body: bytes
+
+
+class KeyState(str, Enum):
+    """Outcome of claiming an idempotency key."""
+
+    acquired = "acquired"  # the caller runs the request, then completes or releases
+    in_progress = "in_progress"
+    completed = "completed"
+    mismatch = "mismatch"  # the key was used for a different request
+
+
+@dataclass
+class KeyStatus:
+    state: KeyState
+    response: Optional[StoredResponse] = None
+
+
+class IdempotencyStore(ABC):
+    """
+    Interface for the idempotency key store.
+    A key is claimed by the first request that presents it and held for
+    lock_seconds; once the response is stored it is replayed for ttl
+    seconds. A key whose holder neither completed nor released it in time
+    can be claimed again.
+    """
+
+    def __init__(self, ttl: float, lock_seconds: float) -> None:
+        self.ttl = ttl
+        self.lock_seconds = lock_seconds
+
+    @abstractmethod
+    async def claim(self, key: str, fingerprint: str) -> KeyStatus: ...
+
+    @abstractmethod
+    async def complete(self, key: str, response: StoredResponse) -> None: ...
+
+    @abstractmethod
+    async def release(self, key: str) -> None: ...
+
+    async def wait(self, key: str, fingerprint: str, timeout: float) -> KeyStatus:
+        """Claim the key, waiting up to timeout while another request holds it."""
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = 0.01
+        while True:
+            status = await self.claim(key, fingerprint)
+            remaining = deadline - loop.time()
+            if status.state != KeyState.in_progress or remaining <= 0:
+                return status
+            await self._changed(key, min(delay, remaining))
+            delay = min(delay * 2, 0.2)
+
+    async def _changed(self, key: str, timeout: float) -> None:
+        """Return once the key may have changed state, or after timeout."""
+
+        await asyncio.sleep(timeout)
+
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    expires_at: float
+    response: Optional[StoredResponse] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """
+    Keys held in this process, for single-node deployments. Bounded by
+    entry count; the oldest keys are forgotten first.
+    """
+
+    def __init__(self, ttl: float, lock_seconds: float, max_entries: int) -> None:
+        super().__init__(ttl, lock_seconds)
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+
+    async def claim(self, key: str, fingerprint: str) -> KeyStatus:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= now:
+            if entry is not None:
+                entry.done.set()
+            self._entries[key] = _Entry(fingerprint, now + self.lock_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                evicted.done.set()
+            return KeyStatus(KeyState.acquired)
+
+        if entry.fingerprint != fingerprint:
+            return KeyStatus(KeyState.mismatch)
+        if entry.response is None:
+            return KeyStatus(KeyState.in_progress)
+        return KeyStatus(KeyState.completed, entry.response)
+
+    async def complete(self, key: str, response: StoredResponse) -> None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry.response = response
+        entry.expires_at = time.monotonic() + self.ttl
+        entry.done.set()
+
+    async def release(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry.done.set()
+
+    async def _changed(self, key: str, timeout: float) -> None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        try:
+            await asyncio.wait_for(entry.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    """
+    Keys in the idempotency_keys table, shared by every worker and node.
+    Each call is one short transaction of its own, never the request's.
+    Every purge_every claims, up to purge_batch expired rows are deleted.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        lock_seconds: float,
+        sessions: Optional[async_sessionmaker[AsyncSession]] = None,
+        purge_every: int = 100,
+        purge_batch: int = 100,
+    ) -> None:
+        super().__init__(ttl, lock_seconds)
+        self._sessions = sessions
+        self.purge_every = purge_every
+        self.purge_batch = purge_batch
+        self._claims = 0
+
+    @property
+    def sessions(self) -> async_sessionmaker[AsyncSession]:
+        return self._sessions or db.sessions
+
+    async def claim(self, key: str, fingerprint: str) -> KeyStatus:
+        now = datetime.now(timezone.utc)
+        held_until = now + timedelta(seconds=self.lock_seconds)
+        async with self.sessions() as database:
+            claimed = await database.scalar(
+                dialect_insert(database, IdempotencyKey)
+                .values(key=key, fingerprint=fingerprint, expires_at=held_until, created_at=now)
+                .on_conflict_do_nothing(index_elements=[IdempotencyKey.key])
+                .returning(IdempotencyKey.id)
+            )
+            if claimed is None:
+                # An abandoned claim or an expired response: start over.
+                claimed = await database.scalar(
+                    update(IdempotencyKey)
+                    .where(IdempotencyKey.key == key, IdempotencyKey.expires_at <= now)
+                    .values(
+                        fingerprint=fingerprint,
+                        status_code=None,
+                        headers=None,
+                        body=None,
+                        expires_at=held_until,
+                    )
+                    .returning(IdempotencyKey.id)
+                )
+            if claimed is not None:
+                self._claims += 1
+                if self._claims % self.purge_every == 0:
+                    await self._purge(database, now)
+                await database.commit()
+                return KeyStatus(KeyState.acquired)
+
+            row = (
+                await database.execute(
+                    select(
+                        IdempotencyKey.fingerprint,
+                        IdempotencyKey.status_code,
+                        IdempotencyKey.headers,
+                        IdempotencyKey.body,
+                    ).where(IdempotencyKey.key == key)
+                )
+            ).one_or_none()
+
+        if row is None:
+            # Released between the two statements; the next claim decides.
+            return KeyStatus(KeyState.in_progress)
+        if row.fingerprint != fingerprint:
+            return KeyStatus(KeyState.mismatch)
+        if row.status_code is None:
+            return KeyStatus(KeyState.in_progress)
+        return KeyStatus(
+            KeyState.completed,
+            StoredResponse(row.status_code, [tuple(header) for header in row.headers], row.body),
+        )
+
+    async def complete(self, key: str, response: StoredResponse) -> None:
+        async with self.sessions() as database:
+            await database.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.key == key)
+                .values(
+                    status_code=response.status_code,
+                    headers=[list(header) for header in response.headers],
+                    body=response.body,
+                    expires_at=datetime.now(timezone.utc) + timedelta(seconds=self.ttl),
+                )
+            )
+            await database.commit()
+
+    async def release(self, key: str) -> None:
+        async with self.sessions() as database:
+            await database.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None)
+                )
+            )
+            await database.commit()
+
+    async def _purge(self, database: AsyncSession, now: datetime) -> None:
+        expired = (
+            select(IdempotencyKey.id)
+            .where(IdempotencyKey.expires_at < now)
+            .limit(self.purge_batch)
+        )
+        await database.execute(delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired)))
+
+
+def create_idempotency_store() -> IdempotencyStore:
+    """Build the idempotency key store described by the settings."""
+
+    if settings.idempotency_store == "database":
+        return DatabaseIdempotencyStore(
+            ttl=settings.idempotency_ttl_seconds,
+            lock_seconds=settings.idempotency_lock_seconds,
+        )
+    return InMemoryIdempotencyStore(
+        ttl=settings.idempotency_ttl_seconds,
+        lock_seconds=settings.idempotency_lock_seconds,
+        max_entries=settings.idempotency_max_entries,
+    )
+
+
+"""Idempotency keys of POST requests, used by IdempotencyMiddleware"""
+idempotency_store = create_idempotency_store()
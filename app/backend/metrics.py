@@ -0,0 +1,367 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Callable, Optional
+
+from app.backend.admission import gates
+from app.backend.async_database import db
+from app.backend.pool import pool_status
+from app.config import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[str, ...]
+
+logger = logging.getLogger("app.metrics")
+
+if sys.platform != "win32":
+    import fcntl
+else:  # no flock: snapshots of exited workers are then kept as they are
+    fcntl = None
+
+# Counters and histograms of exited workers, folded into one file.
+EXITED_SNAPSHOT = "exited.json"
+
+
+class Metric:
+    """A named family of samples keyed by label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Labels = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values: dict[Labels, object] = {}
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def set_total(self, labels: Labels, value: float) -> None:
+        """Mirror a counter that is kept elsewhere, e.g. by the pool."""
+        self.values[labels] = value
+
+
+class Gauge(Metric):
+    """Gauges describe live process state and are dropped for dead workers."""
+
+    kind = "gauge"
+
+    def set(self, labels: Labels, value: float) -> None:
+        self.values[labels] = value
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def dec(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Labels = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def observe(self, labels: Labels, value: float) -> None:
+        # Per-bucket (non-cumulative) counts, then sum and count.
+        sample = self.values.get(labels)
+        if sample is None:
+            sample = self.values[labels] = [0.0] * (len(self.buckets) + 2)
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                sample[index] += 1
+                break
+        sample[-2] += value
+        sample[-1] += 1
+
+
+class MetricsRegistry:
+    """
+    Process-local registry with Prometheus text exposition.
+    With a directory configured, every worker writes its snapshot there from
+    a background task started by start(), off the request path, and a scrape
+    on any worker merges all of them: counters
+    and histograms are summed, gauges only over workers that are still alive.
+    Snapshots of exited workers are folded into one file and removed, so the
+    directory does not grow as workers are recycled.
+    """
+
+    def __init__(self, directory: Optional[str] = None, flush_interval: float = 1.0) -> None:
+        self.directory = Path(directory) if directory else None
+        self.flush_interval = flush_interval
+        self.metrics: dict[str, Metric] = {}
+        self.collectors: list[Callable[[], None]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Labels = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Labels = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Labels = ()) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Register a callback that refreshes metrics right before a snapshot."""
+        self.collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        for collector in self.collectors:
+            collector()
+        return {
+            "pid": os.getpid(),
+            "metrics": {
+                name: [[list(labels), value] for labels, value in metric.values.items()]
+                for name, metric in self.metrics.items()
+            },
+        }
+
+    async def start(self) -> None:
+        if self.directory is not None:
+            self._task = asyncio.create_task(self._flush_periodically(), name="metrics-flush")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        # The last requests of this worker still count once it has exited.
+        await asyncio.to_thread(self._write, self.snapshot())
+
+    def flush(self) -> None:
+        if self.directory is not None:
+            self._write(self.snapshot())
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            # The snapshot is taken on the loop, which owns the samples; only
+            # the file is written in a thread.
+            try:
+                await asyncio.to_thread(self._write, self.snapshot())
+            except OSError as error:
+                logger.warning("could not write the metrics snapshot: %r", error)
+
+    def _write(self, snapshot: dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{os.getpid()}.json"
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(snapshot))
+        os.replace(temporary, path)
+
+    def render(self) -> str:
+        if self.directory is None:
+            merged = self._merge([self.snapshot()])
+        else:
+            self.flush()
+            self._fold_exited()
+            merged = self._merge(self._read_snapshots())
+
+        lines: list[str] = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for labels, value in sorted(merged.get(name, {}).items()):
+                pairs = list(zip(metric.labelnames, labels))
+                if isinstance(metric, Histogram):
+                    lines.extend(_histogram_lines(metric, pairs, value))
+                else:
+                    lines.append(f"{name}{_format_labels(pairs)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def _read_snapshots(self) -> list[dict]:
+        snapshots = []
+        for path in self.directory.glob("*.json"):
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def _fold_exited(self) -> None:
+        if fcntl is None:
+            return
+
+        with open(self.directory / "fold.lock", "w") as lock:
+            # One worker at a time, or two could fold the same snapshot twice.
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                exited_path = self.directory / EXITED_SNAPSHOT
+                exited = []
+                for path in self.directory.glob("*.json"):
+                    if path.name == EXITED_SNAPSHOT or not path.stem.isdigit():
+                        continue
+                    if not _is_alive(int(path.stem)):
+                        try:
+                            exited.append((path, json.loads(path.read_text())))
+                        except (OSError, ValueError):
+                            continue
+                if not exited:
+                    return
+
+                snapshots = [snapshot for _, snapshot in exited]
+                if exited_path.exists():
+                    snapshots.append(json.loads(exited_path.read_text()))
+                merged = self._merge(snapshots)
+                folded = {
+                    "pid": None,
+                    "metrics": {
+                        name: [[list(labels), value] for labels, value in samples.items()]
+                        for name, samples in merged.items()
+                    },
+                }
+                temporary = exited_path.with_suffix(".tmp")
+                temporary.write_text(json.dumps(folded))
+                os.replace(temporary, exited_path)
+                for path, _ in exited:
+                    path.unlink(missing_ok=True)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _merge(self, snapshots: list[dict]) -> dict[str, dict[Labels, object]]:
+        merged: dict[str, dict[Labels, object]] = {}
+        for snapshot in snapshots:
+            alive = _is_alive(snapshot["pid"])
+            for name, samples in snapshot["metrics"].items():
+                metric = self.metrics.get(name)
+                if metric is None or (isinstance(metric, Gauge) and not alive):
+                    continue
+                target = merged.setdefault(name, {})
+                for labels, value in samples:
+                    labels = tuple(labels)
+                    current = target.get(labels)
+                    if current is None:
+                        target[labels] = list(value) if isinstance(value, list) else value
+                    elif isinstance(value, list):
+                        target[labels] = [a + b for a, b in zip(current, value)]
+                    else:
+                        target[labels] = current + value
+        return merged
+
+
+def _is_alive(pid: Optional[int]) -> bool:
+    if pid is None:
+        return False
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(pairs: list[tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
+
+
+def _histogram_lines(metric: Histogram, pairs: list[tuple[str, str]], sample: list[float]) -> list[str]:
+    lines = []
+    cumulative = 0.0
+    for bound, count in zip(metric.buckets, sample):
+        cumulative += count
+        labels = _format_labels(pairs + [("le", repr(bound))])
+        lines.append(f"{metric.name}_bucket{labels} {_format_value(cumulative)}")
+    labels = _format_labels(pairs + [("le", "+Inf")])
+    lines.append(f"{metric.name}_bucket{labels} {_format_value(sample[-1])}")
+    lines.append(f"{metric.name}_sum{_format_labels(pairs)} {_format_value(sample[-2])}")
+    lines.append(f"{metric.name}_count{_format_labels(pairs)} {_format_value(sample[-1])}")
+    return lines
+
+
+"""Metrics registry shared by the middleware and the /metrics endpoint"""
+registry = MetricsRegistry(
+    directory=settings.metrics_dir or None,
+    flush_interval=settings.metrics_flush_seconds,
+)
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route")
+)
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress", "HTTP requests currently being handled."
+)
+db_pool_checked_out = registry.gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool."
+)
+db_pool_overflow = registry.gauge(
+    "db_pool_overflow", "Connections currently open beyond the pool size."
+)
+db_pool_checkouts = registry.counter(
+    "db_pool_checkouts_total", "Connections checked out of the pool."
+)
+db_pool_wait = registry.counter(
+    "db_pool_wait_seconds_total", "Time spent waiting for a pooled connection."
+)
+db_pool_timeouts = registry.counter(
+    "db_pool_timeouts_total", "Checkouts that gave up after the pool timeout."
+)
+admission_active = registry.gauge(
+    "admission_active_requests", "Requests holding an admission slot.", ("class",)
+)
+admission_waiting = registry.gauge(
+    "admission_waiting_requests", "Requests queued for an admission slot.", ("class",)
+)
+admission_rejected = registry.counter(
+    "admission_rejected_total",
+    "Requests answered 503 by admission control.",
+    ("class", "reason"),
+)
+
+
+def _collect_pool() -> None:
+    status = pool_status(db.engine)
+    db_pool_checked_out.set((), status.get("checked_out", 0))
+    db_pool_overflow.set((), status.get("overflow", 0))
+    db_pool_checkouts.set_total((), status.get("checkouts", 0))
+    db_pool_wait.set_total((), status.get("wait_seconds_total", 0.0))
+    db_pool_timeouts.set_total((), status.get("timeouts", 0))
+
+
+def _collect_admission() -> None:
+    for name, gate in gates.items():
+        admission_active.set((name,), gate.active)
+        admission_waiting.set((name,), gate.waiting)
+        admission_rejected.set_total((name, "queue_full"), gate.rejected_full)
+        admission_rejected.set_total((name, "queue_timeout"), gate.rejected_timeout)
+
+
+registry.add_collector(_collect_pool)
+registry.add_collector(_collect_admission)
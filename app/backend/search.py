@@ -0,0 +1,265 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import (
+    DDL,
+    ColumnElement,
+    FromClause,
+    Select,
+    cast,
+    column,
+    event,
+    func,
+    literal_column,
+    select,
+    table,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.Answer import Answer
+from app.models.Question import Question
+
+# Must match the search_vector triggers in the search migration.
+SEARCH_CONFIG = "english"
+
+# A match in the question itself outranks a match in one of its answers.
+QUESTION_WEIGHT = 2.0
+
+HIGHLIGHT_START, HIGHLIGHT_STOP = "<mark>", "</mark>"
+SNIPPET_WORDS = 12
+
+_WORD = re.compile(r"\w+")
+
+questions_fts = table("questions_fts", column("rowid"))
+answers_fts = table("answers_fts", column("rowid"))
+
+
+@dataclass
+class _Match:
+    """Dialect-specific pieces of a full-text query."""
+
+    question_hits: Select  # (question_id, score)
+    answer_hits: Select  # (question_id, answer_id, score)
+    snippet_source: FromClause
+    snippet_id: ColumnElement
+    snippet_filter: ColumnElement
+    snippet: ColumnElement
+
+
+def _postgresql_match(q: str, candidates: Optional[int] = None) -> _Match:
+    # Both vectors are trigger-maintained columns with GIN indexes; the
+    # models do not map them, so they are referenced by name.
+    config = cast(SEARCH_CONFIG, REGCONFIG)
+    tsquery = func.websearch_to_tsquery(config, q)
+    question_vector = literal_column("questions.search_vector", TSVECTOR)
+    answer_vector = literal_column("answers.search_vector", TSVECTOR)
+
+    # ts_rank reads each vector from the heap, so the matches are capped
+    # before they are ranked, not after.
+    questions = (
+        select(Question.id, question_vector.label("search_vector"))
+        .where(question_vector.op("@@")(tsquery))
+        .limit(candidates)
+        .subquery("question_matches")
+    )
+    answers = (
+        select(Answer.id, Answer.question_id, answer_vector.label("search_vector"))
+        .where(answer_vector.op("@@")(tsquery))
+        .limit(candidates)
+        .subquery("answer_matches")
+    )
+
+    return _Match(
+        question_hits=select(
+            questions.c.id.label("question_id"),
+            (func.ts_rank(questions.c.search_vector, tsquery) * QUESTION_WEIGHT).label("score"),
+        ),
+        answer_hits=select(
+            answers.c.question_id,
+            answers.c.id.label("answer_id"),
+            func.ts_rank(answers.c.search_vector, tsquery).label("score"),
+        ),
+        snippet_source=Answer.__table__,
+        snippet_id=Answer.id,
+        snippet_filter=answer_vector.op("@@")(tsquery),
+        snippet=func.ts_headline(
+            config,
+            Answer.text,
+            tsquery,
+            f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, "
+            f"MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}",
+        ),
+    )
+
+
+def _sqlite_match(q: str, candidates: Optional[int] = None) -> Optional[_Match]:
+    # Every word becomes a quoted FTS5 term, so user input can never be
+    # parsed as query syntax; the terms are ANDed like websearch_to_tsquery.
+    words = _WORD.findall(q)
+    if not words:
+        return None
+    expression = " ".join(f'"{word}"' for word in words)
+
+    question_table = literal_column("questions_fts")
+    answer_table = literal_column("answers_fts")
+    question_matches = question_table.op("MATCH")(expression)
+    answer_matches = answer_table.op("MATCH")(expression)
+
+    question_hits = select(
+        questions_fts.c.rowid.label("question_id"),
+        # bm25() is lower-is-better, ts_rank() higher-is-better.
+        (-func.bm25(question_table) * QUESTION_WEIGHT).label("score"),
+    ).where(question_matches)
+    answer_hits = (
+        select(
+            Answer.question_id,
+            Answer.id.label("answer_id"),
+            (-func.bm25(answer_table)).label("score"),
+        )
+        .select_from(answers_fts.join(Answer, Answer.id == answers_fts.c.rowid))
+        .where(answer_matches)
+    )
+    if candidates is not None:
+        # bm25() only works in the query that runs MATCH, so the capped
+        # matches are selected by rowid.
+        question_hits = question_hits.where(
+            questions_fts.c.rowid.in_(
+                select(questions_fts.c.rowid).where(question_matches).limit(candidates).correlate(None)
+            )
+        )
+        answer_hits = answer_hits.where(
+            answers_fts.c.rowid.in_(
+                select(answers_fts.c.rowid).where(answer_matches).limit(candidates).correlate(None)
+            )
+        )
+
+    return _Match(
+        question_hits=question_hits,
+        answer_hits=answer_hits,
+        snippet_source=answers_fts,
+        snippet_id=answers_fts.c.rowid,
+        snippet_filter=answer_matches,
+        snippet=func.snippet(
+            answer_table, 0, HIGHLIGHT_START, HIGHLIGHT_STOP, "…", SNIPPET_WORDS
+        ),
+    )
+
+
+def _match(database: AsyncSession, q: str, candidates: Optional[int] = None) -> Optional[_Match]:
+    """Full-text match of q; with candidates, each side ranks at most that many matches."""
+
+    dialect = database.get_bind().dialect.name
+    if dialect == "postgresql":
+        return _postgresql_match(q, candidates)
+    if dialect == "sqlite":
+        return _sqlite_match(q, candidates)
+    raise NotImplementedError(f"Full-text search is not supported for {dialect}")
+
+
+async def search_questions(
+    database: AsyncSession, q: str, limit: int, offset: int
+) -> list[Any]:
+    """
+    Rank questions by matches in their own text and in their answers.
+    Returns up to limit rows of (Question, score), best first.
+    """
+
+    # Very common words can match most of the table. Each side ranks only
+    # the first SEARCH_CANDIDATES_MAX matches the index yields, in no
+    # particular order, so the cost of a query is bounded; past that cap
+    # results are incomplete: questions matched only by the skipped rows are
+    # not found and pages beyond the ranked set come back empty.
+    match = _match(database, q, settings.search_candidates_max)
+    if match is None:
+        return []
+
+    question_hits = match.question_hits.subquery()
+    answer_hits = match.answer_hits.subquery()
+    hits = union_all(
+        select(question_hits.c.question_id, question_hits.c.score),
+        select(answer_hits.c.question_id, answer_hits.c.score),
+    ).subquery()
+    scores = (
+        select(hits.c.question_id, func.sum(hits.c.score).label("score"))
+        .group_by(hits.c.question_id)
+        .subquery()
+    )
+
+    result = await database.execute(
+        select(Question, scores.c.score)
+        .join(scores, scores.c.question_id == Question.id)
+        .order_by(scores.c.score.desc(), Question.id)
+        .offset(offset)
+        .limit(limit)
+    )
+    return result.all()
+
+
+async def answer_snippets(
+    database: AsyncSession, q: str, question_ids: list[int]
+) -> dict[int, list[dict]]:
+    """Highlighted excerpts of the best matching answers of each question."""
+
+    match = _match(database, q)
+    if match is None or not question_ids:
+        return {}
+
+    hits = match.answer_hits.where(
+        match.answer_hits.selected_columns.question_id.in_(question_ids)
+    ).subquery()
+    ranked = select(
+        hits.c.question_id,
+        hits.c.answer_id,
+        func.row_number()
+        .over(
+            partition_by=hits.c.question_id,
+            order_by=(hits.c.score.desc(), hits.c.answer_id),
+        )
+        .label("position"),
+    ).subquery()
+
+    # Snippets are only built for the rows that are returned.
+    rows = await database.execute(
+        select(ranked.c.question_id, ranked.c.answer_id, match.snippet.label("snippet"))
+        .select_from(
+            ranked.join(match.snippet_source, match.snippet_id == ranked.c.answer_id)
+        )
+        .where(match.snippet_filter, ranked.c.position <= settings.search_snippets_max)
+        .order_by(ranked.c.question_id, ranked.c.position)
+    )
+
+    snippets: dict[int, list[dict]] = {}
+    for row in rows:
+        snippets.setdefault(row.question_id, []).append(
+            {"answer_id": row.answer_id, "snippet": row.snippet}
+        )
+    return snippets
+
+
+# SQLite has no tsvector; the tests use external-content FTS5 tables that
+# triggers keep in step with the base tables (including cascaded deletes).
+_SQLITE_FTS = {
+    Question.__table__: "questions_fts",
+    Answer.__table__: "answers_fts",
+}
+
+for _table, _fts in _SQLITE_FTS.items():
+    _name = _table.name
+    for _statement in (
+        f"CREATE VIRTUAL TABLE {_fts} USING fts5(text, content='{_name}', content_rowid='id')",
+        f"CREATE TRIGGER {_fts}_insert AFTER INSERT ON {_name} BEGIN "
+        f"INSERT INTO {_fts}(rowid, text) VALUES (new.id, new.text); END",
+        f"CREATE TRIGGER {_fts}_delete AFTER DELETE ON {_name} BEGIN "
+        f"INSERT INTO {_fts}({_fts}, rowid, text) VALUES ('delete', old.id, old.text); END",
+        f"CREATE TRIGGER {_fts}_update AFTER UPDATE OF text ON {_name} BEGIN "
+        f"INSERT INTO {_fts}({_fts}, rowid, text) VALUES ('delete', old.id, old.text); "
+        f"INSERT INTO {_fts}(rowid, text) VALUES (new.id, new.text); END",
+    ):
+        event.listen(_table, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+    event.listen(
+        _table, "after_drop", DDL(f"DROP TABLE IF EXISTS {_fts}").execute_if(dialect="sqlite")
+    )
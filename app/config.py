@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -15,12 +16,102 @@ db_port = 5432
 class Settings(BaseSettings):
     """Central application configuration."""
 
+    server_host: str = Field(default="0.0.0.0", alias="SERVER_HOST")
+    server_port: int = Field(default=8000, alias="SERVER_PORT")
+    server_workers: int = Field(default=0, alias="SERVER_WORKERS")  # 0: one per CPU
+    server_loop: Literal["auto", "asyncio", "uvloop"] = Field(default="auto", alias="SERVER_LOOP")
+    server_http: Literal["auto", "h11", "httptools"] = Field(default="auto", alias="SERVER_HTTP")
+    server_keep_alive_seconds: int = Field(default=5, alias="SERVER_KEEP_ALIVE_SECONDS")
+    server_backlog: int = Field(default=2048, alias="SERVER_BACKLOG")
+    server_max_requests: int = Field(default=0, alias="SERVER_MAX_REQUESTS")  # 0: never recycle
+    server_access_log: bool = Field(default=False, alias="SERVER_ACCESS_LOG")
+
     db_user: str = Field(default=db_user, alias="DB_USER")
     db_password: str = Field(default=db_password, alias="DB_PASS")
     db_name: str = Field(default=db_name, alias="DB_NAME")
     db_host: str = Field(default=db_host, alias="DB_HOST")
     db_port: int = Field(default=db_port, alias="DB_PORT")
     db_echo: bool = Field(default=False, alias="DB_ECHO")
+    db_pool_size: int = Field(default=5, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(default=30.0, alias="DB_POOL_TIMEOUT")
+    db_pool_recycle: int = Field(default=-1, alias="DB_POOL_RECYCLE")
+    db_pool_pre_ping: bool = Field(default=False, alias="DB_POOL_PRE_PING")
+    db_statement_cache_size: int = Field(default=100, alias="DB_STATEMENT_CACHE_SIZE")
+    db_prewarm_connections: int = Field(default=5, alias="DB_PREWARM_CONNECTIONS")
+    shutdown_drain_seconds: float = Field(default=10.0, alias="SHUTDOWN_DRAIN_SECONDS")
+    shutdown_retry_after: int = Field(default=5, alias="SHUTDOWN_RETRY_AFTER")
+
+    server_timing_enabled: bool = Field(default=True, alias="SERVER_TIMING_ENABLED")
+    metrics_enabled: bool = Field(default=True, alias="METRICS_ENABLED")
+    metrics_dir: str = Field(default="", alias="METRICS_DIR")
+    metrics_flush_seconds: float = Field(default=1.0, alias="METRICS_FLUSH_SECONDS")
+
+    db_replica_urls: str = Field(default="", alias="DB_REPLICA_URLS")
+    db_replica_retry_seconds: float = Field(default=5.0, alias="DB_REPLICA_RETRY_SECONDS")
+    db_replica_connect_timeout: float = Field(default=0.5, alias="DB_REPLICA_CONNECT_TIMEOUT")
+    read_your_writes_seconds: float = Field(default=2.0, alias="READ_YOUR_WRITES_SECONDS")
+
+    admission_enabled: bool = Field(default=False, alias="ADMISSION_ENABLED")
+    admission_read_limit: int = Field(default=20, alias="ADMISSION_READ_LIMIT")
+    admission_write_limit: int = Field(default=10, alias="ADMISSION_WRITE_LIMIT")
+    admission_queue_size: int = Field(default=50, alias="ADMISSION_QUEUE_SIZE")
+    admission_queue_timeout: float = Field(default=0.1, alias="ADMISSION_QUEUE_TIMEOUT")
+    admission_retry_after: int = Field(default=1, alias="ADMISSION_RETRY_AFTER")
+
+    page_size_default: int = Field(default=50, alias="PAGE_SIZE_DEFAULT")
+    page_size_max: int = Field(default=200, alias="PAGE_SIZE_MAX")
+    batch_max_items: int = Field(default=500, alias="BATCH_MAX_ITEMS")
+    lookup_max_ids: int = Field(default=200, alias="LOOKUP_MAX_IDS")
+
+    answer_batching_enabled: bool = Field(default=False, alias="ANSWER_BATCHING_ENABLED")
+    answer_batch_max_items: int = Field(default=100, alias="ANSWER_BATCH_MAX_ITEMS")
+    answer_batch_max_delay_ms: float = Field(default=5.0, alias="ANSWER_BATCH_MAX_DELAY_MS")
+    answer_batch_queue_size: int = Field(default=1000, alias="ANSWER_BATCH_QUEUE_SIZE")
+    answer_batch_enqueue_timeout: float = Field(default=1.0, alias="ANSWER_BATCH_ENQUEUE_TIMEOUT")
+
+    event_broker: Literal["memory", "postgres"] = Field(default="memory", alias="EVENT_BROKER")
+    event_buffer_size: int = Field(default=100, alias="EVENT_BUFFER_SIZE")
+    event_keepalive_seconds: float = Field(default=15.0, alias="EVENT_KEEPALIVE_SECONDS")
+    event_backfill_max: int = Field(default=1000, alias="EVENT_BACKFILL_MAX")
+    event_stream_max_seconds: float = Field(default=300.0, alias="EVENT_STREAM_MAX_SECONDS")
+
+    idempotency_enabled: bool = Field(default=True, alias="IDEMPOTENCY_ENABLED")
+    idempotency_store: Literal["memory", "database"] = Field(default="database", alias="IDEMPOTENCY_STORE")
+    idempotency_ttl_seconds: float = Field(default=24 * 3600, alias="IDEMPOTENCY_TTL_SECONDS")
+    idempotency_lock_seconds: float = Field(default=30.0, alias="IDEMPOTENCY_LOCK_SECONDS")
+    idempotency_wait_seconds: float = Field(default=10.0, alias="IDEMPOTENCY_WAIT_SECONDS")
+    idempotency_max_entries: int = Field(default=10_000, alias="IDEMPOTENCY_MAX_ENTRIES")
+
+    fast_json_enabled: bool = Field(default=False, alias="FAST_JSON_ENABLED")
+
+    # zstd and br are offered only when zstandard and brotli are installed.
+    compression_enabled: bool = Field(default=True, alias="COMPRESSION_ENABLED")
+    compression_min_bytes: int = Field(default=1024, alias="COMPRESSION_MIN_BYTES")
+    compression_gzip_level: int = Field(default=6, alias="COMPRESSION_GZIP_LEVEL")
+    compression_zstd_level: int = Field(default=3, alias="COMPRESSION_ZSTD_LEVEL")
+    compression_brotli_level: int = Field(default=5, alias="COMPRESSION_BROTLI_LEVEL")
+    compression_cache_max_entries: int = Field(default=1000, alias="COMPRESSION_CACHE_MAX_ENTRIES")
+    compression_cache_max_bytes: int = Field(default=32 * 1024 * 1024, alias="COMPRESSION_CACHE_MAX_BYTES")
+    compression_cache_ttl_seconds: float = Field(default=300.0, alias="COMPRESSION_CACHE_TTL_SECONDS")
+
+    # Matches ranked per side; results of broader queries are incomplete.
+    search_candidates_max: int = Field(default=1000, alias="SEARCH_CANDIDATES_MAX")
+    search_snippets_max: int = Field(default=3, alias="SEARCH_SNIPPETS_MAX")
+
+    # 0 keeps rows forever. Questions expire once both the question and its
+    # latest remaining answer are older than retention_question_days.
+    retention_answer_days: int = Field(default=0, alias="RETENTION_ANSWER_DAYS")
+    retention_question_days: int = Field(default=0, alias="RETENTION_QUESTION_DAYS")
+    retention_chunk_size: int = Field(default=500, alias="RETENTION_CHUNK_SIZE")
+    retention_pause_seconds: float = Field(default=0.1, alias="RETENTION_PAUSE_SECONDS")
+    retention_interval_seconds: float = Field(default=0.0, alias="RETENTION_INTERVAL_SECONDS")  # 0: CLI only
+
+    cache_enabled: bool = Field(default=True, alias="CACHE_ENABLED")
+    cache_max_entries: int = Field(default=10_000, alias="CACHE_MAX_ENTRIES")
+    cache_max_bytes: int = Field(default=64 * 1024 * 1024, alias="CACHE_MAX_BYTES")
+    cache_ttl_seconds: float = Field(default=60.0, alias="CACHE_TTL_SECONDS")
+    cache_settle_seconds: float = Field(default=1.0, alias="CACHE_SETTLE_SECONDS")
 
     def _build_db_url(self, driver: str) -> str:
         return (
@@ -36,5 +127,15 @@ class Settings(BaseSettings):
     def sync_database_url(self) -> str:
         return self._build_db_url("postgresql+psycopg2")
 
+    @property
+    def listen_database_url(self) -> str:
+        """Plain DSN for the LISTEN connection, which must bypass a transaction pooler."""
+        return self._build_db_url("postgresql")
+
+    @property
+    def replica_database_urls(self) -> list[str]:
+        """Comma-separated async URLs of read replicas, if any."""
+        return [url.strip() for url in self.db_replica_urls.split(",") if url.strip()]
+
 
 settings = Settings()
@@ -1,14 +1,152 @@
+import asyncio
+import logging
+import signal
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Iterator
+
 from fastapi import FastAPI
 from fastapi.responses import RedirectResponse
-import uvicorn
 
+from app.backend.admission import gates
+from app.backend.async_database import db
+from app.backend.batcher import AnswerBatcher
+from app.backend.broker import broker
+from app.backend.cache import cache
+from app.backend.compression import compressor
+from app.backend.idempotency import idempotency_store
+from app.backend.metrics import registry
+from app.config import settings
+from app.middleware.admission import AdmissionMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.drain import DrainMiddleware, requests_in_flight
+from app.middleware.idempotency import IdempotencyMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.timing import ServerTimingMiddleware, install_query_timing
 from app.routers.questions import router as questions_router
 from app.routers.answers import router as answers_router
+from app.routers.internal import router as internal_router
+from app.routers.events import close_streams, streams_closing
+from app.routers.metrics import router as metrics_router
+from app.tasks.retention import run_periodically
+
+logger = logging.getLogger("app")
+
+
+@contextmanager
+def _on_exit_signal(callback: Callable[[], None]) -> Iterator[None]:
+    """
+    Also run callback on the loop when the server is told to exit. uvicorn
+    waits for open responses before the lifespan shutdown starts, so event
+    streams must be ended from here or they hold up every shutdown.
+    """
+
+    loop = asyncio.get_running_loop()
+    chained = {}
+    if threading.current_thread() is threading.main_thread():
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            previous = signal.getsignal(signum)
+            if not callable(previous):
+                continue
+
+            def handler(number, frame, previous=previous):
+                loop.call_soon_threadsafe(callback)
+                previous(number, frame)
+
+            chained[signum] = previous
+            signal.signal(signum, handler)
+    try:
+        yield
+    finally:
+        for signum, previous in chained.items():
+            signal.signal(signum, previous)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Opens and prewarms the database pools and starts the background workers.
+    On shutdown event streams are closed, new requests are refused, running
+    ones are waited for, and then the workers are drained and the pools
+    disposed.
+    """
+    await db.prewarm(settings.db_prewarm_connections)
+    await broker.start()
+    await cache.start()
+    await registry.start()
+    requests_in_flight.accept()
+
+    batcher = None
+    if settings.answer_batching_enabled:
+        batcher = AnswerBatcher(
+            db.sessions,
+            max_items=settings.answer_batch_max_items,
+            max_delay=settings.answer_batch_max_delay_ms / 1000,
+            queue_size=settings.answer_batch_queue_size,
+            enqueue_timeout=settings.answer_batch_enqueue_timeout,
+        )
+        batcher.start()
+    app.state.answer_batcher = batcher
 
+    retention = None
+    if settings.retention_interval_seconds > 0 and (
+        settings.retention_answer_days or settings.retention_question_days
+    ):
+        retention = asyncio.create_task(
+            run_periodically(db.sessions, settings.retention_interval_seconds), name="retention"
+        )
+    streams_closing.clear()
+    try:
+        # Stream clients reconnect elsewhere and resume with Last-Event-ID.
+        with _on_exit_signal(close_streams):
+            yield
+    finally:
+        close_streams()
+        if not await requests_in_flight.drain(settings.shutdown_drain_seconds):
+            logger.warning(
+                "%d requests still running after %.1fs of draining",
+                requests_in_flight.in_flight,
+                settings.shutdown_drain_seconds,
+            )
+        if retention is not None:
+            retention.cancel()
+            await asyncio.gather(retention, return_exceptions=True)
+        if batcher is not None:
+            await batcher.stop()
+        await registry.stop()
+        await cache.stop()
+        await broker.stop()
+        await db.close()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(questions_router)
 app.include_router(answers_router)
+app.include_router(internal_router)
+
+# Innermost, so rejected requests still show up in timings and metrics.
+if settings.admission_enabled:
+    app.add_middleware(AdmissionMiddleware, gates=gates)
+
+# Outside admission control, so replays and waiting retries hold no slot.
+if settings.idempotency_enabled:
+    app.add_middleware(IdempotencyMiddleware, store=idempotency_store)
+
+# Outside idempotency, so a replay is encoded for the retry's Accept-Encoding;
+# inside server timing, so the compression time counts toward the total.
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware, compressor=compressor)
+
+if settings.server_timing_enabled:
+    install_query_timing()
+    app.add_middleware(ServerTimingMiddleware)
+
+if settings.metrics_enabled:
+    app.include_router(metrics_router)
+    app.add_middleware(MetricsMiddleware)
+
+# Outermost, so draining waits for everything the app is doing.
+app.add_middleware(DrainMiddleware, tracker=requests_in_flight)
 
 
 @app.get("/")
@@ -20,4 +158,6 @@ async def main() -> RedirectResponse:
 
 
 if __name__ == "__main__":
-    uvicorn.run("app.main:app")
+    from app import server
+
+    server.main()
@@ -0,0 +1,82 @@
+import json
+import re
+from typing import Iterable
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.backend.admission import AdmissionGate
+from app.config import settings
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# POSTs that only read: lookups whose id lists are too long for a query string.
+READ_POST_PATHS = re.compile(r"^/(questions|answers)/lookup$")
+
+# Observability and docs must stay reachable while the app sheds load.
+EXEMPT_PREFIXES = ("/internal", "/metrics", "/docs", "/redoc", "/openapi.json")
+
+# Event streams stay open indefinitely but hold no database connection.
+EXEMPT_SUFFIXES = ("/answers/stream",)
+
+
+def route_class(scope: Scope) -> str:
+    """Admission class of a request: "read" or "write"."""
+
+    if scope["method"] in READ_METHODS or (
+        scope["method"] == "POST" and READ_POST_PATHS.match(scope["path"])
+    ):
+        return "read"
+    return "write"
+
+
+async def send_unavailable(
+    send: Send, detail: str, retry_after: int, headers: Iterable[tuple[bytes, bytes]] = ()
+) -> None:
+    """Answer 503 with Retry-After without entering the application."""
+
+    body = json.dumps({"detail": detail}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+                *headers,
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """
+    Limits concurrent requests per route class (reads and writes) and
+    answers 503 with Retry-After once a class and its wait queue are full.
+    """
+
+    def __init__(self, app: ASGIApp, gates: dict[str, AdmissionGate]) -> None:
+        self.app = app
+        self.gates = gates
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["path"].startswith(EXEMPT_PREFIXES)
+            or scope["path"].endswith(EXEMPT_SUFFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        gate = self.gates[route_class(scope)]
+        if not await gate.acquire():
+            await send_unavailable(
+                send, "Server is overloaded, try again later", settings.admission_retry_after
+            )
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
@@ -0,0 +1,94 @@
+import re
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.backend.compression import Compressor, negotiate
+
+# Text formats worth compressing. Event streams are left out: compressing
+# them would hold events back until a compressor block fills up.
+COMPRESSIBLE_TYPES = re.compile(
+    r"^(text/(?!event-stream)|application/(json|javascript|xml)\b|application/[\w.-]+\+(json|xml)\b)",
+    re.IGNORECASE,
+)
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Compresses text responses with the best coding the client accepts:
+    zstd or br when their libraries are installed, gzip otherwise. Only
+    responses sent as one body of at least min_bytes are compressed;
+    streamed ones pass through as they are sent.
+    """
+
+    def __init__(self, app: ASGIApp, compressor: Compressor) -> None:
+        self.app = app
+        self.compressor = compressor
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        coding = negotiate(_header(scope, b"accept-encoding") or "", self.compressor.codecs)
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=list(message.get("headers", [])))
+                if self._compressible(message["status"], headers):
+                    # Held until the body shows whether it is worth it.
+                    start = message
+                    return
+                passthrough = True
+                await send(message)
+                return
+
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            pending, start = start, None
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.compressor.min_bytes:
+                passthrough = True
+                await send(pending)
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=list(pending.get("headers", [])))
+            headers.add_vary_header("Accept-Encoding")
+            if coding is not None:
+                compressed = await self.compressor.compress(coding, body, headers.get("etag"))
+                if len(compressed) < len(body):
+                    body = compressed
+                    headers["content-encoding"] = coding
+                    headers["content-length"] = str(len(body))
+            await send({**pending, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _compressible(status: int, headers: MutableHeaders) -> bool:
+        return (
+            200 <= status
+            and status not in (204, 304)
+            and "content-encoding" not in headers
+            and "no-transform" not in headers.get("cache-control", "").lower()
+            and bool(COMPRESSIBLE_TYPES.match(headers.get("content-type", "")))
+        )
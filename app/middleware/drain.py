@@ -0,0 +1,75 @@
+import asyncio
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+from app.middleware.admission import send_unavailable
+
+
+class RequestTracker:
+    """Counts in-flight requests so that shutdown can wait for them."""
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.draining = False
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def accept(self) -> None:
+        self.draining = False
+
+    def begin(self) -> bool:
+        if self.draining:
+            return False
+        self.in_flight += 1
+        self._idle.clear()
+        return True
+
+    def end(self) -> None:
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """Refuse new requests and wait for the running ones; False on timeout."""
+
+        self.draining = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class DrainMiddleware:
+    """
+    Tracks every HTTP request; once draining, new ones get 503 with
+    Connection: close so clients and balancers move to another instance.
+    """
+
+    def __init__(self, app: ASGIApp, tracker: RequestTracker) -> None:
+        self.app = app
+        self.tracker = tracker
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if not self.tracker.begin():
+            await send_unavailable(
+                send,
+                "Server is shutting down",
+                settings.shutdown_retry_after,
+                headers=[(b"connection", b"close")],
+            )
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.tracker.end()
+
+
+"""In-flight requests of this process, drained by the app lifespan"""
+requests_in_flight = RequestTracker()
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import re
+from typing import Iterable, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.backend.idempotency import IdempotencyStore, KeyState, StoredResponse
+from app.config import settings
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+
+# The POSTs that create questions and answers, single and batch; the
+# lookups are reads and are left alone.
+IDEMPOTENT_PATHS = re.compile(r"^/questions/(\d+/answers/)?(batch)?$")
+
+# Response headers kept for replay; the rest describe the original exchange.
+_STORED_HEADERS = {"content-type", "etag", "location"}
+
+
+async def _send_json(
+    send: Send, status: int, detail: str, headers: Iterable[tuple[bytes, bytes]] = ()
+) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                *headers,
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_stored(send: Send, response: StoredResponse) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": [
+                *((name.encode(), value.encode()) for name, value in response.headers),
+                (b"content-length", str(len(response.body)).encode()),
+                (b"idempotent-replayed", b"true"),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": response.body})
+
+
+class IdempotencyMiddleware:
+    """
+    Makes the creating POSTs safe to retry with an Idempotency-Key header.
+    The first request with a key runs and its response is stored; a retry
+    with the same key and request gets that response back without running
+    again, and one arriving while the first still runs waits for it. Server
+    errors are not stored, so such a request can be retried for real.
+    """
+
+    def __init__(self, app: ASGIApp, store: IdempotencyStore) -> None:
+        self.app = app
+        self.store = store
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        key = self._key(scope)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not 0 < len(key) <= 255:
+            await _send_json(send, 400, "Idempotency-Key must be 1 to 255 characters long")
+            return
+
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+
+        fingerprint = hashlib.sha256(
+            b"\0".join((scope["method"].encode(), scope["path"].encode(), scope["query_string"], body))
+        ).hexdigest()
+        status = await self.store.wait(key, fingerprint, settings.idempotency_wait_seconds)
+
+        if status.state == KeyState.mismatch:
+            await _send_json(send, 422, "Idempotency-Key was already used for a different request")
+            return
+        if status.state == KeyState.in_progress:
+            await _send_json(
+                send,
+                409,
+                "A request with this Idempotency-Key is still in progress",
+                headers=[(b"retry-after", b"1")],
+            )
+            return
+        if status.state == KeyState.completed:
+            await _send_stored(send, status.response)
+            return
+
+        body_sent = False
+
+        async def receive_body() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status_code: Optional[int] = None
+        headers: list[tuple[str, str]] = []
+        response_body = []
+
+        async def capture(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers.extend(
+                    (name.decode("latin-1"), value.decode("latin-1"))
+                    for name, value in message.get("headers", [])
+                    if name.decode("latin-1").lower() in _STORED_HEADERS
+                )
+            elif message["type"] == "http.response.body":
+                response_body.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, capture)
+        except BaseException:
+            await self.store.release(key)
+            raise
+
+        if status_code is not None and status_code < 500:
+            await self.store.complete(
+                key, StoredResponse(status_code, headers, b"".join(response_body))
+            )
+        else:
+            await self.store.release(key)
+
+    @staticmethod
+    def _key(scope: Scope) -> Optional[str]:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not IDEMPOTENT_PATHS.match(scope["path"])
+        ):
+            return None
+        for name, value in scope["headers"]:
+            if name == IDEMPOTENCY_HEADER:
+                return value.decode("latin-1").strip()
+        return None
@@ -0,0 +1,182 @@
+import functools
+import inspect
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger("app.timing")
+
+
+@dataclass
+class RequestTimings:
+    """Timings collected while one request is being handled."""
+
+    started: float
+    queries: int = 0
+    db_seconds: float = 0.0
+    endpoint_seconds: float = 0.0
+    endpoint_finished: float = 0.0
+    serialize_seconds: float = 0.0
+    handler_seconds: float = 0.0
+
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "current_timings", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if current_timings.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    timings = current_timings.get()
+    started = conn.info.get("query_started")
+    if timings is not None and started:
+        timings.queries += 1
+        timings.db_seconds += time.perf_counter() - started.pop()
+
+
+def _handle_error(context) -> None:
+    # A failed statement never reaches after_cursor_execute; drop its start
+    # time so it does not linger on the pooled connection.
+    connection = context.connection
+    started = connection.info.get("query_started") if connection is not None else None
+    if started:
+        started.pop()
+
+
+def install_query_timing() -> None:
+    """
+    Count queries and DB time for the current request.
+    Listens on the Engine class, so the primary engine in async_database,
+    the replicas and any test engine are all covered.
+    """
+
+    for name, listener in (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+        ("handle_error", _handle_error),
+    ):
+        if not event.contains(Engine, name, listener):
+            event.listen(Engine, name, listener)
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    if not inspect.iscoroutinefunction(endpoint):
+        return endpoint
+
+    @functools.wraps(endpoint)
+    async def timed(*args, **kwargs):
+        timings = current_timings.get()
+        if timings is None:
+            return await endpoint(*args, **kwargs)
+
+        started = time.perf_counter()
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            timings.endpoint_finished = time.perf_counter()
+            timings.endpoint_seconds = timings.endpoint_finished - started
+
+    return timed
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute that times the path operation and, separately, the validation
+    and serialization of its response_model that FastAPI does afterwards.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs) -> None:
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            timings = current_timings.get()
+            if timings is None:
+                return await handler(request)
+
+            started = time.perf_counter()
+            response = await handler(request)
+            finished = time.perf_counter()
+            timings.handler_seconds = finished - started
+            if timings.endpoint_finished:
+                timings.serialize_seconds = finished - timings.endpoint_finished
+            return response
+
+        return timed_handler
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the matched route, keeping metric labels bounded."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class ServerTimingMiddleware:
+    """
+    Adds a Server-Timing header with query count, DB, endpoint, serialization
+    and total time, and logs the same numbers as one structured line.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(started=time.perf_counter())
+        token = current_timings.set(timings)
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                total = time.perf_counter() - timings.started
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(timings, total).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_timings.reset(token)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "method=%s route=%s status=%d total_ms=%.2f handler_ms=%.2f "
+                    "endpoint_ms=%.2f serialize_ms=%.2f db_ms=%.2f queries=%d",
+                    scope["method"],
+                    route_template(scope),
+                    status_code,
+                    (time.perf_counter() - timings.started) * 1000,
+                    timings.handler_seconds * 1000,
+                    timings.endpoint_seconds * 1000,
+                    timings.serialize_seconds * 1000,
+                    timings.db_seconds * 1000,
+                    timings.queries,
+                )
+
+
+def _server_timing(timings: RequestTimings, total: float) -> str:
+    return (
+        f'db;dur={timings.db_seconds * 1000:.2f};desc="{timings.queries} queries", '
+        f"endpoint;dur={timings.endpoint_seconds * 1000:.2f}, "
+        f"serialize;dur={timings.serialize_seconds * 1000:.2f}, "
+        f"handler;dur={timings.handler_seconds * 1000:.2f}, "
+        f"total;dur={total * 1000:.2f}"
+    )
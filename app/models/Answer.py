@@ -1,7 +1,7 @@
 from typing import TYPE_CHECKING
 from uuid import uuid4
 
-from sqlalchemy import ForeignKey, Integer, UUID, Text
+from sqlalchemy import ForeignKey, Index, Integer, UUID, Text
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 
 
@@ -16,10 +16,19 @@ class Answer(Base):
     Model class for questions.
     """
 
+    __table_args__ = (
+        # Loading a question's answers in order, its latest answer and the
+        # ON DELETE CASCADE lookup all start from question_id.
+        Index("ix_answers_question_id_created_at_id", "question_id", "created_at", "id"),
+        Index("ix_answers_created_at_id", "created_at", "id"),
+    )
+
     user_id: Mapped[UUID] = mapped_column(
         UUID, nullable=False, default=uuid4()
     )  # ForeignKey('users.id')
     text: Mapped[str] = mapped_column(Text, nullable=False)
-    question_id: Mapped[int] = mapped_column(Integer, ForeignKey("questions.id"))
+    question_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("questions.id", ondelete="CASCADE")
+    )
 
-    question: Mapped["Question"] = relationship(backref="answer")
+    question: Mapped["Question"] = relationship(back_populates="answers", lazy="raise")
@@ -1,6 +1,7 @@
-from typing import TYPE_CHECKING
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import Text
+from sqlalchemy import DateTime, Index, Integer, Text
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from app.backend.Base import Base
@@ -14,8 +15,24 @@ class Question(Base):
     Model class for questions.
     """
 
+    __table_args__ = (Index("ix_questions_created_at_id", "created_at", "id"),)
+
     text: Mapped[str] = mapped_column(Text, unique=True, nullable=False)
 
+    # Denormalized for listings; kept up to date by the answer write paths
+    # (see backend.counters) and recomputed by tasks.counters.
+    answer_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    last_answer_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+    # Loading is chosen per query (see routers.dependencies): "raise" makes
+    # any accidental implicit load of the collection fail loudly. Deleting a
+    # question leaves the answers to the database's ON DELETE CASCADE.
     answers: Mapped[list["Answer"]] = relationship(
-        backref="questions", cascade="all, delete-orphan", lazy="selectin"
+        back_populates="question",
+        order_by="(Answer.created_at, Answer.id)",
+        cascade="all, delete-orphan",
+        lazy="raise",
+        passive_deletes=True,
     )
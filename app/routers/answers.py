@@ -1,23 +1,59 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.backend.async_database import get_database
+from app.backend.async_database import get_database, get_read_database
+from app.backend.cache import answer_key, cache, question_key
+from app.backend.counters import answer_removed
+from app.models.Answer import Answer
 from app.schemas.answer import AnswerResponse
-from app.routers.dependencies import get_answer_by_id
+from app.schemas.lookup import AnswerLookup, LookupRequest
+from app.routers.dependencies import get_answer_response
+from app.routers.lookup import lookup_response, parse_ids
+from app.routers.serialization import ANSWER_COLUMNS, answer_lookup_json
+from app.routers.events import publish_answer_deleted
+from app.middleware.timing import TimedRoute
 
-router = APIRouter(prefix="/answers", tags=["answers"])
+router = APIRouter(prefix="/answers", tags=["answers"], route_class=TimedRoute)
+
+
+# Declared before /{answer_id}, which would otherwise capture "lookup".
+@router.get("/lookup", response_model=AnswerLookup)
+async def lookup_answers(
+    ids: Annotated[list[str], Query(description="Comma-separated or repeated ids")],
+    database: Annotated[AsyncSession, Depends(get_read_database)],
+):
+    """Get many answers by ID in one query, in the order given."""
+
+    return await lookup_response(
+        database, Answer.id, ANSWER_COLUMNS, answer_lookup_json, parse_ids(ids)
+    )
+
+
+@router.post("/lookup", response_model=AnswerLookup)
+async def lookup_answers_by_body(
+    lookup: LookupRequest,
+    database: Annotated[AsyncSession, Depends(get_read_database)],
+):
+    """Get many answers by ID, for lists too long for a query string."""
+
+    return await lookup_response(
+        database, Answer.id, ANSWER_COLUMNS, answer_lookup_json, lookup.ids
+    )
 
 
 @router.get("/{answer_id}", response_model=AnswerResponse)
 async def get_answer(
-    answer_id: int, database: Annotated[AsyncSession, Depends(get_database)]
+    answer_id: int,
+    database: Annotated[AsyncSession, Depends(get_read_database)],
+    if_none_match: Annotated[Optional[str], Header()] = None,
 ):
     """Get an answer by ID."""
-    answer = await get_answer_by_id(database=database, answer_id=answer_id)
-
-    return answer
+    return await get_answer_response(
+        database=database, answer_id=answer_id, if_none_match=if_none_match
+    )
 
 
 @router.delete("/{answer_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -25,7 +61,21 @@ async def delete_answer(
     answer_id: int, database: Annotated[AsyncSession, Depends(get_database)]
 ):
     """Delete an answer by ID."""
-    answer = await get_answer_by_id(database=database, answer_id=answer_id)
+    deleted = (
+        await database.execute(
+            delete(Answer)
+            .where(Answer.id == answer_id)
+            .returning(Answer.question_id, Answer.created_at)
+        )
+    ).one_or_none()
+    if deleted is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Answer with id {answer_id} not found",
+        )
 
-    await database.delete(answer)
+    question_id = deleted.question_id
+    await database.execute(answer_removed(question_id, deleted.created_at))
     await database.commit()
+    await cache.delete(answer_key(answer_id), question_key(question_id))
+    await publish_answer_deleted(question_id, answer_id)
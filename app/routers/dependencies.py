@@ -1,20 +1,49 @@
-from fastapi import Depends, HTTPException
-from sqlalchemy import select
+from fastapi import Depends, HTTPException, Request, Response
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Row, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from starlette import status
-from typing import Annotated
+from typing import Annotated, Any, Optional, TypeVar
 
 from app.backend.async_database import get_database
+from app.backend.batcher import AnswerBatcher
+from app.backend.cache import answer_key, cache, question_key
+from app.config import settings
 from app.models.Answer import Answer
 from app.models.Question import Question
+from app.schemas.answer import AnswerResponse
+from app.schemas.batch import BatchItemStatus
+from app.schemas.question import QuestionWithAnswers
+from app.routers.etags import answer_etag, etag_matches, not_modified, question_etag
+from app.routers.serialization import (
+    ANSWER_COLUMNS,
+    QUESTION_COLUMNS,
+    answer_json,
+    question_with_answers_json,
+)
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+def get_answer_batcher(request: Request) -> Optional[AnswerBatcher]:
+    """The write-behind answer batcher, when enabled."""
+
+    return getattr(request.app.state, "answer_batcher", None)
 
 
 async def get_question_by_id(
-    question_id: int, database: Annotated[AsyncSession, Depends(get_database)]
+    question_id: int,
+    database: Annotated[AsyncSession, Depends(get_database)],
+    with_answers: bool = False,
 ) -> Question:
-    """Get a question by ID."""
+    """Get a question by ID, optionally with its answers loaded."""
+
+    query = select(Question).where(Question.id == question_id)
+    if with_answers:
+        query = query.options(selectinload(Question.answers))
 
-    question = await database.scalar(select(Question).where(Question.id == question_id))
+    question = await database.scalar(query)
 
     if not question:
         raise HTTPException(
@@ -39,3 +68,182 @@ async def get_answer_by_id(
         )
 
     return answer
+
+
+async def _get_question_rows(
+    database: AsyncSession, question_id: int
+) -> tuple[Row, list[Row]]:
+    """The columns of a question and its answers, without building ORM objects."""
+
+    question = (
+        await database.execute(select(*QUESTION_COLUMNS).where(Question.id == question_id))
+    ).one_or_none()
+    if question is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Question with id {question_id} not found",
+        )
+
+    answers = (
+        await database.execute(
+            select(*ANSWER_COLUMNS)
+            .where(Answer.question_id == question_id)
+            .order_by(Answer.created_at, Answer.id)
+        )
+    ).all()
+    return question, answers
+
+
+def _pack(etag: str, body: bytes) -> bytes:
+    return etag.encode() + b"\n" + body
+
+
+def _unpack(value: bytes) -> tuple[str, bytes]:
+    etag, body = value.split(b"\n", 1)
+    return etag.decode(), body
+
+
+async def get_question_response(
+    question_id: int,
+    database: Annotated[AsyncSession, Depends(get_database)],
+    if_none_match: Optional[str] = None,
+) -> Response:
+    """
+    Get a question with its answers as a JSON response, through the cache.
+    A matching If-None-Match is answered with 304 without loading the answers.
+    """
+
+    key = question_key(question_id)
+    cached = await cache.get(key)
+    if cached is not None:
+        etag, body = _unpack(cached)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        return _json_response(body, etag)
+
+    if if_none_match:
+        version = (
+            await database.execute(
+                select(
+                    func.count(Answer.id),
+                    func.max(Answer.id),
+                    func.max(Answer.created_at),
+                )
+                .select_from(Question)
+                .outerjoin(Answer, Answer.question_id == Question.id)
+                .where(Question.id == question_id)
+                .group_by(Question.id)
+            )
+        ).one_or_none()
+        if version is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Question with id {question_id} not found",
+            )
+        etag = question_etag(question_id, *version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    if settings.fast_json_enabled:
+        question, answers = await _get_question_rows(database, question_id)
+        body = question_with_answers_json.dump_json(
+            {**question._asdict(), "answers": [answer._asdict() for answer in answers]}
+        )
+    else:
+        question = await get_question_by_id(
+            database=database, question_id=question_id, with_answers=True
+        )
+        answers = question.answers
+        body = QuestionWithAnswers.model_validate(question).model_dump_json().encode()
+
+    etag = question_etag(
+        question.id,
+        len(answers),
+        max((answer.id for answer in answers), default=None),
+        max((answer.created_at for answer in answers), default=None),
+    )
+    await cache.set(key, _pack(etag, body), tags=[key])
+
+    return _json_response(body, etag)
+
+
+async def get_answer_response(
+    answer_id: int,
+    database: Annotated[AsyncSession, Depends(get_database)],
+    if_none_match: Optional[str] = None,
+) -> Response:
+    """
+    Get an answer as a JSON response, through the cache.
+    A matching If-None-Match is answered with 304 without loading the answer.
+    """
+
+    key = answer_key(answer_id)
+    cached = await cache.get(key)
+    if cached is not None:
+        etag, body = _unpack(cached)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        return _json_response(body, etag)
+
+    if if_none_match:
+        created_at = await database.scalar(
+            select(Answer.created_at).where(Answer.id == answer_id)
+        )
+        if created_at is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Answer with id {answer_id} not found",
+            )
+        etag = answer_etag(answer_id, created_at)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    if settings.fast_json_enabled:
+        answer = (
+            await database.execute(select(*ANSWER_COLUMNS).where(Answer.id == answer_id))
+        ).one_or_none()
+        if answer is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Answer with id {answer_id} not found",
+            )
+        body = answer_json.dump_json(answer._asdict())
+    else:
+        answer = await get_answer_by_id(database=database, answer_id=answer_id)
+        body = AnswerResponse.model_validate(answer).model_dump_json().encode()
+
+    etag = answer_etag(answer.id, answer.created_at)
+    # Tagged with its question so deleting the question drops it too.
+    await cache.set(key, _pack(etag, body), tags=[question_key(answer.question_id)])
+
+    return _json_response(body, etag)
+
+
+def _json_response(body: bytes, etag: str) -> Response:
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+def validate_batch(
+    items: list[Any], schema: type[SchemaT]
+) -> tuple[list[tuple[int, SchemaT]], dict[int, dict]]:
+    """
+    Validate every batch item against the schema on its own.
+    Returns the valid items with their positions and results for invalid ones.
+    """
+
+    valid: list[tuple[int, SchemaT]] = []
+    rejected: dict[int, dict] = {}
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as error:
+            rejected[index] = {
+                "index": index,
+                "status": BatchItemStatus.invalid,
+                "detail": "; ".join(
+                    f"{'.'.join(map(str, err['loc'])) or 'body'}: {err['msg']}"
+                    for err in error.errors()
+                ),
+            }
+
+    return valid, rejected
@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Response, status
+
+
+def _timestamp(value: Optional[datetime]) -> int:
+    return int(value.timestamp() * 1_000_000) if value is not None else 0
+
+
+def question_etag(
+    question_id: int,
+    answer_count: int,
+    last_answer_id: Optional[int],
+    last_answer_at: Optional[datetime],
+) -> str:
+    """
+    Weak validator for a question with its answers. Questions are immutable,
+    so it changes exactly when an answer is added or removed.
+    """
+
+    return (
+        f'W/"q{question_id}-{answer_count}-{last_answer_id or 0}-'
+        f'{_timestamp(last_answer_at)}"'
+    )
+
+
+def answer_etag(answer_id: int, created_at: datetime) -> str:
+    """Weak validator for an answer; answers never change once created."""
+
+    return f'W/"a{answer_id}-{_timestamp(created_at)}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Iterable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import Row, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette import status
+
+from app.backend.broker import Subscription, broker
+from app.backend.cache import question_key
+from app.config import settings
+from app.models.Answer import Answer
+from app.models.Question import Question
+from app.routers.serialization import ANSWER_COLUMNS, answer_json
+
+logger = logging.getLogger("app.events")
+
+ANSWER_CREATED = "answer.created"
+ANSWER_DELETED = "answer.deleted"
+QUESTION_DELETED = "question.deleted"
+
+# How long EventSource clients wait before reconnecting, in milliseconds.
+RETRY_MS = 1000
+
+# Broker messages are "<event>\n<id>\n<data>"; data is a single line of JSON.
+
+"""Set once the server is shutting down; streams end rather than hold it up"""
+streams_closing = asyncio.Event()
+
+
+def close_streams() -> None:
+    """End every open stream; streams opened from now on end after their backlog."""
+
+    streams_closing.set()
+    broker.disconnect_all()
+
+
+def _answer_data(answer: Any) -> str:
+    """JSON of an answer given as an ORM object or a row of ANSWER_COLUMNS."""
+
+    return answer_json.dump_json(
+        {column.key: getattr(answer, column.key) for column in ANSWER_COLUMNS}
+    ).decode()
+
+
+async def _publish(
+    question_id: int, event: str, event_id: Any, data: str, wait: bool = False
+) -> None:
+    message = f"{event}\n{event_id}\n{data}"
+    if broker.max_message_bytes and len(message.encode()) > broker.max_message_bytes:
+        # Too large for the transport: subscribers reconnect and read the
+        # answer from the database instead.
+        message = f"{event}\n{event_id}\n"
+    try:
+        await broker.publish(question_key(question_id), message, wait)
+    except Exception:
+        # The write is already committed; a missed event must not fail it.
+        logger.exception("publishing %s for question %d failed", event, question_id)
+
+
+async def publish_answers_created(question_id: int, answers: Iterable[Any]) -> None:
+    for answer in answers:
+        await _publish(question_id, ANSWER_CREATED, answer.id, _answer_data(answer))
+
+
+async def publish_answer_deleted(question_id: int, answer_id: int, wait: bool = False) -> None:
+    await _publish(
+        question_id,
+        ANSWER_DELETED,
+        answer_id,
+        json.dumps({"id": answer_id, "question_id": question_id}),
+        wait,
+    )
+
+
+async def publish_question_deleted(question_id: int, wait: bool = False) -> None:
+    await _publish(
+        question_id, QUESTION_DELETED, question_id, json.dumps({"id": question_id}), wait
+    )
+
+
+def _frame(event: str, data: str, event_id: Optional[int] = None) -> bytes:
+    # Only answer.created carries an id, so Last-Event-ID is always the
+    # newest answer the client has seen.
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"event: {event}\n{id_line}data: {data}\n\n".encode()
+
+
+async def answer_backlog(
+    database: AsyncSession, question_id: int, last_event_id: Optional[int]
+) -> tuple[int, list[Row]]:
+    """
+    Where a stream of the question's answers resumes, and the answers
+    created after last_event_id, at most event_backfill_max + 1 of them.
+    Without last_event_id the stream starts after the newest answer.
+    """
+
+    if last_event_id is None:
+        found = (
+            await database.execute(
+                select(Question.id, func.coalesce(func.max(Answer.id), 0))
+                .outerjoin(Answer, Answer.question_id == Question.id)
+                .where(Question.id == question_id)
+                .group_by(Question.id)
+            )
+        ).one_or_none()
+    else:
+        found = (
+            await database.execute(select(Question.id).where(Question.id == question_id))
+        ).one_or_none()
+    if found is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Question with id {question_id} not found",
+        )
+    if last_event_id is None:
+        return found[1], []
+
+    backlog = (
+        await database.execute(
+            select(*ANSWER_COLUMNS)
+            .where(Answer.question_id == question_id, Answer.id > last_event_id)
+            .order_by(Answer.id)
+            .limit(settings.event_backfill_max + 1)
+        )
+    ).all()
+    return last_event_id, backlog
+
+
+async def answer_events(
+    subscription: Subscription, last_id: int, backlog: list[Row]
+) -> AsyncIterator[bytes]:
+    """
+    Server-Sent Events for one question: the backlog, then live events.
+    The stream ends when the subscription is closed (slow client, shutdown,
+    lost broker connection), after event_stream_max_seconds, or when the
+    backlog is larger than one response may carry; the client then
+    reconnects with Last-Event-ID and continues from the database.
+    """
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.event_stream_max_seconds
+    try:
+        # A bare id sets the client's Last-Event-ID without dispatching an event.
+        yield f"retry: {RETRY_MS}\nid: {last_id}\n\n".encode()
+
+        for answer in backlog[: settings.event_backfill_max]:
+            yield _frame(ANSWER_CREATED, _answer_data(answer), answer.id)
+            last_id = answer.id
+        if len(backlog) > settings.event_backfill_max or streams_closing.is_set():
+            return
+        # Answers committed while the backlog was read arrive live as well.
+        backfilled = {answer.id for answer in backlog}
+
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                message = await subscription.get(min(settings.event_keepalive_seconds, remaining))
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if message is None:
+                return
+
+            event, event_id, data = message.split("\n", 2)
+            if event == ANSWER_CREATED:
+                if int(event_id) in backfilled:
+                    continue
+                if not data:
+                    return
+                # Other workers' answers may arrive out of id order; the
+                # client's Last-Event-ID must never move backwards.
+                last_id = max(last_id, int(event_id))
+                yield _frame(event, data, last_id)
+            else:
+                yield _frame(event, data)
+                if event == QUESTION_DELETED:
+                    return
+    finally:
+        subscription.close()
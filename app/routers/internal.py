@@ -0,0 +1,45 @@
+from fastapi import APIRouter
+
+from app.backend.admission import gates
+from app.backend.async_database import db
+from app.backend.broker import broker
+from app.backend.cache import cache
+from app.backend.compression import compressor
+from app.backend.pool import pool_status
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+
+
+@router.get("/cache")
+async def get_cache_stats() -> dict[str, int]:
+    """Get hit, miss and eviction counters of the response cache."""
+
+    return cache.stats()
+
+
+@router.get("/pool")
+async def get_pool_stats() -> dict[str, float]:
+    """Get live occupancy, checkout and wait counters of the database pool."""
+
+    return pool_status(db.engine)
+
+
+@router.get("/admission")
+async def get_admission_stats() -> dict[str, dict[str, int]]:
+    """Get in-flight, queued and rejected request counts per route class."""
+
+    return {name: gate.stats() for name, gate in gates.items()}
+
+
+@router.get("/events")
+async def get_event_stats() -> dict[str, int]:
+    """Get subscribed channels, open streams and dropped slow subscribers."""
+
+    return broker.stats()
+
+
+@router.get("/compression")
+async def get_compression_stats() -> dict[str, float]:
+    """Get bytes before and after compression, time spent and cache hits."""
+
+    return compressor.stats()
@@ -0,0 +1,59 @@
+from typing import Any
+
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter
+from sqlalchemy import ColumnElement, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.backend.dialects import id_in
+from app.config import settings
+from app.routers.serialization import raw_json_response
+
+
+def parse_ids(values: list[str]) -> list[int]:
+    """Ids from ?ids=1,2,3, ?ids=1&ids=2 or a mix of both."""
+
+    try:
+        return [int(value) for chunk in values for value in chunk.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be integers",
+        )
+
+
+async def lookup_response(
+    database: AsyncSession,
+    id_column: ColumnElement,
+    columns: tuple[ColumnElement, ...],
+    adapter: TypeAdapter,
+    ids: list[int],
+) -> Any:
+    """
+    Fetch the rows with the given ids in one query.
+    Items come back in the order asked for, each id once; ids with no row
+    are reported as missing rather than failing the request.
+    """
+
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one id is required",
+        )
+    if len(ids) > settings.lookup_max_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.lookup_max_ids} ids can be looked up at once",
+        )
+
+    rows = await database.execute(select(*columns).where(id_in(database, id_column, ids)))
+    found = {row.id: row._asdict() for row in rows}
+
+    result = {
+        "items": [found[row_id] for row_id in ids if row_id in found],
+        "missing": [row_id for row_id in ids if row_id not in found],
+    }
+    if settings.fast_json_enabled:
+        return raw_json_response(adapter, result)
+    return result
@@ -1,24 +1,161 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timezone
+from typing import Annotated, Any, Optional
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, insert, select, tuple_
 
-from app.backend.async_database import get_database
+from app.backend.async_database import get_database, get_read_database
+from app.backend.batcher import AnswerBatcher, BatcherOverloaded, QuestionNotFound
+from app.backend.broker import broker
+from app.backend.cache import cache, question_key
+from app.backend.counters import answers_added
+from app.backend.dialects import dialect_insert
+from app.backend.search import answer_snippets, search_questions
+from app.config import settings
 from app.models.Question import Question
 from app.models.Answer import Answer
-from app.schemas.question import QuestionCreate, QuestionResponse, QuestionWithAnswers
-from app.schemas.answer import AnswerResponse, AnswerCreate
-from app.routers.dependencies import get_question_by_id
+from app.schemas.batch import BatchItemStatus
+from app.schemas.question import (
+    QuestionBatchItemResult,
+    QuestionCreate,
+    QuestionPage,
+    QuestionResponse,
+    QuestionWithAnswers,
+)
+from app.schemas.answer import AnswerBatchItemResult, AnswerResponse, AnswerCreate
+from app.schemas.lookup import LookupRequest, QuestionLookup
+from app.schemas.search import QuestionSearchPage
+from app.routers.dependencies import (
+    get_answer_batcher,
+    get_question_by_id,
+    get_question_response,
+    validate_batch,
+)
+from app.routers.pagination import (
+    clamp_limit,
+    decode_cursor,
+    decode_offset_cursor,
+    encode_cursor,
+    encode_offset_cursor,
+)
+from app.routers.events import (
+    answer_backlog,
+    answer_events,
+    publish_answers_created,
+    publish_question_deleted,
+)
+from app.routers.lookup import lookup_response, parse_ids
+from app.routers.serialization import (
+    QUESTION_LIST_COLUMNS,
+    question_lookup_json,
+    question_page_json,
+    raw_json_response,
+)
+from app.middleware.timing import TimedRoute
+
+router = APIRouter(prefix="/questions", tags=["questions"], route_class=TimedRoute)
+
+
+@router.get("/", response_model=QuestionPage)
+async def get_questions(
+    database: Annotated[AsyncSession, Depends(get_read_database)],
+    limit: Annotated[Optional[int], Query(ge=1)] = None,
+    cursor: Optional[str] = None,
+):
+    """Get a page of questions ordered by creation time."""
+
+    limit = clamp_limit(limit)
+    query = select(Question).order_by(Question.created_at, Question.id)
+    if cursor is not None:
+        query = query.where(
+            tuple_(Question.created_at, Question.id) > decode_cursor(cursor)
+        )
+
+    # One extra row tells whether another page exists without a COUNT(*).
+    query = query.limit(limit + 1)
+    if settings.fast_json_enabled:
+        questions = (
+            await database.execute(query.with_only_columns(*QUESTION_LIST_COLUMNS))
+        ).all()
+    else:
+        questions = (await database.scalars(query)).all()
+
+    next_cursor = None
+    if len(questions) > limit:
+        questions = questions[:limit]
+        last = questions[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    if settings.fast_json_enabled:
+        return raw_json_response(
+            question_page_json,
+            {"items": [row._asdict() for row in questions], "next_cursor": next_cursor},
+        )
+    return {"items": questions, "next_cursor": next_cursor}
+
+
+# Declared before /{question_id}, which would otherwise capture "lookup".
+@router.get("/lookup", response_model=QuestionLookup)
+async def lookup_questions(
+    ids: Annotated[list[str], Query(description="Comma-separated or repeated ids")],
+    database: Annotated[AsyncSession, Depends(get_read_database)],
+):
+    """Get many questions by ID in one query, in the order given."""
 
-router = APIRouter(prefix="/questions", tags=["questions"])
+    return await lookup_response(
+        database, Question.id, QUESTION_LIST_COLUMNS, question_lookup_json, parse_ids(ids)
+    )
+
+
+@router.post("/lookup", response_model=QuestionLookup)
+async def lookup_questions_by_body(
+    lookup: LookupRequest,
+    database: Annotated[AsyncSession, Depends(get_read_database)],
+):
+    """Get many questions by ID, for lists too long for a query string."""
+
+    return await lookup_response(
+        database, Question.id, QUESTION_LIST_COLUMNS, question_lookup_json, lookup.ids
+    )
+
+
+# Declared before /{question_id}, which would otherwise capture "search".
+@router.get("/search", response_model=QuestionSearchPage)
+async def search(
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    database: Annotated[AsyncSession, Depends(get_read_database)],
+    limit: Annotated[Optional[int], Query(ge=1)] = None,
+    cursor: Optional[str] = None,
+    answers: bool = False,
+):
+    """Search questions and their answers, best match first."""
 
+    limit = clamp_limit(limit)
+    offset = decode_offset_cursor(cursor) if cursor is not None else 0
 
-@router.get("/", response_model=list[QuestionResponse])
-async def get_questions(database: Annotated[AsyncSession, Depends(get_database)]):
-    """Get a list of all questions."""
+    rows = await search_questions(database, q, limit=limit + 1, offset=offset)
 
-    result = (await database.scalars(select(Question))).all()
-    return result
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_offset_cursor(offset + limit)
+
+    snippets = {}
+    if answers:
+        snippets = await answer_snippets(database, q, [question.id for question, _ in rows])
+
+    items = [
+        {
+            "id": question.id,
+            "text": question.text,
+            "created_at": question.created_at,
+            "score": score,
+            "answers": snippets.get(question.id, []),
+        }
+        for question, score in rows
+    ]
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.post("/", response_model=QuestionResponse, status_code=status.HTTP_201_CREATED)
@@ -34,43 +171,135 @@ async def create_question(
             detail="Question text cannot be empty",
         )
 
-    same_question = await database.scalar(
-        select(Question).where(Question.text == question_data.text)
+    # The unique constraint on text decides duplicates, so concurrent writers
+    # cannot race past a separate existence check.
+    new_question = await database.scalar(
+        dialect_insert(database, Question)
+        .values(**question_data.model_dump())
+        .on_conflict_do_nothing(index_elements=[Question.text])
+        .returning(Question)
     )
-    if same_question:
+    if new_question is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Question with this text already exists",
         )
 
-    new_question = Question(**question_data.model_dump())
-    database.add(new_question)
     await database.commit()
-    await database.refresh(new_question)
     return new_question
 
 
+@router.post("/batch", response_model=list[QuestionBatchItemResult])
+async def create_questions_batch(
+    items: Annotated[list[Any], Body(max_length=settings.batch_max_items)],
+    database: Annotated[AsyncSession, Depends(get_database)],
+):
+    """Create many questions at once, reporting the outcome of each item."""
+
+    valid, results = validate_batch(items, QuestionCreate)
+
+    pending: dict[str, int] = {}
+    for index, question_data in valid:
+        if question_data.text in pending:
+            results[index] = {
+                "index": index,
+                "status": BatchItemStatus.duplicate,
+                "detail": "Question with this text already exists",
+            }
+        else:
+            pending[question_data.text] = index
+
+    if pending:
+        created = await database.execute(
+            dialect_insert(database, Question)
+            .values([{"text": text} for text in pending])
+            .on_conflict_do_nothing(index_elements=[Question.text])
+            .returning(Question.id, Question.text, Question.created_at)
+        )
+        for row in created:
+            index = pending.pop(row.text)
+            results[index] = {
+                "index": index,
+                "status": BatchItemStatus.created,
+                "question": dict(row._mapping),
+            }
+        await database.commit()
+
+    # Whatever the INSERT skipped collided with an existing question.
+    for index in pending.values():
+        results[index] = {
+            "index": index,
+            "status": BatchItemStatus.duplicate,
+            "detail": "Question with this text already exists",
+        }
+
+    return [results[index] for index in range(len(items))]
+
+
 @router.get("/{question_id}", response_model=QuestionWithAnswers)
 async def get_question(
-    question_id: int, database: Annotated[AsyncSession, Depends(get_database)]
+    question_id: int,
+    database: Annotated[AsyncSession, Depends(get_read_database)],
+    if_none_match: Annotated[Optional[str], Header()] = None,
 ):
     """Get a question by ID with all its answers."""
 
-    question = await get_question_by_id(database=database, question_id=question_id)
-
-    return question
+    return await get_question_response(
+        database=database, question_id=question_id, if_none_match=if_none_match
+    )
 
 
 @router.delete("/{question_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_question(
     question_id: int, database: Annotated[AsyncSession, Depends(get_database)]
 ):
-    """Delete a question by ID."""
+    """Delete a question by ID together with its answers."""
 
-    question = await get_question_by_id(database=database, question_id=question_id)
+    # Answers are removed by ON DELETE CASCADE, so this is one statement
+    # regardless of how many answers the question has.
+    deleted_id = await database.scalar(
+        delete(Question).where(Question.id == question_id).returning(Question.id)
+    )
+    if deleted_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Question with id {question_id} not found",
+        )
 
-    await database.delete(question)
     await database.commit()
+    await cache.delete_tag(question_key(question_id))
+    await publish_question_deleted(question_id)
+
+
+@router.get(
+    "/{question_id}/answers/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_answers(
+    question_id: int,
+    # Released before streaming starts: an open stream holds no connection.
+    database: Annotated[AsyncSession, Depends(get_database, scope="function")],
+    last_event_id: Annotated[Optional[int], Header()] = None,
+):
+    """
+    Push the question's new and deleted answers as Server-Sent Events.
+    With Last-Event-ID the answers created since that one are sent first.
+    """
+
+    # Subscribed before the backlog is read, so nothing falls in between.
+    subscription = broker.subscribe(question_key(question_id))
+    try:
+        last_id, backlog = await answer_backlog(database, question_id, last_event_id)
+    except BaseException:
+        subscription.close()
+        raise
+
+    return StreamingResponse(
+        answer_events(subscription, last_id, backlog),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post(
@@ -82,6 +311,7 @@ async def create_answer(
     question_id: int,
     answer_data: AnswerCreate,
     database: Annotated[AsyncSession, Depends(get_database)],
+    batcher: Annotated[Optional[AnswerBatcher], Depends(get_answer_batcher)],
 ):
     """Add an answer to a question."""
     if not answer_data.text:
@@ -90,14 +320,112 @@ async def create_answer(
             detail="Answer text cannot be empty",
         )
 
-    await get_question_by_id(database=database, question_id=question_id)
+    created_at = datetime.now(timezone.utc)
+    if batcher is not None:
+        # Group commit: the session is never used, so no connection is held
+        # while the answer waits for its batch.
+        try:
+            new_answer = await batcher.submit(
+                {
+                    "text": answer_data.text,
+                    "question_id": question_id,
+                    "user_id": answer_data.user_id,
+                    "created_at": created_at,
+                }
+            )
+        except QuestionNotFound:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Question with id {question_id} not found",
+            )
+        except BatcherOverloaded:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many answers are being written, try again later",
+                headers={"Retry-After": "1"},
+            )
+        await cache.delete(question_key(question_id))
+        await publish_answers_created(question_id, [new_answer])
+        return new_answer
 
-    new_answer = Answer(
-        text=answer_data.text,
-        question_id=question_id,
-        user_id=answer_data.user_id,
+    # Counting the answer doubles as the existence check for the question
+    # and keeps the listing counters in the same transaction.
+    if await database.scalar(answers_added(question_id, 1, created_at)) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Question with id {question_id} not found",
+        )
+
+    new_answer = await database.scalar(
+        insert(Answer)
+        .values(
+            text=answer_data.text,
+            question_id=question_id,
+            user_id=answer_data.user_id,
+            created_at=created_at,
+        )
+        .returning(Answer)
     )
-    database.add(new_answer)
     await database.commit()
-    await database.refresh(new_answer)
+
+    await cache.delete(question_key(question_id))
+    await publish_answers_created(question_id, [new_answer])
     return new_answer
+
+
+@router.post(
+    "/{question_id}/answers/batch",
+    response_model=list[AnswerBatchItemResult],
+)
+async def create_answers_batch(
+    question_id: int,
+    items: Annotated[list[Any], Body(max_length=settings.batch_max_items)],
+    database: Annotated[AsyncSession, Depends(get_database)],
+):
+    """Add many answers to a question at once, reporting the outcome of each item."""
+
+    valid, results = validate_batch(items, AnswerCreate)
+
+    if not valid:
+        await get_question_by_id(database=database, question_id=question_id)
+
+    if valid:
+        created_at = datetime.now(timezone.utc)
+        if await database.scalar(answers_added(question_id, len(valid), created_at)) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Question with id {question_id} not found",
+            )
+
+        # sort_by_parameter_order keeps RETURNING rows aligned with the input.
+        created = await database.execute(
+            insert(Answer).returning(
+                Answer.id,
+                Answer.text,
+                Answer.user_id,
+                Answer.created_at,
+                Answer.question_id,
+                sort_by_parameter_order=True,
+            ),
+            [
+                {
+                    "text": answer_data.text,
+                    "user_id": answer_data.user_id,
+                    "question_id": question_id,
+                    "created_at": created_at,
+                }
+                for _, answer_data in valid
+            ],
+        )
+        rows = created.all()
+        for (index, _), row in zip(valid, rows):
+            results[index] = {
+                "index": index,
+                "status": BatchItemStatus.created,
+                "answer": dict(row._mapping),
+            }
+        await database.commit()
+        await cache.delete(question_key(question_id))
+        await publish_answers_created(question_id, rows)
+
+    return [results[index] for index in range(len(items))]
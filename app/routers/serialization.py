@@ -0,0 +1,69 @@
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
+
+from app.models.Answer import Answer
+from app.models.Question import Question
+
+# Row shapes mirroring app.schemas field for field and in the same order, so
+# dump_json produces the same bytes as the models without validating plain
+# column values a second time. The schemas stay the source of the OpenAPI.
+
+
+class AnswerRow(TypedDict):
+    text: str
+    id: int
+    user_id: UUID
+    created_at: datetime
+    question_id: int
+
+
+class QuestionRow(TypedDict):
+    text: str
+    id: int
+    created_at: datetime
+
+
+class QuestionListRow(QuestionRow):
+    answer_count: int
+    last_answer_at: Optional[datetime]
+
+
+class QuestionPageRow(TypedDict):
+    items: list[QuestionListRow]
+    next_cursor: Optional[str]
+
+
+class QuestionWithAnswersRow(QuestionRow):
+    answers: list[AnswerRow]
+
+
+class QuestionLookupRow(TypedDict):
+    items: list[QuestionListRow]
+    missing: list[int]
+
+
+class AnswerLookupRow(TypedDict):
+    items: list[AnswerRow]
+    missing: list[int]
+
+
+answer_json = TypeAdapter(AnswerRow)
+question_page_json = TypeAdapter(QuestionPageRow)
+question_with_answers_json = TypeAdapter(QuestionWithAnswersRow)
+question_lookup_json = TypeAdapter(QuestionLookupRow)
+answer_lookup_json = TypeAdapter(AnswerLookupRow)
+
+ANSWER_COLUMNS = (Answer.text, Answer.id, Answer.user_id, Answer.created_at, Answer.question_id)
+QUESTION_COLUMNS = (Question.text, Question.id, Question.created_at)
+QUESTION_LIST_COLUMNS = QUESTION_COLUMNS + (Question.answer_count, Question.last_answer_at)
+
+
+def raw_json_response(adapter: TypeAdapter, value: Any) -> Response:
+    """Encode plain rows straight to a JSON response, bypassing response_model."""
+
+    return Response(content=adapter.dump_json(value), media_type="application/json")
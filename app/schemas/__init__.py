@@ -1,28 +1,47 @@
+from app.schemas.batch import BatchItemResult, BatchItemStatus
 from app.schemas.question import (
     QuestionBase,
+    QuestionBatchItemResult,
     QuestionCreate,
+    QuestionListItem,
     QuestionUpdate,
     QuestionResponse,
+    QuestionPage,
     QuestionWithAnswers,
 )
 from app.schemas.answer import (
     AnswerBase,
+    AnswerBatchItemResult,
     AnswerCreate,
     AnswerUpdate,
     AnswerResponse,
 )
+from app.schemas.lookup import AnswerLookup, LookupRequest, QuestionLookup
+from app.schemas.search import AnswerSnippet, QuestionSearchHit, QuestionSearchPage
 
 # Resolve forward references after all imports
 QuestionWithAnswers.model_rebuild()
 
 __all__ = [
+    "BatchItemResult",
+    "BatchItemStatus",
     "QuestionBase",
+    "QuestionBatchItemResult",
     "QuestionCreate",
+    "QuestionListItem",
     "QuestionUpdate",
     "QuestionResponse",
+    "QuestionPage",
     "QuestionWithAnswers",
     "AnswerBase",
+    "AnswerBatchItemResult",
     "AnswerCreate",
     "AnswerUpdate",
     "AnswerResponse",
+    "AnswerLookup",
+    "LookupRequest",
+    "QuestionLookup",
+    "AnswerSnippet",
+    "QuestionSearchHit",
+    "QuestionSearchPage",
 ]
@@ -4,6 +4,8 @@ from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from .batch import BatchItemResult
+
 
 class AnswerBase(BaseModel):
     """Base schema for Answer with common fields."""
@@ -33,3 +35,9 @@ class AnswerResponse(AnswerBase):
     user_id: UUID
     created_at: datetime
     question_id: int
+
+
+class AnswerBatchItemResult(BatchItemResult):
+    """Schema for the result of one answer in a batch create."""
+
+    answer: Optional[AnswerResponse] = None
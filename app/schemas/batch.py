@@ -0,0 +1,20 @@
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class BatchItemStatus(str, Enum):
+    """Outcome of a single item in a batch request."""
+
+    created = "created"
+    duplicate = "duplicate"
+    invalid = "invalid"
+
+
+class BatchItemResult(BaseModel):
+    """Base schema for the per-item result of a batch request."""
+
+    index: int
+    status: BatchItemStatus
+    detail: Optional[str] = None
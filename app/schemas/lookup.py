@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+
+from .answer import AnswerResponse
+from .question import QuestionListItem
+
+
+class LookupRequest(BaseModel):
+    """Schema for fetching many items by id in one request."""
+
+    ids: list[int] = Field(min_length=1)
+
+
+class QuestionLookup(BaseModel):
+    """Schema for questions fetched by id, in the order they were asked for."""
+
+    items: list[QuestionListItem]
+    missing: list[int] = []
+
+
+class AnswerLookup(BaseModel):
+    """Schema for answers fetched by id, in the order they were asked for."""
+
+    items: list[AnswerResponse]
+    missing: list[int] = []
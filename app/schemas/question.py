@@ -3,6 +3,8 @@ from typing import Optional, TYPE_CHECKING
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from .batch import BatchItemResult
+
 if TYPE_CHECKING:
     from .answer import AnswerResponse
 
@@ -37,6 +39,26 @@ class QuestionResponse(QuestionBase):
 
 
 
+class QuestionListItem(QuestionResponse):
+    """Schema for Question in listings, with a summary of its answers."""
+
+    answer_count: int
+    last_answer_at: Optional[datetime] = None
+
+
+class QuestionPage(BaseModel):
+    """Schema for one page of questions in keyset order."""
+
+    items: list[QuestionListItem]
+    next_cursor: Optional[str] = None
+
+
+class QuestionBatchItemResult(BatchItemResult):
+    """Schema for the result of one question in a batch create."""
+
+    question: Optional[QuestionResponse] = None
+
+
 class QuestionWithAnswers(QuestionResponse):
     """Schema for Question with nested answers."""
 
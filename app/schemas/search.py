@@ -0,0 +1,26 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from .question import QuestionResponse
+
+
+class AnswerSnippet(BaseModel):
+    """Schema for a highlighted excerpt of a matching answer."""
+
+    answer_id: int
+    snippet: str
+
+
+class QuestionSearchHit(QuestionResponse):
+    """Schema for a question found by full-text search."""
+
+    score: float
+    answers: list[AnswerSnippet] = []
+
+
+class QuestionSearchPage(BaseModel):
+    """Schema for one page of search results, best match first."""
+
+    items: list[QuestionSearchHit]
+    next_cursor: Optional[str] = None
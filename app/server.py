@@ -0,0 +1,104 @@
+"""
+Production entry point: serves app.main:app with the process model and
+HTTP tuning taken from the settings.
+
+    python -m app.server
+"""
+
+import logging
+import math
+import os
+import tempfile
+from typing import Any
+
+import uvicorn
+
+from app.config import settings
+
+logger = logging.getLogger("app.server")
+
+
+def worker_count() -> int:
+    """SERVER_WORKERS, or one worker per CPU this process may run on."""
+
+    if settings.server_workers > 0:
+        return settings.server_workers
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def process_local_backends() -> list[str]:
+    """Configured backends whose state lives in one process, with the effect."""
+
+    found = []
+    if settings.event_broker == "memory":
+        found.append(
+            "EVENT_BROKER=memory: answer streams miss the writes handled by other workers"
+        )
+        if settings.cache_enabled:
+            found.append(
+                "CACHE_ENABLED with EVENT_BROKER=memory: other workers serve stale responses "
+                "for up to CACHE_TTL_SECONDS after a write"
+            )
+    if settings.idempotency_enabled and settings.idempotency_store == "memory":
+        found.append(
+            "IDEMPOTENCY_STORE=memory: a retry that reaches another worker writes again"
+        )
+    return found
+
+
+def uvicorn_options() -> dict[str, Any]:
+    return {
+        "host": settings.server_host,
+        "port": settings.server_port,
+        "workers": worker_count(),
+        # "auto" picks uvloop and httptools when they are installed.
+        "loop": settings.server_loop,
+        "http": settings.server_http,
+        "backlog": settings.server_backlog,
+        "timeout_keep_alive": settings.server_keep_alive_seconds,
+        # Recycled workers are replaced by the supervisor.
+        "limit_max_requests": settings.server_max_requests or None,
+        # On shutdown uvicorn stops accepting, waits this long for running
+        # requests and only then runs the lifespan shutdown, so this wait is
+        # the drain; the lifespan's own drain finds little left to wait for.
+        "timeout_graceful_shutdown": max(math.ceil(settings.shutdown_drain_seconds), 1),
+        "access_log": settings.server_access_log,
+    }
+
+
+def main() -> None:
+    options = uvicorn_options()
+    workers = options["workers"]
+
+    # Workers are separate processes: /metrics is only complete when each of
+    # them publishes its snapshot to a shared directory. The workers read
+    # their settings from the environment, so they inherit it.
+    if workers > 1 and not settings.metrics_dir:
+        os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="app-metrics-")
+
+    # Workers with process-local backends would serve stale or duplicated
+    # results to each other's clients: refuse to start rather than degrade.
+    backends = process_local_backends() if workers > 1 else []
+    if backends:
+        raise SystemExit(
+            f"{workers} workers cannot share process-local backends; use SERVER_WORKERS=1 "
+            "or EVENT_BROKER=postgres and IDEMPOTENCY_STORE=database:\n  "
+            + "\n  ".join(backends)
+        )
+
+    logging.basicConfig(level=logging.INFO)
+    logger.info(
+        "starting %d workers; up to %d database connections in total",
+        workers,
+        workers * (settings.db_pool_size + settings.db_max_overflow),
+    )
+    # Every worker imports the app itself and opens its own pools in the
+    # lifespan, so no connection is ever shared across processes.
+    uvicorn.run("app.main:app", **options)
+
+
+if __name__ == "__main__":
+    main()
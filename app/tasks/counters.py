@@ -0,0 +1,95 @@
+"""
+Recompute the denormalized answer_count and last_answer_at of questions.
+
+The write paths keep the counters exact; this repairs drift left by manual
+fixes or writers that bypass the API. Questions are walked in id order in
+chunks, one short transaction per chunk, and only rows that differ are
+written.
+
+    python -m app.tasks.counters --chunk-size 1000
+"""
+
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.backend.async_database import db
+from app.models.Answer import Answer
+from app.models.Question import Question
+
+logger = logging.getLogger("app.tasks.counters")
+
+
+async def repair_answer_counters(
+    sessions: async_sessionmaker[AsyncSession], chunk_size: int = 1000
+) -> int:
+    """Fix every question whose counters disagree with its answers; returns how many."""
+
+    count = (
+        select(func.count(Answer.id))
+        .where(Answer.question_id == Question.id)
+        .scalar_subquery()
+    )
+    latest = (
+        select(func.max(Answer.created_at))
+        .where(Answer.question_id == Question.id)
+        .scalar_subquery()
+    )
+
+    repaired = 0
+    last_id = 0
+    while True:
+        async with sessions() as database:
+            chunk_end = await database.scalar(
+                select(func.max(Question.id)).where(
+                    Question.id.in_(
+                        select(Question.id)
+                        .where(Question.id > last_id)
+                        .order_by(Question.id)
+                        .limit(chunk_size)
+                    )
+                )
+            )
+            if chunk_end is None:
+                break
+
+            fixed = (
+                await database.scalars(
+                    update(Question)
+                    .where(
+                        Question.id > last_id,
+                        Question.id <= chunk_end,
+                        (Question.answer_count != count)
+                        | Question.last_answer_at.is_distinct_from(latest),
+                    )
+                    .values(answer_count=count, last_answer_at=latest)
+                    .returning(Question.id)
+                )
+            ).all()
+            await database.commit()
+
+        if fixed:
+            logger.info("repaired counters of %d questions up to id %d", len(fixed), chunk_end)
+        repaired += len(fixed)
+        last_id = chunk_end
+
+    logger.info("counter repair finished: %d questions repaired", repaired)
+    return repaired
+
+
+async def main(chunk_size: int) -> None:
+    try:
+        await repair_answer_counters(db.sessions, chunk_size)
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute question answer counters.")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    arguments = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    asyncio.run(main(arguments.chunk_size))
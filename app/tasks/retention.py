@@ -0,0 +1,370 @@
+"""
+Delete answers and questions that are past the retention policy.
+
+Expired rows are removed in small chunks walked in (created_at, id) order,
+one short transaction per chunk with a pause in between, so live requests
+never queue behind long row locks and WAL is written at a steady rate.
+Answers go first, each chunk adjusting its questions' counters in the same
+transaction. Then questions whose text and latest answer are both past
+retention are removed: their answers chunk by chunk, then the questions.
+After every chunk the cached responses of its rows are invalidated and
+deletion events are published, as the DELETE endpoints do; the CLI reaches
+the app's workers only with EVENT_BROKER=postgres.
+
+With --checkpoint the position is saved after every chunk and a restarted
+run continues from it; without one a rerun just finds the remaining expired
+rows. On PostgreSQL an advisory lock keeps to one purge at a time.
+
+    python -m app.tasks.retention --answer-days 365 --question-days 730 --checkpoint purge.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import ColumnElement, Row, delete, func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.backend.async_database import db
+from app.backend.broker import broker
+from app.backend.cache import answer_key, cache, question_key
+from app.backend.counters import answers_removed
+from app.config import settings
+from app.models.Answer import Answer
+from app.models.Question import Question
+from app.routers.events import publish_answer_deleted, publish_question_deleted
+
+logger = logging.getLogger("app.tasks.retention")
+
+# pg_try_advisory_lock key held for the length of a purge.
+LOCK_KEY = 0x52455445
+
+PROGRESS_EVERY_SECONDS = 5.0
+
+
+@dataclass
+class Checkpoint:
+    """How far a purge has got, with the rows it has deleted so far."""
+
+    phase: str = "answers"  # then "questions"
+    created_at: Optional[datetime] = None
+    id: int = 0
+    answers: int = 0
+    questions: int = 0
+
+    @classmethod
+    def load(cls, path: Optional[Path]) -> "Checkpoint":
+        if path is None or not path.exists():
+            return cls()
+        data = json.loads(path.read_text())
+        if data["created_at"] is not None:
+            data["created_at"] = datetime.fromisoformat(data["created_at"])
+        return cls(**data)
+
+    def save(self, path: Optional[Path]) -> None:
+        if path is None:
+            return
+        data = asdict(self)
+        if self.created_at is not None:
+            data["created_at"] = self.created_at.isoformat()
+        # Written aside and renamed, so a crash never leaves half a file.
+        partial = path.with_name(path.name + ".tmp")
+        partial.write_text(json.dumps(data))
+        partial.replace(path)
+
+    def start_phase(self, phase: str) -> None:
+        self.phase, self.created_at, self.id = phase, None, 0
+
+
+class _Progress:
+    def __init__(self, checkpoint: Checkpoint) -> None:
+        self.started = self.logged = time.monotonic()
+        self.baseline = checkpoint.answers + checkpoint.questions
+
+    def report(self, checkpoint: Checkpoint, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self.logged < PROGRESS_EVERY_SECONDS:
+            return
+        self.logged = now
+        rows = checkpoint.answers + checkpoint.questions - self.baseline
+        elapsed = now - self.started
+        logger.info(
+            "retention %s: %d answers and %d questions deleted, %.0f rows/s",
+            checkpoint.phase,
+            checkpoint.answers,
+            checkpoint.questions,
+            rows / elapsed if elapsed > 0 else 0.0,
+        )
+
+
+async def _delete_answers(
+    database: AsyncSession, condition: ColumnElement[bool], chunk_size: int
+) -> list[Row]:
+    """Delete up to chunk_size matching answers, oldest first, and uncount them."""
+
+    chunk = (
+        select(Answer.id)
+        .where(condition)
+        .order_by(Answer.created_at, Answer.id)
+        .limit(chunk_size)
+    )
+    deleted = (
+        await database.execute(
+            delete(Answer)
+            .where(Answer.id.in_(chunk))
+            .returning(Answer.id, Answer.question_id, Answer.created_at)
+        )
+    ).all()
+
+    removed: dict[int, tuple[int, datetime]] = {}
+    for row in deleted:
+        count, newest = removed.get(row.question_id, (0, row.created_at))
+        removed[row.question_id] = (count + 1, max(newest, row.created_at))
+    if removed:
+        await database.execute(
+            answers_removed(),
+            [
+                {"question_id": question_id, "removed": count, "newest_removed": newest}
+                for question_id, (count, newest) in removed.items()
+            ],
+        )
+    return deleted
+
+
+async def _answers_deleted(deleted: list[Row]) -> None:
+    """Invalidate the cached responses of committed deleted answers and announce them."""
+
+    # One invalidation for the chunk. The events wait for room in the
+    # broker's outbox rather than being dropped; the broker packs them into
+    # as few NOTIFYs as fit.
+    await cache.delete(
+        *(answer_key(row.id) for row in deleted),
+        *{question_key(row.question_id) for row in deleted},
+    )
+    for row in deleted:
+        await publish_answer_deleted(row.question_id, row.id, wait=True)
+
+
+async def _purge_answers(
+    sessions: async_sessionmaker[AsyncSession],
+    cutoff: datetime,
+    checkpoint: Checkpoint,
+    chunk_size: int,
+    pause: float,
+    checkpoint_path: Optional[Path],
+    progress: _Progress,
+) -> None:
+    while True:
+        condition = Answer.created_at < cutoff
+        if checkpoint.created_at is not None:
+            # Starting after the last deleted row skips the dead index
+            # entries the earlier chunks left behind.
+            condition &= tuple_(Answer.created_at, Answer.id) > (
+                checkpoint.created_at,
+                checkpoint.id,
+            )
+        async with sessions() as database:
+            deleted = await _delete_answers(database, condition, chunk_size)
+            await database.commit()
+        if not deleted:
+            return
+        await _answers_deleted(deleted)
+
+        checkpoint.answers += len(deleted)
+        checkpoint.created_at, checkpoint.id = max((row.created_at, row.id) for row in deleted)
+        checkpoint.save(checkpoint_path)
+        progress.report(checkpoint)
+        await asyncio.sleep(pause)
+
+
+async def _purge_questions(
+    sessions: async_sessionmaker[AsyncSession],
+    cutoff: datetime,
+    checkpoint: Checkpoint,
+    chunk_size: int,
+    pause: float,
+    checkpoint_path: Optional[Path],
+    progress: _Progress,
+) -> None:
+    expired = (Question.created_at < cutoff) & or_(
+        Question.last_answer_at.is_(None), Question.last_answer_at < cutoff
+    )
+    while True:
+        condition = expired
+        if checkpoint.created_at is not None:
+            condition &= tuple_(Question.created_at, Question.id) > (
+                checkpoint.created_at,
+                checkpoint.id,
+            )
+        async with sessions() as database:
+            chunk = (
+                await database.execute(
+                    select(Question.id, Question.created_at)
+                    .where(condition)
+                    .order_by(Question.created_at, Question.id)
+                    .limit(chunk_size)
+                )
+            ).all()
+        if not chunk:
+            return
+        ids = [row.id for row in chunk]
+
+        # Answers first, so that no DELETE cascades into an unbounded number
+        # of rows. Only expired ones: an answer arriving meanwhile revives
+        # its question, which is then kept below.
+        while True:
+            async with sessions() as database:
+                deleted = await _delete_answers(
+                    database,
+                    Answer.question_id.in_(ids) & (Answer.created_at < cutoff),
+                    chunk_size,
+                )
+                await database.commit()
+            if not deleted:
+                break
+            await _answers_deleted(deleted)
+            checkpoint.answers += len(deleted)
+            progress.report(checkpoint)
+            await asyncio.sleep(pause)
+
+        async with sessions() as database:
+            removed = (
+                await database.scalars(
+                    delete(Question).where(Question.id.in_(ids), expired).returning(Question.id)
+                )
+            ).all()
+            await database.commit()
+        await cache.delete_tag(*(question_key(question_id) for question_id in removed))
+        for question_id in removed:
+            await publish_question_deleted(question_id, wait=True)
+
+        checkpoint.questions += len(removed)
+        checkpoint.created_at, checkpoint.id = chunk[-1].created_at, chunk[-1].id
+        checkpoint.save(checkpoint_path)
+        progress.report(checkpoint)
+        await asyncio.sleep(pause)
+
+
+@asynccontextmanager
+async def _exclusive(engine: AsyncEngine) -> AsyncIterator[bool]:
+    """Hold the purge lock for the run; yields False if another purge has it."""
+
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+
+    async with engine.connect() as connection:
+        # Autocommit: an open transaction held for the whole run would keep
+        # VACUUM from reclaiming the rows being purged.
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        locked = await connection.scalar(select(func.pg_try_advisory_lock(LOCK_KEY)))
+        try:
+            yield locked
+        finally:
+            if locked:
+                await connection.scalar(select(func.pg_advisory_unlock(LOCK_KEY)))
+
+
+async def purge_expired(
+    sessions: async_sessionmaker[AsyncSession],
+    answer_days: int,
+    question_days: int,
+    chunk_size: int = 500,
+    pause: float = 0.1,
+    checkpoint_path: Optional[Path] = None,
+) -> Checkpoint:
+    """
+    Apply the retention policy once; a days value of 0 keeps those rows.
+    Returns the final checkpoint, which holds the number of deleted rows.
+    """
+
+    checkpoint = Checkpoint.load(checkpoint_path)
+    now = datetime.now(timezone.utc)
+
+    async with _exclusive(sessions.kw["bind"]) as acquired:
+        if not acquired:
+            logger.info("another retention purge is running, skipping this one")
+            return checkpoint
+
+        progress = _Progress(checkpoint)
+        if checkpoint.phase == "answers":
+            if answer_days > 0:
+                await _purge_answers(
+                    sessions,
+                    now - timedelta(days=answer_days),
+                    checkpoint,
+                    chunk_size,
+                    pause,
+                    checkpoint_path,
+                    progress,
+                )
+            checkpoint.start_phase("questions")
+            checkpoint.save(checkpoint_path)
+        if question_days > 0:
+            await _purge_questions(
+                sessions,
+                now - timedelta(days=question_days),
+                checkpoint,
+                chunk_size,
+                pause,
+                checkpoint_path,
+                progress,
+            )
+        progress.report(checkpoint, force=True)
+
+    if checkpoint_path is not None:
+        checkpoint_path.unlink(missing_ok=True)
+    return checkpoint
+
+
+async def run_periodically(sessions: async_sessionmaker[AsyncSession], interval: float) -> None:
+    """Apply the retention settings every interval seconds until cancelled."""
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await purge_expired(
+                sessions,
+                settings.retention_answer_days,
+                settings.retention_question_days,
+                settings.retention_chunk_size,
+                settings.retention_pause_seconds,
+            )
+        except Exception:
+            logger.exception("retention purge failed")
+
+
+async def main(arguments: argparse.Namespace) -> None:
+    # Carries invalidations and deletion events to the app's workers.
+    await broker.start()
+    try:
+        await purge_expired(
+            db.sessions,
+            arguments.answer_days,
+            arguments.question_days,
+            arguments.chunk_size,
+            arguments.pause,
+            arguments.checkpoint,
+        )
+    finally:
+        await broker.stop()
+        await db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete answers and questions past retention.")
+    parser.add_argument("--answer-days", type=int, default=settings.retention_answer_days)
+    parser.add_argument("--question-days", type=int, default=settings.retention_question_days)
+    parser.add_argument("--chunk-size", type=int, default=settings.retention_chunk_size)
+    parser.add_argument("--pause", type=float, default=settings.retention_pause_seconds)
+    parser.add_argument("--checkpoint", type=Path, help="file to save progress to and resume from")
+    arguments = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    asyncio.run(main(arguments))
@@ -0,0 +1,73 @@
+"""
+Bandwidth saved and CPU spent compressing a question with its answers.
+
+For every coding this process can produce, at the configured levels,
+reports the compressed size and the time per compression, and compares it
+with serving the same body from the ETag-keyed cache of compressed bodies.
+
+    python -m benchmarks.compression --answers 10 100 1000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import timeit
+
+from app.backend.cache import LRUTTLCache
+from app.backend.compression import Compressor, available_codecs
+from app.config import settings
+from app.routers.serialization import question_with_answers_json
+from benchmarks.serialization import build
+
+
+def cached_seconds(compressor: Compressor, coding: str, body: bytes, number: int) -> float:
+    async def run() -> float:
+        await compressor.compress(coding, body, etag='W/"q1-bench"')
+        started = time.perf_counter()
+        for _ in range(number):
+            await compressor.compress(coding, body, etag='W/"q1-bench"')
+        return (time.perf_counter() - started) / number
+
+    return asyncio.run(run())
+
+
+def measure(answers: int, repeat: int) -> dict:
+    _, rows = build(answers)
+    body = question_with_answers_json.dump_json(rows)
+    codecs = available_codecs(
+        settings.compression_gzip_level,
+        settings.compression_zstd_level,
+        settings.compression_brotli_level,
+    )
+
+    number = max(1, 2_000 // max(answers, 1))
+    result = {"identity_bytes": len(body)}
+    for coding, codec in codecs.items():
+        compressed = codec(body)
+        best = min(timeit.repeat(lambda: codec(body), number=number, repeat=repeat)) / number
+        compressor = Compressor(
+            codecs, LRUTTLCache(max_entries=10, max_bytes=len(body) * 10, ttl=60), min_bytes=0
+        )
+        cached = cached_seconds(compressor, coding, body, number * 10)
+        result[coding] = {
+            "bytes": len(compressed),
+            "saved_pct": round(100 * (1 - len(compressed) / len(body)), 1),
+            "us_per_call": round(best * 1e6, 2),
+            "mb_per_s": round(len(body) / best / 1e6, 1),
+            "cached_us_per_call": round(cached * 1e6, 2),
+        }
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answers", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps({str(answers): measure(answers, args.repeat) for answers in args.answers}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+"""
+Load and benchmark suite for the questions and answers routers.
+
+Seeds a synthetic dataset through the batch endpoints, drives every route
+at a fixed concurrency and reports req/s, latency percentiles and SQL
+queries per request (read from the Server-Timing header) as JSON.
+
+    python -m benchmarks.run --questions 2000 --concurrency 32 --output bench.json
+    python -m benchmarks.run --baseline bench.json --runs 5 --max-regression 0.15
+    python -m benchmarks.run --url http://127.0.0.1:8000
+
+Without --url the app runs in-process over httpx's ASGITransport against
+--database-url (a throwaway SQLite file by default).
+
+Every scenario runs --runs times and the medians are reported, so a single
+noisy run cannot fail the comparison with --baseline.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.seed import Dataset, seed
+
+_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+# Runs shorter than this are too noisy to compare throughput or latency.
+MIN_TIMED_SAMPLES = 200
+# Below this many requests per run p99 is little more than the slowest
+# request, so latency is compared at the median instead.
+MIN_P99_SAMPLES = 1000
+
+RequestSpec = tuple[str, str, Any]
+
+
+@dataclass
+class Scenario:
+    name: str
+    build: Callable[[Dataset, random.Random, int], RequestSpec]
+    destructive: bool = False
+
+
+def popular(ids: list[int], rng: random.Random) -> int:
+    """Zipf-like pick: the first (most answered) questions are the hottest."""
+    return ids[min(int(rng.paretovariate(1.2)) - 1, len(ids) - 1)]
+
+
+SCENARIOS = [
+    Scenario("list_questions", lambda data, rng, i: ("GET", "/questions/?limit=50", None)),
+    Scenario(
+        "get_question",
+        lambda data, rng, i: ("GET", f"/questions/{popular(data.question_ids, rng)}", None),
+    ),
+    Scenario(
+        "get_answer",
+        lambda data, rng, i: ("GET", f"/answers/{rng.choice(data.answer_ids)}", None),
+    ),
+    Scenario(
+        "lookup_questions",
+        lambda data, rng, i: (
+            "GET",
+            "/questions/lookup?ids=" + ",".join(map(str, rng.sample(data.question_ids, min(50, len(data.question_ids))))),
+            None,
+        ),
+    ),
+    Scenario(
+        "lookup_answers",
+        lambda data, rng, i: (
+            "POST",
+            "/answers/lookup",
+            {"ids": rng.sample(data.answer_ids, min(50, len(data.answer_ids)))},
+        ),
+    ),
+    Scenario(
+        "search_questions",
+        lambda data, rng, i: (
+            "GET",
+            # Common seeded words, so ranking works through the full candidate set.
+            "/questions/search?limit=20&q=" + rng.choice(["benchmark", "lorem ipsum", "benchmark answer"]),
+            None,
+        ),
+    ),
+    Scenario(
+        "create_question",
+        lambda data, rng, i: ("POST", "/questions/", {"text": f"Load question {uuid.uuid4()}?"}),
+    ),
+    Scenario(
+        "create_answer",
+        lambda data, rng, i: (
+            "POST",
+            f"/questions/{popular(data.question_ids, rng)}/answers/",
+            {"text": "Load answer", "user_id": str(uuid.uuid4())},
+        ),
+    ),
+    Scenario(
+        "create_questions_batch",
+        lambda data, rng, i: (
+            "POST",
+            "/questions/batch",
+            [{"text": f"Load batch question {uuid.uuid4()}?"} for _ in range(50)],
+        ),
+    ),
+    Scenario(
+        "create_answers_batch",
+        lambda data, rng, i: (
+            "POST",
+            f"/questions/{popular(data.question_ids, rng)}/answers/batch",
+            [{"text": "Load batch answer", "user_id": str(uuid.uuid4())} for _ in range(50)],
+        ),
+    ),
+    Scenario(
+        "delete_answer",
+        lambda data, rng, i: ("DELETE", f"/answers/{data.answer_ids.pop()}", None),
+        destructive=True,
+    ),
+    Scenario(
+        "delete_question",
+        lambda data, rng, i: ("DELETE", f"/questions/{data.question_ids.pop()}", None),
+        destructive=True,
+    ),
+]
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+async def run_scenario(
+    client: AsyncClient,
+    scenario: Scenario,
+    dataset: Dataset,
+    requests: int,
+    concurrency: int,
+    rng: random.Random,
+) -> dict[str, float]:
+    latencies: list[float] = []
+    queries: list[int] = []
+    errors = 0
+    issued = itertools.count()
+
+    async def worker() -> None:
+        nonlocal errors
+        while next(issued) < requests:
+            method, url, payload = scenario.build(dataset, rng, len(latencies))
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, json=payload)
+            except Exception:
+                # The in-process app raises instead of answering 500.
+                latencies.append(time.perf_counter() - started)
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+            match = _QUERIES.search(response.headers.get("server-timing", ""))
+            if match:
+                queries.append(int(match.group(1)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "queries_per_request": round(sum(queries) / len(queries), 3) if queries else None,
+        # Cache hits run no queries, so the mean varies; the most any
+        # request needed does not.
+        "max_queries": max(queries) if queries else None,
+    }
+
+
+def summarize(runs: list[dict[str, float]]) -> dict[str, Any]:
+    """
+    Medians of the runs of one scenario; requests and errors are totals.
+    The timings of every run are kept too, as the spread a later comparison
+    has to exceed.
+    """
+
+    queries = [run["queries_per_request"] for run in runs if run["queries_per_request"] is not None]
+    max_queries = [run["max_queries"] for run in runs if run["max_queries"] is not None]
+    summary = {
+        "runs": len(runs),
+        "requests": sum(run["requests"] for run in runs),
+        "errors": sum(run["errors"] for run in runs),
+    }
+    for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+        summary[key] = round(statistics.median(run[key] for run in runs), 3)
+    summary["per_run"] = {key: [run[key] for run in runs] for key in ("rps", "p50_ms", "p99_ms")}
+    summary["queries_per_request"] = round(statistics.median(queries), 3) if queries else None
+    summary["max_queries"] = max(max_queries) if max_queries else None
+    return summary
+
+
+def compare(
+    results: dict, baseline: dict, tolerance: float, latency_tolerance: float
+) -> list[str]:
+    """Describe every scenario that got slower or failed more than the baseline allows."""
+
+    regressions = []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        # Failing fast would otherwise look like a speedup. Runs may differ
+        # in length, so error rates are compared.
+        error_rate = current["errors"] / max(current["requests"], 1)
+        previous_rate = previous.get("errors", 0) / max(previous.get("requests", 1), 1)
+        if error_rate > previous_rate:
+            regressions.append(
+                f"{name}: error rate {error_rate:.2%} > baseline {previous_rate:.2%}"
+            )
+        previous_queries = previous.get("max_queries")
+        if previous_queries is not None and (current["max_queries"] or 0) > previous_queries:
+            regressions.append(
+                f"{name}: {current['max_queries']} queries/request > baseline {previous_queries}"
+            )
+
+        samples = min(
+            current["requests"] / current.get("runs", 1),
+            previous["requests"] / previous.get("runs", 1),
+        )
+        if samples < MIN_TIMED_SAMPLES:
+            continue
+        # The median has to fall outside every baseline run, not just the
+        # baseline's median: writes on a shared lock vary a lot run to run.
+        per_run = previous.get("per_run", {})
+        slowest_rps = min(per_run.get("rps") or [previous["rps"]])
+        if current["rps"] < slowest_rps * (1 - tolerance):
+            regressions.append(f"{name}: rps {current['rps']} < baseline {slowest_rps}")
+        latency = "p99_ms" if samples >= MIN_P99_SAMPLES else "p50_ms"
+        slowest = max(per_run.get(latency) or [previous[latency]])
+        if current[latency] > slowest * (1 + latency_tolerance):
+            regressions.append(
+                f"{name}: {latency[:3]} {current[latency]}ms > baseline {slowest}ms"
+            )
+    return regressions
+
+
+async def in_process_client(database_url: str) -> AsyncClient:
+    """Client for the app in this process, bound to its own database."""
+
+    from sqlalchemy import event
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.backend.Base import Base
+    from app.backend.async_database import (
+        create_session_factory,
+        get_database,
+        get_read_database,
+    )
+    from app.main import app
+
+    is_sqlite = database_url.startswith("sqlite")
+    # SQLite serializes writers; concurrent writes wait for the lock rather
+    # than fail after the default five seconds.
+    engine = create_async_engine(database_url, connect_args={"timeout": 60} if is_sqlite else {})
+    if is_sqlite:
+
+        @event.listens_for(engine.sync_engine, "connect")
+        def _enable_foreign_keys(dbapi_connection, connection_record) -> None:
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    sessions = create_session_factory(engine)
+
+    async def _get_db():
+        async with sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_database] = _get_db
+    app.dependency_overrides[get_read_database] = _get_db
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+
+async def main(args: argparse.Namespace) -> int:
+    if args.url:
+        client = AsyncClient(base_url=args.url, timeout=60)
+    else:
+        database_url = args.database_url or (
+            f"sqlite+aiosqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}"
+        )
+        client = await in_process_client(database_url)
+
+    rng = random.Random(args.seed)
+    selected = set(args.scenario or [scenario.name for scenario in SCENARIOS])
+
+    async with client:
+        dataset = await seed(
+            client,
+            questions=args.questions,
+            answers_mean=args.answers_mean,
+            answers_alpha=args.answers_alpha,
+            answers_cap=args.answers_cap,
+            seed_value=args.seed,
+        )
+        results: dict[str, Any] = {"config": vars(args), "scenarios": {}}
+        for scenario in SCENARIOS:
+            if scenario.name not in selected:
+                continue
+            requests = args.requests
+            if scenario.destructive:
+                pool = dataset.answer_ids if scenario.name == "delete_answer" else dataset.question_ids
+                requests = min(requests, len(pool) // (2 * args.runs))
+            else:
+                await run_scenario(client, scenario, dataset, args.warmup, args.concurrency, rng)
+            runs = [
+                await run_scenario(client, scenario, dataset, requests, args.concurrency, rng)
+                for _ in range(args.runs)
+            ]
+            results["scenarios"][scenario.name] = summarize(runs)
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(report)
+    print(report)
+
+    if args.baseline:
+        regressions = compare(
+            results,
+            json.loads(Path(args.baseline).read_text()),
+            args.max_regression,
+            args.max_latency_regression,
+        )
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--database-url", help="async database URL for the in-process app")
+    parser.add_argument("--questions", type=int, default=1000)
+    parser.add_argument("--answers-mean", type=float, default=5.0, help="mean answers per question")
+    parser.add_argument("--answers-alpha", type=float, default=1.5, help="Pareto shape; lower is heavier-tailed")
+    parser.add_argument("--answers-cap", type=int, default=5000, help="upper bound of answers per question")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per run of a scenario")
+    parser.add_argument("--runs", type=int, default=5, help="runs per scenario; medians are reported")
+    parser.add_argument("--warmup", type=int, default=50, help="unrecorded requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--scenario", action="append", choices=[s.name for s in SCENARIOS])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.10, help="allowed rps drop vs baseline")
+    parser.add_argument(
+        "--max-latency-regression", type=float, default=0.25, help="allowed latency growth vs baseline"
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
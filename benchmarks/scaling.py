@@ -0,0 +1,114 @@
+"""
+Throughput of the production server (app.server) as workers are added.
+
+For every worker count a server is started against the configured database,
+several load-generator processes (benchmarks.run --url) drive the read
+routes in parallel, and their req/s are summed. Efficiency is req/s divided
+by workers times the single-worker req/s; near 1.0 means linear scaling.
+
+    python -m benchmarks.scaling --workers 1 2 4 8 --clients 8
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/openapi.json").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"server at {url} did not start")
+
+
+def measure(workers: int, args: argparse.Namespace) -> dict[str, float]:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "SERVER_WORKERS": str(workers), "SERVER_PORT": str(port), "SERVER_HOST": "127.0.0.1"}
+    server = subprocess.Popen([sys.executable, "-m", "app.server"], env=env)
+    try:
+        wait_ready(url)
+        with tempfile.TemporaryDirectory() as directory:
+            outputs = [Path(directory) / f"client-{index}.json" for index in range(args.clients)]
+            scenarios = [option for name in args.scenario for option in ("--scenario", name)]
+            clients = [
+                subprocess.Popen(
+                    [
+                        sys.executable, "-m", "benchmarks.run",
+                        "--url", url,
+                        "--questions", str(args.questions),
+                        "--requests", str(args.requests),
+                        "--concurrency", str(args.concurrency),
+                        "--seed", str(index),
+                        "--output", str(output),
+                        *scenarios,
+                    ],
+                    stdout=subprocess.DEVNULL,
+                )
+                for index, output in enumerate(outputs)
+            ]
+            for client in clients:
+                client.wait()
+
+            totals: dict[str, float] = {}
+            for output in outputs:
+                for name, result in json.loads(output.read_text())["scenarios"].items():
+                    totals[name] = totals.get(name, 0.0) + result["rps"]
+            return totals
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+
+
+def main() -> None:
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--workers", type=int, nargs="+",
+        default=sorted({1, *(2**power for power in range(1, 8) if 2**power <= cpus), cpus}),
+    )
+    parser.add_argument("--clients", type=int, default=cpus, help="load-generator processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="connections per client")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario per client")
+    parser.add_argument("--questions", type=int, default=200, help="questions seeded per client")
+    parser.add_argument("--scenario", action="append", default=None)
+    args = parser.parse_args()
+    args.scenario = args.scenario or ["list_questions", "get_question", "get_answer"]
+
+    results = {workers: measure(workers, args) for workers in args.workers}
+    baseline = results[min(results)]
+    report = {
+        str(workers): {
+            name: {
+                "rps": round(rps, 2),
+                "efficiency": round(rps / (workers / min(results) * baseline[name]), 3),
+            }
+            for name, rps in totals.items()
+        }
+        for workers, totals in results.items()
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
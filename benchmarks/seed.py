@@ -0,0 +1,70 @@
+import random
+import uuid
+from dataclasses import dataclass, field
+
+from httpx import AsyncClient
+
+BATCH_SIZE = 500
+
+
+@dataclass
+class Dataset:
+    """Ids created by the seeder, with the questions ordered by popularity."""
+
+    question_ids: list[int] = field(default_factory=list)
+    answer_ids: list[int] = field(default_factory=list)
+    answers_per_question: dict[int, int] = field(default_factory=dict)
+
+
+def answer_counts(questions: int, mean: float, alpha: float, cap: int, rng: random.Random) -> list[int]:
+    """
+    Heavy-tailed answers-per-question: a Pareto distribution scaled to the
+    requested mean, so most questions get a few answers and some get thousands.
+    """
+
+    if mean <= 0:
+        return [0] * questions
+    scale = mean * (alpha - 1) / alpha if alpha > 1 else mean
+    counts = [min(int(scale * rng.paretovariate(alpha)), cap) for _ in range(questions)]
+    return sorted(counts, reverse=True)
+
+
+async def seed(
+    client: AsyncClient,
+    questions: int,
+    answers_mean: float,
+    answers_alpha: float,
+    answers_cap: int,
+    seed_value: int,
+) -> Dataset:
+    """Create the synthetic dataset through the batch endpoints."""
+
+    rng = random.Random(seed_value)
+    dataset = Dataset()
+    run_id = uuid.uuid4().hex[:8]
+
+    for start in range(0, questions, BATCH_SIZE):
+        items = [
+            {"text": f"Benchmark question {run_id}-{index}?"}
+            for index in range(start, min(start + BATCH_SIZE, questions))
+        ]
+        response = await client.post("/questions/batch", json=items)
+        response.raise_for_status()
+        dataset.question_ids.extend(
+            item["question"]["id"] for item in response.json() if item["status"] == "created"
+        )
+
+    counts = answer_counts(len(dataset.question_ids), answers_mean, answers_alpha, answers_cap, rng)
+    for question_id, count in zip(dataset.question_ids, counts):
+        dataset.answers_per_question[question_id] = count
+        for start in range(0, count, BATCH_SIZE):
+            items = [
+                {"text": f"Benchmark answer {index} " + "lorem ipsum " * rng.randint(1, 20),
+                 "user_id": str(uuid.UUID(int=rng.getrandbits(128)))}
+                for index in range(start, min(start + BATCH_SIZE, count))
+            ]
+            response = await client.post(f"/questions/{question_id}/answers/batch", json=items)
+            response.raise_for_status()
+            dataset.answer_ids.extend(item["answer"]["id"] for item in response.json())
+
+    return dataset
@@ -0,0 +1,98 @@
+"""
+CPU cost of serializing a question with its answers, per answer.
+
+Compares the response_model path (ORM objects validated into the schema,
+dumped to Python and JSON-encoded, as FastAPI does), the cached-detail path
+(model_validate + model_dump_json) and the fast path (row dicts through a
+prebuilt TypeAdapter), and checks that all three produce the same JSON.
+
+    python -m benchmarks.serialization --answers 10 100 1000
+"""
+
+import argparse
+import json
+import timeit
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pydantic import TypeAdapter
+
+from app.models.Answer import Answer
+from app.models.Question import Question
+from app.routers.serialization import question_with_answers_json
+from app.schemas import QuestionWithAnswers
+
+response_model = TypeAdapter(QuestionWithAnswers)
+
+
+def build(answers: int) -> tuple[Question, dict]:
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    rows = {
+        "text": "How fast is serialization?",
+        "id": 1,
+        "created_at": created_at,
+        "answers": [
+            {
+                "text": f"Answer number {index} with a few more words in it",
+                "id": index + 1,
+                "user_id": uuid.uuid4(),
+                "created_at": created_at + timedelta(seconds=index),
+                "question_id": 1,
+            }
+            for index in range(answers)
+        ],
+    }
+    question = Question(**{key: value for key, value in rows.items() if key != "answers"})
+    question.answers = [Answer(**answer) for answer in rows["answers"]]
+    return question, rows
+
+
+def paths(question: Question, rows: dict) -> dict:
+    return {
+        "response_model": lambda: json.dumps(
+            response_model.dump_python(
+                response_model.validate_python(question, from_attributes=True), mode="json"
+            ),
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode(),
+        "model_dump_json": lambda: QuestionWithAnswers.model_validate(question)
+        .model_dump_json()
+        .encode(),
+        "fast_json": lambda: question_with_answers_json.dump_json(rows),
+    }
+
+
+def measure(answers: int, repeat: int) -> dict:
+    question, rows = build(answers)
+    candidates = paths(question, rows)
+
+    outputs = {name: json.loads(run()) for name, run in candidates.items()}
+    assert all(output == outputs["fast_json"] for output in outputs.values())
+
+    number = max(1, 20_000 // max(answers, 1))
+    result = {}
+    for name, run in candidates.items():
+        best = min(timeit.repeat(run, number=number, repeat=repeat)) / number
+        result[name] = {
+            "us_per_call": round(best * 1e6, 2),
+            "us_per_answer": round(best * 1e6 / max(answers, 1), 3),
+        }
+    baseline = result["response_model"]["us_per_answer"]
+    result["fast_json"]["saved_us_per_answer"] = round(
+        baseline - result["fast_json"]["us_per_answer"], 3
+    )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--answers", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps({str(answers): measure(answers, args.repeat) for answers in args.answers}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""full text search
+
+Revision ID: 2d047f460aaf
+Revises: a0b63f78efe2
+Create Date: 2026-10-18 10:00:12.540218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d047f460aaf'
+down_revision: Union[str, Sequence[str], None] = 'a0b63f78efe2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The search_vector columns are not mapped on the models (migrations/env.py
+# keeps autogenerate away from them); app.backend.search queries them.
+TABLES = ('questions', 'answers')
+
+# A generated STORED column would rewrite both tables under an ACCESS
+# EXCLUSIVE lock. Instead a nullable column (a catalog-only change) is kept
+# current by a trigger and existing rows are filled in short batches.
+BACKFILL_BATCH = 5000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TABLES:
+        op.add_column(table, sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+        op.execute(
+            f"""
+            CREATE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := to_tsvector('english', NEW.text);
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+            """
+        )
+        op.execute(
+            f"CREATE TRIGGER {table}_search_vector BEFORE INSERT OR UPDATE OF text ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()"
+        )
+
+    with op.get_context().autocommit_block():
+        # Each batch commits on its own, so row locks are held briefly.
+        connection = op.get_bind()
+        for table in TABLES:
+            while connection.execute(
+                sa.text(
+                    f"UPDATE {table} SET search_vector = to_tsvector('english', text) "
+                    f"WHERE id IN (SELECT id FROM {table} WHERE search_vector IS NULL LIMIT :batch)"
+                ),
+                {'batch': BACKFILL_BATCH},
+            ).rowcount:
+                pass
+
+        # Build the GIN indexes without blocking writes on large tables.
+        for table in TABLES:
+            op.create_index(
+                f'ix_{table}_search_vector', table, ['search_vector'],
+                unique=False, postgresql_using='gin', postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.execute(f"DROP TRIGGER {table}_search_vector ON {table}")
+        op.execute(f"DROP FUNCTION {table}_search_vector_update()")
+        op.drop_column(table, 'search_vector')
@@ -1,16 +1,16 @@
 from __future__ import annotations
 
+import os
 import sys
+import uuid
 from pathlib import Path
 import importlib.util
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Awaitable, Callable, Generator
 
 import pytest
-from fastapi import HTTPException, status
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import select
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import selectinload
 from sqlalchemy.pool import StaticPool
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
@@ -28,10 +28,15 @@ except ModuleNotFoundError:
     spec.loader.exec_module(module)
     sys.modules["aiosqlite"] = module
 
+# The test app is a single process; the database store is tested on its own.
+os.environ.setdefault("IDEMPOTENCY_STORE", "memory")
+
 from app.backend.Base import Base
-from app.backend.async_database import get_database
-from app.models.Answer import Answer
-from app.models.Question import Question
+from app.backend.async_database import get_database, get_read_database
+from app.backend.cache import cache
+from app.backend.compression import compressor
+from app.models.Answer import Answer  # noqa: F401
+from app.models.Question import Question  # noqa: F401
 from main import app
 
 
@@ -50,6 +55,14 @@ async def engine() -> AsyncGenerator[AsyncEngine, None]:
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, connection_record) -> None:
+        # SQLite only honours ON DELETE CASCADE with foreign keys switched on.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield engine
@@ -76,53 +89,51 @@ async def _override_db_dependency(session_factory: async_sessionmaker[AsyncSessi
             yield session
 
     app.dependency_overrides[get_database] = _get_db
+    app.dependency_overrides[get_read_database] = _get_db
     yield
     app.dependency_overrides.pop(get_database, None)
+    app.dependency_overrides.pop(get_read_database, None)
 
 
 @pytest.fixture(scope="function", autouse=True)
-def patch_dependency_functions():
-    from app.routers import dependencies as deps_module
-    from app.routers import questions as questions_router
-    from app.routers import answers as answers_router
-
-    async def _get_question_by_id(
-        question_id: int,
-        database: AsyncSession,
-    ) -> Question:
-        result = await database.execute(
-            select(Question).options(selectinload(Question.answers)).where(Question.id == question_id)
-        )
-        question = result.scalar_one_or_none()
-        if question is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Question with id {question_id} not found",
-            )
-        return question
-
-    async def _get_answer_by_id(
-        answer_id: int,
-        database: AsyncSession,
-    ) -> Answer:
-        answer = await database.scalar(select(Answer).where(Answer.id == answer_id))
-        if answer is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Answer with id {answer_id} not found",
-            )
-        return answer
-
-    deps_module.get_question_by_id = _get_question_by_id
-    deps_module.get_answer_by_id = _get_answer_by_id
-    questions_router.get_question_by_id = _get_question_by_id
-    answers_router.get_answer_by_id = _get_answer_by_id
-
+async def _clear_cache() -> AsyncGenerator[None, None]:
+    # Every test starts from an empty database, so cached ids must not leak.
+    await cache.clear()
+    await compressor.cache.clear()
     yield
 
+
+@pytest.fixture
+def sql_statements(engine: AsyncEngine) -> Generator[list[str], None, None]:
+    """Collects every SQL statement sent to the test database."""
+
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", _record)
+
+
 @pytest.fixture
 async def client() -> AsyncGenerator[AsyncClient, None]:
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://testserver") as client:
         yield client
 
+
+
+@pytest.fixture
+def add_answer(client: AsyncClient) -> Callable[..., Awaitable[dict]]:
+    """Posts an answer by a fresh user and returns the response body."""
+
+    async def _add_answer(question_id: int, text: str = "An answer") -> dict:
+        response = await client.post(
+            f"/questions/{question_id}/answers/",
+            json={"text": text, "user_id": str(uuid.uuid4())},
+        )
+        return response.json()
+
+    return _add_answer
@@ -0,0 +1,96 @@
+"""
+Query plan checks for the statements the routers emit.
+
+QueryPlans records every SELECT, UPDATE and DELETE sent to an engine and
+then runs EXPLAIN on each of them against the same data, reporting the ones
+that read a whole table holding more than threshold rows. It understands
+SQLite (EXPLAIN QUERY PLAN) and PostgreSQL (EXPLAIN (FORMAT JSON)).
+"""
+
+import json
+from dataclasses import dataclass, field
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+_CHECKED = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+
+@dataclass
+class FullScan:
+    table: str
+    rows: int
+    statement: str
+
+    def __str__(self) -> str:
+        return f"full scan of {self.table} ({self.rows} rows) in: {self.statement}"
+
+
+@dataclass
+class QueryPlans:
+    engine: AsyncEngine
+    threshold: int
+    statements: list[tuple[str, object]] = field(default_factory=list)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if not executemany and statement.lstrip().upper().startswith(_CHECKED):
+            self.statements.append((statement, parameters))
+
+    def __enter__(self) -> "QueryPlans":
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine.sync_engine, "before_cursor_execute", self._record)
+
+    async def full_scans(self) -> list[FullScan]:
+        async with self.engine.connect() as connection:
+            return await connection.run_sync(self._full_scans)
+
+    def _full_scans(self, connection: Connection) -> list[FullScan]:
+        sizes: dict[str, int] = {}
+        tables = set(connection.dialect.get_table_names(connection))
+        found = []
+        for statement, parameters in dict.fromkeys(
+            (statement, _hashable(parameters)) for statement, parameters in self.statements
+        ):
+            for table in _scanned_tables(connection, statement, parameters):
+                if table not in tables:
+                    continue  # a subquery or CTE, not a stored table
+                if table not in sizes:
+                    sizes[table] = connection.scalar(text(f'SELECT count(*) FROM "{table}"'))
+                if sizes[table] > self.threshold:
+                    found.append(FullScan(table, sizes[table], " ".join(statement.split())))
+        return found
+
+
+def _hashable(parameters):
+    return tuple(parameters) if isinstance(parameters, list) else parameters
+
+
+def _scanned_tables(connection: Connection, statement: str, parameters) -> list[str]:
+    if connection.dialect.name == "sqlite":
+        plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        # "SCAN answers" reads the table; "SEARCH ..." and
+        # "SCAN ... USING [COVERING] INDEX" (an ordered walk) do not.
+        return [
+            detail.split()[1]
+            for *_, detail in plan
+            if detail.startswith("SCAN ") and "USING" not in detail and "VIRTUAL" not in detail
+        ]
+
+    if connection.dialect.name == "postgresql":
+        plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        tables = []
+        nodes = [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if node["Node Type"] == "Seq Scan":
+                tables.append(node["Relation Name"])
+            nodes.extend(node.get("Plans", []))
+        return tables
+
+    raise NotImplementedError(connection.dialect.name)
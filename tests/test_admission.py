@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.backend.admission import AdmissionGate
+from app.middleware.admission import AdmissionMiddleware
+
+
+@pytest.mark.anyio
+async def test_gate_queues_briefly_then_rejects():
+    gate = AdmissionGate(limit=1, queue_size=1, queue_timeout=0.05)
+
+    assert await gate.acquire()
+    waiter = asyncio.create_task(gate.acquire())
+    await asyncio.sleep(0)
+    assert not await gate.acquire()  # queue full: rejected at once
+    assert not await waiter  # waited queue_timeout for a slot
+
+    gate.release()
+    assert await gate.acquire()
+    assert gate.stats() == {
+        "limit": 1,
+        "active": 1,
+        "waiting": 0,
+        "admitted": 2,
+        "rejected_full": 1,
+        "rejected_timeout": 1,
+    }
+
+
+@pytest.mark.anyio
+async def test_middleware_sheds_only_the_saturated_class():
+    release = asyncio.Event()
+
+    async def slow_app(scope, receive, send):
+        if scope["path"] == "/slow":
+            await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    gates = {
+        "read": AdmissionGate(limit=1, queue_size=0, queue_timeout=0.01),
+        "write": AdmissionGate(limit=1, queue_size=0, queue_timeout=0.01),
+    }
+    transport = ASGITransport(app=AdmissionMiddleware(slow_app, gates=gates))
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        slow = asyncio.create_task(client.get("/slow"))
+        await asyncio.sleep(0.01)
+
+        shed = await client.get("/questions/")
+        write = await client.post("/questions/")
+        lookup = await client.post("/questions/lookup")
+        internal = await client.get("/internal/pool")
+
+        release.set()
+        assert (await slow).status_code == 200
+
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "1"
+    assert shed.json() == {"detail": "Server is overloaded, try again later"}
+    assert write.status_code == 200
+    assert lookup.status_code == 503  # a read, though a POST
+    assert internal.status_code == 200
+    assert gates["read"].rejected_full == 2
+
+
+@pytest.mark.anyio
+async def test_rejections_are_exposed(client):
+    stats = (await client.get("/internal/admission")).json()
+    metrics = (await client.get("/metrics")).text
+
+    assert set(stats) == {"read", "write"}
+    assert 'admission_rejected_total{class="read",reason="queue_full"}' in metrics
@@ -0,0 +1,110 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+from app.backend.batcher import AnswerBatcher, BatcherOverloaded
+from main import app
+
+
+def answer(text="Batched answer"):
+    return {"text": text, "user_id": str(uuid.uuid4())}
+
+
+@pytest.fixture
+async def batcher(session_factory):
+    batcher = AnswerBatcher(session_factory, max_items=50, max_delay=0.05)
+    batcher.start()
+    app.state.answer_batcher = batcher
+    yield batcher
+    app.state.answer_batcher = None
+    await batcher.stop()
+
+
+@pytest.mark.anyio
+async def test_concurrent_answers_share_one_insert(client, batcher, sql_statements):
+    question = (await client.post("/questions/", json={"text": "Popular question?"})).json()
+    sql_statements.clear()
+
+    responses = await asyncio.gather(
+        *(
+            client.post(f"/questions/{question['id']}/answers/", json=answer())
+            for _ in range(20)
+        )
+    )
+
+    assert [response.status_code for response in responses] == [201] * 20
+    assert len({response.json()["id"] for response in responses}) == 20
+    # One group for the whole spike. (SQLite cannot keep RETURNING rows in
+    # parameter order for a multi-row INSERT, so it inserts them one by one.)
+    updates = [s for s in sql_statements if s.startswith("UPDATE questions")]
+    assert len(updates) == 1
+
+    listed = (await client.get("/questions/")).json()["items"][0]
+    assert listed["answer_count"] == 20
+
+
+@pytest.mark.anyio
+async def test_missing_question_fails_only_its_own_answer(client, batcher):
+    question = (await client.post("/questions/", json={"text": "Existing question?"})).json()
+
+    found, missing = await asyncio.gather(
+        client.post(f"/questions/{question['id']}/answers/", json=answer()),
+        client.post("/questions/999999/answers/", json=answer()),
+    )
+
+    assert found.status_code == 201
+    assert missing.status_code == 404
+
+
+def values(question_id):
+    return {
+        "text": "Queued",
+        "question_id": question_id,
+        "user_id": uuid.uuid4(),
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+@pytest.mark.anyio
+async def test_full_queue_pushes_back_and_stop_drains(client, session_factory):
+    question = (await client.post("/questions/", json={"text": "Backpressure question?"})).json()
+    batcher = AnswerBatcher(session_factory, queue_size=1, enqueue_timeout=0.01)
+
+    queued = asyncio.create_task(batcher.submit(values(question["id"])))
+    await asyncio.sleep(0)
+    with pytest.raises(BatcherOverloaded):
+        await batcher.submit(values(question["id"]))
+
+    batcher.start()
+    await batcher.stop()
+
+    assert (await queued).question_id == question["id"]
+    with pytest.raises(BatcherOverloaded):
+        await batcher.submit(values(question["id"]))
+
+
+class _Deadlock(Exception):
+    sqlstate = "40P01"
+
+
+@pytest.mark.anyio
+async def test_deadlocked_batch_is_retried_once(client, batcher, monkeypatch):
+    question = (await client.post("/questions/", json={"text": "Contended question?"})).json()
+    write = batcher._write
+    attempts = []
+
+    async def deadlock_once(database, batch):
+        attempts.append(len(batch))
+        if len(attempts) == 1:
+            raise DBAPIError("UPDATE questions ...", {}, _Deadlock())
+        return await write(database, batch)
+
+    monkeypatch.setattr(batcher, "_write", deadlock_once)
+
+    response = await client.post(f"/questions/{question['id']}/answers/", json=answer())
+
+    assert response.status_code == 201
+    assert attempts == [1, 1]
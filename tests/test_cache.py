@@ -0,0 +1,148 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.backend import cache as cache_module
+from app.backend.broker import InMemoryBroker
+from app.backend.cache import BroadcastCache, LRUTTLCache, cache
+
+
+@pytest.mark.anyio
+async def test_lru_evicts_least_recently_used():
+    lru = LRUTTLCache(max_entries=2, max_bytes=1024, ttl=60)
+    await lru.set("a", b"1")
+    await lru.set("b", b"2")
+    assert await lru.get("a") == b"1"
+
+    await lru.set("c", b"3")
+
+    assert await lru.get("b") is None
+    assert await lru.get("a") == b"1"
+    assert lru.stats()["evictions"] == 1
+
+
+@pytest.mark.anyio
+async def test_lru_bounds_total_bytes():
+    lru = LRUTTLCache(max_entries=100, max_bytes=10, ttl=60)
+    await lru.set("a", b"12345")
+    await lru.set("b", b"12345")
+    await lru.set("c", b"12345")
+
+    assert lru.stats()["bytes"] <= 10
+    assert await lru.get("a") is None
+
+
+@pytest.mark.anyio
+async def test_lru_expires_entries():
+    lru = LRUTTLCache(max_entries=10, max_bytes=1024, ttl=-1)
+    await lru.set("a", b"1")
+
+    assert await lru.get("a") is None
+    assert lru.stats()["misses"] == 1
+
+
+@pytest.mark.anyio
+async def test_lru_delete_tag_drops_every_tagged_key():
+    lru = LRUTTLCache(max_entries=10, max_bytes=1024, ttl=60)
+    await lru.set("question:1", b"q", tags=["question:1"])
+    await lru.set("answer:7", b"a", tags=["question:1"])
+    await lru.set("answer:8", b"b", tags=["question:2"])
+
+    await lru.delete_tag("question:1")
+
+    assert await lru.get("question:1") is None
+    assert await lru.get("answer:7") is None
+    assert await lru.get("answer:8") == b"b"
+
+
+@pytest.mark.anyio
+async def test_question_reads_are_served_from_cache(client, sql_statements):
+    question = (await client.post("/questions/", json={"text": "Cached question?"})).json()
+    await client.get(f"/questions/{question['id']}")
+    sql_statements.clear()
+
+    response = await client.get(f"/questions/{question['id']}")
+
+    assert response.status_code == 200
+    assert sql_statements == []
+    assert cache.stats()["hits"] >= 1
+
+
+@pytest.mark.anyio
+async def test_answer_writes_invalidate_cached_question(client):
+    question = (await client.post("/questions/", json={"text": "Invalidate me?"})).json()
+    assert (await client.get(f"/questions/{question['id']}")).json()["answers"] == []
+
+    answer = (
+        await client.post(
+            f"/questions/{question['id']}/answers/",
+            json={"text": "Fresh", "user_id": str(uuid.uuid4())},
+        )
+    ).json()
+    detail = (await client.get(f"/questions/{question['id']}")).json()
+    assert [item["text"] for item in detail["answers"]] == ["Fresh"]
+
+    await client.get(f"/answers/{answer['id']}")
+    await client.delete(f"/answers/{answer['id']}")
+
+    assert (await client.get(f"/answers/{answer['id']}")).status_code == 404
+    assert (await client.get(f"/questions/{question['id']}")).json()["answers"] == []
+
+
+@pytest.mark.anyio
+async def test_cache_stats_endpoint(client):
+    response = await client.get("/internal/cache")
+
+    assert response.status_code == 200
+    assert set(response.json()) >= {"hits", "misses", "evictions"}
+
+
+@pytest.mark.anyio
+async def test_lru_ignores_refills_while_settling():
+    lru = LRUTTLCache(max_entries=10, max_bytes=1024, ttl=60, settle=60)
+    await lru.set("question:1", b"old", tags=["question:1"])
+    await lru.delete_tag("question:1")
+
+    await lru.set("question:1", b"stale", tags=["question:1"])
+
+    assert await lru.get("question:1") is None
+
+
+@pytest.mark.anyio
+async def test_lru_tombstones_expire_in_order_and_are_capped(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: clock[0])
+    lru = LRUTTLCache(max_entries=3, max_bytes=1024, ttl=60, settle=10)
+
+    await lru.delete(*(f"answer:{n}" for n in range(5)))
+    assert list(lru._tombstones) == ["answer:2", "answer:3", "answer:4"]
+
+    clock[0] = 5.0
+    await lru.delete("answer:3")
+    clock[0] = 12.0
+    await lru.delete("answer:5")
+    assert list(lru._tombstones) == ["answer:3", "answer:5"]
+
+
+@pytest.mark.anyio
+async def test_invalidations_reach_every_worker():
+    broker = InMemoryBroker(buffer_size=10)
+    workers = [
+        BroadcastCache(LRUTTLCache(max_entries=10, max_bytes=1024, ttl=60), broker)
+        for _ in range(2)
+    ]
+    for worker in workers:
+        await worker.start()
+        await worker.set("question:1", b"old", tags=["question:1"])
+        await worker.set("answer:2", b"old", tags=["question:1"])
+    await asyncio.sleep(0)
+
+    await workers[0].delete("answer:2")
+    await workers[0].delete_tag("question:1")
+    await asyncio.sleep(0.01)
+
+    for worker in workers:
+        assert await worker.get("question:1") is None
+        assert await worker.get("answer:2") is None
+        await worker.stop()
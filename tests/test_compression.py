@@ -0,0 +1,84 @@
+import gzip
+import uuid
+
+import pytest
+
+from app.backend.compression import compressor, negotiate
+from app.middleware.compression import COMPRESSIBLE_TYPES
+
+
+async def popular_question(client, answers=50):
+    question = (
+        await client.post("/questions/", json={"text": f"Compress {answers} answers?"})
+    ).json()
+    await client.post(
+        f"/questions/{question['id']}/answers/batch",
+        json=[
+            {"text": f"Answer {index} repeating the same few words", "user_id": str(uuid.uuid4())}
+            for index in range(answers)
+        ],
+    )
+    return question
+
+
+@pytest.mark.anyio
+async def test_question_is_gzipped_once_per_version(client):
+    question = await popular_question(client)
+    plain = await client.get(f"/questions/{question['id']}", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+    compressions = compressor.compressions
+
+    first = await client.get(f"/questions/{question['id']}", headers={"Accept-Encoding": "gzip"})
+    second = await client.get(f"/questions/{question['id']}", headers={"Accept-Encoding": "gzip"})
+
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["etag"] == plain.headers["etag"]
+    assert int(first.headers["content-length"]) < len(plain.content) // 4
+    assert first.json() == second.json() == plain.json()
+    assert compressor.compressions == compressions + 1
+
+    # A new answer is a new version, so it is compressed afresh.
+    await client.post(
+        f"/questions/{question['id']}/answers/",
+        json={"text": "One more", "user_id": str(uuid.uuid4())},
+    )
+    third = await client.get(f"/questions/{question['id']}", headers={"Accept-Encoding": "gzip"})
+    assert third.headers["etag"] != first.headers["etag"]
+    assert len(third.json()["answers"]) == 51
+    assert compressor.compressions == compressions + 2
+
+
+@pytest.mark.anyio
+async def test_small_and_unaccepted_responses_are_not_compressed(client):
+    question = await popular_question(client, answers=1)
+
+    small = await client.get(f"/questions/{question['id']}", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert "vary" not in small.headers
+
+    big = await popular_question(client)
+    unaccepted = await client.get(
+        f"/questions/{big['id']}", headers={"Accept-Encoding": "gzip;q=0, compress"}
+    )
+    assert "content-encoding" not in unaccepted.headers
+    assert len(unaccepted.json()["answers"]) == 50
+
+
+@pytest.mark.anyio
+async def test_codings_are_negotiated_by_weight():
+    codings = ["zstd", "br", "gzip"]
+
+    assert negotiate("gzip, deflate, br, zstd", codings) == "zstd"
+    assert negotiate("gzip;q=1.0, br;q=0.8", codings) == "gzip"
+    assert negotiate("x-gzip", codings) == "gzip"
+    assert negotiate("*;q=0.5, zstd;q=0", codings) == "br"
+    assert negotiate("gzip;q=0.5, identity", codings) is None
+    assert negotiate("", codings) is None
+    assert gzip.decompress(compressor.codecs["gzip"](b"x" * 100)) == b"x" * 100
+
+    assert COMPRESSIBLE_TYPES.match("application/json")
+    assert COMPRESSIBLE_TYPES.match("application/problem+json")
+    assert COMPRESSIBLE_TYPES.match("text/html; charset=utf-8")
+    assert not COMPRESSIBLE_TYPES.match("text/event-stream")
+    assert not COMPRESSIBLE_TYPES.match("image/png")
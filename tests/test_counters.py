@@ -0,0 +1,79 @@
+import uuid
+
+import pytest
+from sqlalchemy import update
+
+from app.models.Question import Question
+from app.tasks.counters import repair_answer_counters
+
+
+async def listed(client, question_id):
+    items = (await client.get("/questions/")).json()["items"]
+    return next(item for item in items if item["id"] == question_id)
+
+
+@pytest.mark.anyio
+async def test_listing_summarizes_answers(client, add_answer):
+    question = (await client.post("/questions/", json={"text": "Counted question?"})).json()
+    assert (await listed(client, question["id"]))["answer_count"] == 0
+    assert (await listed(client, question["id"]))["last_answer_at"] is None
+
+    await add_answer(question["id"])
+    latest = await add_answer(question["id"])
+    await client.post(
+        f"/questions/{question['id']}/answers/batch",
+        json=[{"text": "Batched", "user_id": str(uuid.uuid4())}, {"text": ""}],
+    )
+
+    item = await listed(client, question["id"])
+    assert item["answer_count"] == 3
+    assert item["last_answer_at"] > latest["created_at"]
+
+
+@pytest.mark.anyio
+async def test_deleting_the_latest_answer_moves_last_answer_at_back(client, add_answer):
+    question = (await client.post("/questions/", json={"text": "Shrinking question?"})).json()
+    first = await add_answer(question["id"], "First")
+    second = await add_answer(question["id"], "Second")
+
+    await client.delete(f"/answers/{second['id']}")
+    item = await listed(client, question["id"])
+    assert item["answer_count"] == 1
+    assert item["last_answer_at"] == first["created_at"]
+
+    await client.delete(f"/answers/{first['id']}")
+    item = await listed(client, question["id"])
+    assert item["answer_count"] == 0
+    assert item["last_answer_at"] is None
+
+
+@pytest.mark.anyio
+async def test_answers_to_missing_question_are_not_counted(client, add_answer):
+    response = await add_answer(999_999)
+    assert response["detail"] == "Question with id 999999 not found"
+
+
+@pytest.mark.anyio
+async def test_repair_recomputes_drifted_counters(client, session_factory, add_answer):
+    questions = []
+    for index in range(5):
+        question = (await client.post("/questions/", json={"text": f"Drift {index}?"})).json()
+        for _ in range(index):
+            await add_answer(question["id"])
+        questions.append(question)
+    expected = {q["id"]: await listed(client, q["id"]) for q in questions}
+
+    async with session_factory() as database:
+        await database.execute(
+            update(Question)
+            .where(Question.id.in_([questions[1]["id"], questions[4]["id"]]))
+            .values(answer_count=42, last_answer_at=None)
+        )
+        await database.commit()
+
+    repaired = await repair_answer_counters(session_factory, chunk_size=2)
+
+    assert repaired == 2
+    for question in questions:
+        assert await listed(client, question["id"]) == expected[question["id"]]
+    assert await repair_answer_counters(session_factory, chunk_size=2) == 0
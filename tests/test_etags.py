@@ -0,0 +1,61 @@
+import pytest
+
+from app.backend.cache import cache
+
+
+@pytest.mark.anyio
+async def test_question_conditional_get(client, add_answer):
+    question = (await client.post("/questions/", json={"text": "Poll me?"})).json()
+    await add_answer(question["id"])
+
+    first = await client.get(f"/questions/{question['id']}")
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+
+    cached = await client.get(
+        f"/questions/{question['id']}", headers={"If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    await add_answer(question["id"], text="Another answer")
+    changed = await client.get(
+        f"/questions/{question['id']}", headers={"If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()["answers"]) == 2
+
+
+@pytest.mark.anyio
+async def test_question_304_skips_loading_answers(client, sql_statements, add_answer):
+    question = (await client.post("/questions/", json={"text": "Cheap check?"})).json()
+    await add_answer(question["id"])
+    etag = (await client.get(f"/questions/{question['id']}")).headers["etag"]
+    await cache.clear()
+    sql_statements.clear()
+
+    response = await client.get(
+        f"/questions/{question['id']}", headers={"If-None-Match": etag}
+    )
+
+    assert response.status_code == 304
+    assert len(sql_statements) == 1
+    assert "count(answers.id)" in sql_statements[0]
+
+
+@pytest.mark.anyio
+async def test_answer_conditional_get(client, add_answer):
+    question = (await client.post("/questions/", json={"text": "Answer etag?"})).json()
+    answer = await add_answer(question["id"])
+
+    etag = (await client.get(f"/answers/{answer['id']}")).headers["etag"]
+    await cache.clear()
+
+    response = await client.get(f"/answers/{answer['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    await client.delete(f"/answers/{answer['id']}")
+    gone = await client.get(f"/answers/{answer['id']}", headers={"If-None-Match": etag})
+    assert gone.status_code == 404
@@ -0,0 +1,219 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.backend.broker import InMemoryBroker, PostgresBroker, broker
+from app.routers import events
+
+
+def parse_events(body: str) -> list[dict]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n") if ": " in line)
+        if "event" in fields:
+            events.append(fields)
+    return events
+
+
+@pytest.fixture
+def open_stream(client, monkeypatch):
+    """Start reading a stream in the background once its backlog is read."""
+
+    from app.routers import questions
+
+    started = asyncio.Queue()
+
+    def tracked(*args):
+        started.put_nowait(None)
+        return original(*args)
+
+    original = questions.answer_events
+    monkeypatch.setattr(questions, "answer_events", tracked)
+
+    async def open_stream(question_id, headers=None):
+        reader = asyncio.create_task(
+            client.get(f"/questions/{question_id}/answers/stream", headers=headers or {})
+        )
+        await asyncio.wait_for(started.get(), 5)
+        return reader
+
+    return open_stream
+
+
+@pytest.mark.anyio
+async def test_stream_pushes_new_and_deleted_answers(client, open_stream, add_answer):
+    question = (await client.post("/questions/", json={"text": "Streamed?"})).json()
+    await add_answer(question["id"], "Before the stream")
+
+    reader = await open_stream(question["id"])
+    first = await add_answer(question["id"], "First live answer")
+    await client.post(
+        f"/questions/{question['id']}/answers/batch",
+        json=[{"text": "Batched live answer", "user_id": str(uuid.uuid4())}],
+    )
+    await client.delete(f"/answers/{first['id']}")
+    await client.delete(f"/questions/{question['id']}")
+    response = await asyncio.wait_for(reader, 5)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    assert [event["event"] for event in events] == [
+        "answer.created",
+        "answer.created",
+        "answer.deleted",
+        "question.deleted",
+    ]
+    assert events[0]["id"] == str(first["id"])
+    assert "First live answer" in events[0]["data"]
+    assert "Batched live answer" in events[1]["data"]
+    assert "id" not in events[2]
+    assert broker.stats()["subscribers"] == 0
+
+
+@pytest.mark.anyio
+async def test_resume_backfills_only_missed_answers(client, open_stream, add_answer):
+    question = (await client.post("/questions/", json={"text": "Resumed?"})).json()
+    seen = await add_answer(question["id"], "Already seen")
+    await add_answer(question["id"], "Missed one")
+    await add_answer(question["id"], "Missed two")
+
+    reader = await open_stream(question["id"], {"Last-Event-ID": str(seen["id"])})
+    await client.delete(f"/questions/{question['id']}")
+    response = await asyncio.wait_for(reader, 5)
+
+    events = parse_events(response.text)
+    assert [event["event"] for event in events] == [
+        "answer.created",
+        "answer.created",
+        "question.deleted",
+    ]
+    assert "Missed one" in events[0]["data"]
+    assert "Missed two" in events[1]["data"]
+    assert "Already seen" not in response.text
+
+
+@pytest.mark.anyio
+async def test_oversized_event_is_read_back_on_reconnect(
+    client, open_stream, monkeypatch, add_answer
+):
+    question = (await client.post("/questions/", json={"text": "Too large?"})).json()
+    monkeypatch.setattr(broker, "max_message_bytes", 20)
+
+    reader = await open_stream(question["id"])
+    answer = await add_answer(question["id"], "Longer than the transport allows")
+    response = await asyncio.wait_for(reader, 5)
+
+    # The stream ends without the answer; the reconnect fetches it.
+    assert parse_events(response.text) == []
+    last_event_id = response.text.split("id: ", 1)[1].split("\n", 1)[0]
+
+    reader = await open_stream(question["id"], {"Last-Event-ID": last_event_id})
+    await client.delete(f"/questions/{question['id']}")
+    events = parse_events((await asyncio.wait_for(reader, 5)).text)
+
+    assert events[0]["id"] == str(answer["id"])
+    assert "Longer than the transport allows" in events[0]["data"]
+
+
+@pytest.mark.anyio
+async def test_stream_of_unknown_question_is_404(client):
+    response = await client.get("/questions/999/answers/stream")
+
+    assert response.status_code == 404
+    assert broker.stats()["subscribers"] == 0
+
+
+@pytest.mark.anyio
+async def test_slow_subscriber_is_disconnected():
+    local = InMemoryBroker(buffer_size=2)
+    slow = local.subscribe("question:1")
+    fast = local.subscribe("question:1")
+
+    await local.publish("question:1", "one")
+    assert await fast.get(1) == "one"
+    await local.publish("question:1", "two")
+    await local.publish("question:1", "three")
+
+    assert slow.overflowed
+    assert await slow.get(1) is None
+    assert not fast.closed
+    assert [await fast.get(1), await fast.get(1)] == ["two", "three"]
+    assert local.stats() == {"channels": 1, "subscribers": 1, "dropped": 1}
+
+
+class _NotifyConnection:
+    """Stands in for the broker's connection and records NOTIFY payloads."""
+
+    def __init__(self):
+        self.payloads = []
+
+    def is_closed(self):
+        return False
+
+    async def execute(self, query, pg_channel, payload):
+        self.payloads.append(payload)
+
+
+@pytest.mark.anyio
+async def test_postgres_broker_packs_queued_messages_into_few_notifies():
+    remote = PostgresBroker("postgresql://unused", buffer_size=1000, outbox_size=10)
+    connection = remote._connection = _NotifyConnection()
+    sent = [f"answer.deleted\n{n}\n" + "x" * 500 for n in range(40)]
+    for message in sent[:10]:
+        await remote.publish("question:1", message)
+    sender = asyncio.create_task(remote._send())
+    # The outbox holds 10, so these wait for room instead of being dropped.
+    for message in sent[10:]:
+        await remote.publish("question:1", message, wait=True)
+    await asyncio.wait_for(remote._outbox.join(), 5)
+    sender.cancel()
+
+    subscription = remote.subscribe("question:1")
+    for payload in connection.payloads:
+        remote._on_notify(None, 0, remote.pg_channel, payload)
+
+    assert len(connection.payloads) < len(sent)
+    assert all(len(payload.encode()) < 8000 for payload in connection.payloads)
+    assert [await subscription.get(1) for _ in sent] == sent
+
+
+@pytest.mark.anyio
+async def test_live_answers_out_of_id_order_are_delivered(client, open_stream, add_answer):
+    question = (await client.post("/questions/", json={"text": "Out of order?"})).json()
+    seen = await add_answer(question["id"], "Already seen")
+
+    reader = await open_stream(question["id"], {"Last-Event-ID": str(seen["id"])})
+    # Committed by two other workers, the later id arriving first.
+    for answer_id in (seen["id"] + 2, seen["id"] + 1):
+        await events._publish(
+            question["id"], events.ANSWER_CREATED, answer_id, f'{{"id": {answer_id}}}'
+        )
+    await client.delete(f"/questions/{question['id']}")
+    received = parse_events((await asyncio.wait_for(reader, 5)).text)
+
+    assert [event["data"] for event in received[:2]] == [
+        f'{{"id": {seen["id"] + 2}}}',
+        f'{{"id": {seen["id"] + 1}}}',
+    ]
+    # Last-Event-ID never moves back, or a reconnect would repeat answers.
+    assert [event["id"] for event in received[:2]] == [str(seen["id"] + 2)] * 2
+
+
+@pytest.mark.anyio
+async def test_closing_streams_ends_open_and_new_streams(client, open_stream):
+    question = (await client.post("/questions/", json={"text": "Shutting down?"})).json()
+    reader = await open_stream(question["id"])
+
+    try:
+        events.close_streams()
+        assert (await asyncio.wait_for(reader, 5)).status_code == 200
+
+        late = await asyncio.wait_for(
+            client.get(f"/questions/{question['id']}/answers/stream"), 5
+        )
+        assert late.text.startswith("retry: ")
+    finally:
+        events.streams_closing.clear()
+    assert broker.stats()["subscribers"] == 0
@@ -0,0 +1,143 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.backend.idempotency import DatabaseIdempotencyStore, KeyState, StoredResponse
+from app.models.Answer import Answer
+from app.models.IdempotencyKey import IdempotencyKey
+from app.routers import questions
+
+
+def answer_body(text="Retried answer"):
+    return {"text": text, "user_id": "8f5c6c2e-7c53-4f52-9a57-0e2a1c3d4b5f"}
+
+
+async def answer_count(session_factory):
+    async with session_factory() as database:
+        return await database.scalar(select(func.count(Answer.id)))
+
+
+@pytest.mark.anyio
+async def test_retry_replays_the_stored_response(client, session_factory, sql_statements):
+    question = (await client.post("/questions/", json={"text": "Retried question?"})).json()
+    url = f"/questions/{question['id']}/answers/"
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+
+    first = await client.post(url, json=answer_body(), headers=headers)
+    sql_statements.clear()
+    retry = await client.post(url, json=answer_body(), headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.content == first.content
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+    assert sql_statements == []
+    assert await answer_count(session_factory) == 1
+
+
+@pytest.mark.anyio
+async def test_key_reused_for_another_request_is_rejected(client):
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    await client.post("/questions/", json={"text": "First use of the key?"}, headers=headers)
+
+    response = await client.post("/questions/", json={"text": "Second use?"}, headers=headers)
+
+    assert response.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_concurrent_duplicates_wait_for_the_first(client, session_factory):
+    question = (await client.post("/questions/", json={"text": "Raced question?"})).json()
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+
+    responses = await asyncio.gather(
+        *(
+            client.post(
+                f"/questions/{question['id']}/answers/batch",
+                json=[answer_body("One"), answer_body("Two")],
+                headers=headers,
+            )
+            for _ in range(5)
+        )
+    )
+
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.content for response in responses}) == 1
+    assert sum("idempotent-replayed" in response.headers for response in responses) == 4
+    assert await answer_count(session_factory) == 2
+
+
+@pytest.mark.anyio
+async def test_failed_request_releases_the_key(client, session_factory, monkeypatch):
+    question = (await client.post("/questions/", json={"text": "Failing question?"})).json()
+    url = f"/questions/{question['id']}/answers/"
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+
+    def broken(*args):
+        raise RuntimeError("database went away")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(questions, "answers_added", broken)
+        with pytest.raises(RuntimeError):
+            await client.post(url, json=answer_body(), headers=headers)
+
+    response = await client.post(url, json=answer_body(), headers=headers)
+
+    assert response.status_code == 201
+    assert "idempotent-replayed" not in response.headers
+    assert await answer_count(session_factory) == 1
+
+
+@pytest.mark.anyio
+async def test_lookups_and_keyless_posts_are_not_intercepted(client):
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    await client.post("/questions/lookup", json={"ids": [1]}, headers=headers)
+    response = await client.post("/questions/lookup", json={"ids": [2]}, headers=headers)
+
+    assert response.status_code == 200
+    assert "idempotent-replayed" not in response.headers
+
+
+@pytest.mark.anyio
+async def test_database_store(session_factory):
+    store = DatabaseIdempotencyStore(ttl=60, lock_seconds=30, sessions=session_factory)
+    stored = StoredResponse(201, [("content-type", "application/json")], b'{"id":1}')
+
+    assert (await store.claim("key", "a")).state == KeyState.acquired
+    assert (await store.claim("key", "a")).state == KeyState.in_progress
+    assert (await store.claim("key", "b")).state == KeyState.mismatch
+
+    await store.complete("key", stored)
+    replay = await store.wait("key", "a", timeout=1)
+    assert (replay.state, replay.response) == (KeyState.completed, stored)
+
+    await store.release("key")  # a stored response is not released
+    assert (await store.claim("key", "a")).state == KeyState.completed
+
+    await store.claim("other", "a")
+    await store.release("other")
+    assert (await store.claim("other", "b")).state == KeyState.acquired
+
+
+@pytest.mark.anyio
+async def test_database_store_reclaims_and_purges_expired_keys(session_factory):
+    store = DatabaseIdempotencyStore(
+        ttl=60, lock_seconds=30, sessions=session_factory, purge_every=1
+    )
+    await store.claim("abandoned", "a")
+    await store.claim("replayed", "a")
+    await store.complete("replayed", StoredResponse(201, [], b""))
+    async with session_factory() as database:
+        await database.execute(
+            update(IdempotencyKey).values(expires_at=func.datetime("now", "-1 minute"))
+        )
+        await database.commit()
+
+    # The holder never finished: the key can be claimed again.
+    assert (await store.claim("abandoned", "b")).state == KeyState.acquired
+
+    async with session_factory() as database:
+        keys = set(await database.scalars(select(IdempotencyKey.key)))
+    assert keys == {"abandoned"}
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import main
+from app.backend import async_database
+from app.backend.async_database import Database
+from app.backend.broker import InMemoryBroker
+from app.backend.cache import LRUTTLCache
+from app.backend.pool import InstrumentedQueuePool, pool_status
+from app.config import settings
+from app.middleware.drain import DrainMiddleware, RequestTracker
+from app.routers import events
+
+
+@pytest.fixture
+async def sqlite_database(tmp_path, monkeypatch):
+    def create_engine(url):
+        return create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'lifespan.db'}",
+            poolclass=InstrumentedQueuePool,
+            pool_size=5,
+            max_overflow=0,
+        )
+
+    monkeypatch.setattr(async_database, "create_engine", create_engine)
+    database = Database()
+    yield database
+    await database.close()
+
+
+@pytest.mark.anyio
+async def test_prewarm_opens_distinct_connections(sqlite_database):
+    await sqlite_database.prewarm(3)
+
+    status = pool_status(sqlite_database.engine)
+    assert status["checked_in"] == 3
+    assert status["checked_out"] == 0
+
+
+@pytest.mark.anyio
+async def test_state_inherited_across_fork_is_replaced(sqlite_database):
+    parent_engine = sqlite_database.engine
+    sqlite_database._pid = -1  # as seen from a forked child
+
+    assert sqlite_database.engine is not parent_engine
+    assert sqlite_database.sessions.kw["bind"] is sqlite_database.engine
+
+
+@pytest.mark.anyio
+async def test_close_disposes_and_reopens_on_demand(sqlite_database):
+    await sqlite_database.prewarm(2)
+    first = sqlite_database.engine
+
+    await sqlite_database.close()
+
+    assert pool_status(first)["checked_in"] == 0
+    assert sqlite_database.engine is not first
+
+
+@pytest.mark.anyio
+async def test_drain_refuses_new_requests_and_waits_for_running_ones():
+    tracker = RequestTracker()
+    release = asyncio.Event()
+
+    async def slow_app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    transport = ASGITransport(app=DrainMiddleware(slow_app, tracker=tracker))
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        running = asyncio.create_task(client.get("/"))
+        await asyncio.sleep(0.01)
+        drained = asyncio.create_task(tracker.drain(timeout=1.0))
+        await asyncio.sleep(0)
+
+        refused = await client.get("/")
+        assert not drained.done()
+        release.set()
+
+        assert (await running).status_code == 200
+        assert await drained
+
+    assert refused.status_code == 503
+    assert refused.headers["connection"] == "close"
+    assert refused.headers["retry-after"] == str(settings.shutdown_retry_after)
+
+
+@pytest.mark.anyio
+async def test_lifespan_prewarms_and_disposes(sqlite_database, monkeypatch):
+    tracker = RequestTracker()
+    monkeypatch.setattr(main, "db", sqlite_database)
+    monkeypatch.setattr(main, "requests_in_flight", tracker)
+    # The shared app, broker and cache serve the other tests; stopping them
+    # here would leave them shut down.
+    monkeypatch.setattr(main, "broker", InMemoryBroker(buffer_size=10))
+    monkeypatch.setattr(main, "cache", LRUTTLCache(max_entries=10, max_bytes=1024, ttl=60))
+    closing = asyncio.Event()
+    monkeypatch.setattr(events, "streams_closing", closing)
+    monkeypatch.setattr(main, "streams_closing", closing)
+    app = FastAPI()
+
+    async with main.lifespan(app):
+        engine = sqlite_database.engine
+        assert pool_status(engine)["checked_in"] == 5
+
+    assert pool_status(engine)["checked_in"] == 0
+    assert tracker.draining
+    assert closing.is_set()
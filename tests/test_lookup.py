@@ -0,0 +1,77 @@
+import uuid
+
+import pytest
+
+from app.config import settings
+
+
+async def seed(client, count=3):
+    questions = []
+    for index in range(count):
+        question = (await client.post("/questions/", json={"text": f"Looked up {index}?"})).json()
+        answer = (
+            await client.post(
+                f"/questions/{question['id']}/answers/",
+                json={"text": f"Answer {index}", "user_id": str(uuid.uuid4())},
+            )
+        ).json()
+        questions.append((question, answer))
+    return questions
+
+
+@pytest.mark.anyio
+async def test_questions_lookup_keeps_request_order_and_reports_missing(client, sql_statements):
+    (first, _), (second, _), (third, _) = await seed(client)
+    sql_statements.clear()
+
+    response = await client.get(
+        f"/questions/lookup?ids={third['id']},999,{first['id']}&ids={third['id']}"
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == [third["id"], first["id"]]
+    assert body["items"][0]["answer_count"] == 1
+    assert body["missing"] == [999]
+    assert len(sql_statements) == 1
+
+
+@pytest.mark.anyio
+async def test_answers_lookup_by_body(client, sql_statements):
+    (_, first), (_, second), _ = await seed(client)
+    sql_statements.clear()
+
+    response = await client.post(
+        "/answers/lookup", json={"ids": [second["id"], 12345, first["id"]]}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["items"] == [second, first]
+    assert body["missing"] == [12345]
+    assert len(sql_statements) == 1
+
+
+@pytest.mark.anyio
+async def test_lookup_fast_json_matches(client, monkeypatch):
+    (first, answer), (second, _), _ = await seed(client)
+    url = f"/questions/lookup?ids={second['id']},{first['id']},7"
+    validated = (await client.get(url)).content
+    answers = (await client.get(f"/answers/lookup?ids={answer['id']}")).content
+
+    monkeypatch.setattr(settings, "fast_json_enabled", True)
+
+    assert (await client.get(url)).content == validated
+    assert (await client.get(f"/answers/lookup?ids={answer['id']}")).content == answers
+
+
+@pytest.mark.anyio
+async def test_lookup_rejects_bad_requests(client, monkeypatch):
+    monkeypatch.setattr(settings, "lookup_max_ids", 2)
+
+    assert (await client.get("/questions/lookup?ids=1,two")).status_code == 400
+    assert (await client.get("/answers/lookup?ids=,")).status_code == 400
+    assert (await client.get("/answers/lookup?ids=1,2,3")).status_code == 400
+    assert (await client.post("/questions/lookup", json={"ids": []})).status_code == 422
+    # Repeats count once.
+    assert (await client.get("/questions/lookup?ids=1,1,2")).status_code == 200
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from app.backend.metrics import MetricsRegistry
+
+
+@pytest.mark.anyio
+async def test_metrics_endpoint_labels_by_route_template(client):
+    question = (await client.post("/questions/", json={"text": "Measured question?"})).json()
+    await client.get(f"/questions/{question['id']}")
+    await client.get("/questions/424242")
+
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/questions/{question_id}",status="200"}' in body
+    assert 'http_requests_total{method="GET",route="/questions/{question_id}",status="404"}' in body
+    assert f"/questions/{question['id']}" not in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/questions/{question_id}",le="+Inf"}' in body
+    assert "# TYPE db_pool_checked_out gauge" in body
+    assert "http_requests_in_progress 1.0" in body
+
+
+@pytest.mark.anyio
+async def test_registry_merges_worker_snapshots(tmp_path):
+    registry = MetricsRegistry(directory=str(tmp_path))
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    in_flight = registry.gauge("in_flight", "In flight.")
+    latency = registry.histogram("latency_seconds", "Latency.")
+    requests.inc(("/a",), 2)
+    in_flight.set((), 3)
+    latency.observe((), 0.02)
+
+    # A worker that has since exited: its counters stay, its gauges do not.
+    (tmp_path / "999999999.json").write_text(
+        json.dumps(
+            {
+                "pid": 999999999,
+                "metrics": {
+                    "requests_total": [[["/a"], 5.0]],
+                    "in_flight": [[[], 7.0]],
+                    "latency_seconds": [[[], [0.0] * 13]],
+                },
+            }
+        )
+    )
+
+    body = registry.render()
+
+    assert 'requests_total{route="/a"} 7.0' in body
+    assert "in_flight 3.0" in body
+    assert 'latency_seconds_bucket{le="0.025"} 1.0' in body
+    assert "latency_seconds_count 1.0" in body
+
+
+@pytest.mark.anyio
+async def test_registry_folds_exited_workers_into_one_file(tmp_path):
+    registry = MetricsRegistry(directory=str(tmp_path))
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    requests.inc(("/a",), 1)
+
+    for pid in (999999997, 999999998):
+        (tmp_path / f"{pid}.json").write_text(
+            json.dumps({"pid": pid, "metrics": {"requests_total": [[["/a"], 5.0]]}})
+        )
+    registry.render()
+    (tmp_path / "999999999.json").write_text(
+        json.dumps({"pid": 999999999, "metrics": {"requests_total": [[["/a"], 10.0]]}})
+    )
+
+    body = registry.render()
+
+    assert 'requests_total{route="/a"} 21.0' in body
+    assert sorted(path.name for path in tmp_path.glob("*.json")) == [
+        f"{os.getpid()}.json",
+        "exited.json",
+    ]
+
+
+@pytest.mark.anyio
+async def test_registry_flushes_in_the_background_and_on_stop(tmp_path):
+    registry = MetricsRegistry(directory=str(tmp_path), flush_interval=0.01)
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    snapshot = tmp_path / f"{os.getpid()}.json"
+
+    await registry.start()
+    requests.inc(("/a",), 1)
+    for _ in range(100):
+        if snapshot.exists():
+            break
+        await asyncio.sleep(0.01)
+    assert json.loads(snapshot.read_text())["metrics"]["requests_total"] == [[["/a"], 1.0]]
+
+    requests.inc(("/a",), 1)
+    await registry.stop()
+
+    assert json.loads(snapshot.read_text())["metrics"]["requests_total"] == [[["/a"], 2.0]]
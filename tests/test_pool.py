@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.backend.pool import InstrumentedQueuePool, pool_status
+
+
+@pytest.mark.anyio
+async def test_instrumented_pool_counts_checkouts():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        poolclass=InstrumentedQueuePool,
+        pool_size=2,
+        max_overflow=0,
+    )
+    try:
+        for _ in range(3):
+            async with engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+                assert pool_status(engine)["checked_out"] == 1
+
+        status = pool_status(engine)
+        assert status["checkouts"] == 3
+        assert status["checked_out"] == 0
+        assert status["size"] == 2
+        assert status["wait_seconds_total"] >= status["wait_seconds_max"] > 0
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.anyio
+async def test_pool_stats_endpoint(client):
+    response = await client.get("/internal/pool")
+
+    assert response.status_code == 200
+    assert {"size", "checked_out", "overflow", "checkouts", "wait_seconds_max"} <= set(
+        response.json()
+    )
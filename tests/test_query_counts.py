@@ -0,0 +1,91 @@
+import uuid
+
+import pytest
+
+
+async def seed_question(client, text="How many queries?", answers=3):
+    response = await client.post("/questions/", json={"text": text})
+    question = response.json()
+    for index in range(answers):
+        await client.post(
+            f"/questions/{question['id']}/answers/",
+            json={"text": f"Answer {index}", "user_id": str(uuid.uuid4())},
+        )
+    return question
+
+
+@pytest.mark.anyio
+async def test_question_list_never_loads_answers(client, sql_statements):
+    await seed_question(client, "First listed question?")
+    await seed_question(client, "Second listed question?")
+    sql_statements.clear()
+
+    response = await client.get("/questions/")
+
+    assert response.status_code == 200
+    assert len(sql_statements) == 1
+    assert "answers" not in sql_statements[0]
+
+
+@pytest.mark.anyio
+async def test_question_detail_loads_answers_in_one_query(client, sql_statements):
+    question = await seed_question(client)
+    sql_statements.clear()
+
+    response = await client.get(f"/questions/{question['id']}")
+
+    assert response.status_code == 200
+    assert len(response.json()["answers"]) == 3
+    assert len(sql_statements) == 2
+
+
+@pytest.mark.anyio
+async def test_answer_detail_is_a_single_query(client, sql_statements):
+    question = await seed_question(client, answers=1)
+    detail = (await client.get(f"/questions/{question['id']}")).json()
+    sql_statements.clear()
+
+    response = await client.get(f"/answers/{detail['answers'][0]['id']}")
+
+    assert response.status_code == 200
+    assert len(sql_statements) == 1
+
+
+@pytest.mark.anyio
+async def test_question_delete_is_a_single_statement(client, sql_statements):
+    question = await seed_question(client, answers=5)
+    sql_statements.clear()
+
+    response = await client.delete(f"/questions/{question['id']}")
+
+    assert response.status_code == 204
+    assert len(sql_statements) == 1
+    assert sql_statements[0].startswith("DELETE FROM questions")
+
+
+@pytest.mark.anyio
+async def test_question_create_is_a_single_statement(client, sql_statements):
+    response = await client.post("/questions/", json={"text": "One round-trip?"})
+    assert response.status_code == 201
+    assert len(sql_statements) == 1
+
+    sql_statements.clear()
+    duplicate = await client.post("/questions/", json={"text": "One round-trip?"})
+    assert duplicate.status_code == 400
+    assert len(sql_statements) == 1
+
+
+@pytest.mark.anyio
+async def test_answer_create_counts_then_inserts(client, sql_statements):
+    question = await seed_question(client, answers=0)
+    sql_statements.clear()
+
+    response = await client.post(
+        f"/questions/{question['id']}/answers/",
+        json={"text": "Only an insert", "user_id": str(uuid.uuid4())},
+    )
+
+    assert response.status_code == 201
+    assert len(sql_statements) == 2
+    assert sql_statements[0].startswith("UPDATE questions")
+    assert sql_statements[1].startswith("INSERT INTO answers")
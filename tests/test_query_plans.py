@@ -0,0 +1,57 @@
+import uuid
+
+import pytest
+
+from query_plans import QueryPlans
+
+# Tables above this size must never be read in full by a hot query.
+THRESHOLD = 200
+
+
+async def seed(client, questions=20, answers=30):
+    response = await client.post(
+        "/questions/batch",
+        json=[{"text": f"Indexed question {index} about plans?"} for index in range(questions)],
+    )
+    ids = [item["question"]["id"] for item in response.json()]
+    for question_id in ids:
+        await client.post(
+            f"/questions/{question_id}/answers/batch",
+            json=[
+                {"text": f"Answer {index} about plans", "user_id": str(uuid.uuid4())}
+                for index in range(answers)
+            ],
+        )
+    return ids
+
+
+@pytest.mark.anyio
+async def test_routers_never_scan_large_tables(client, engine):
+    ids = await seed(client)
+
+    with QueryPlans(engine, THRESHOLD) as plans:
+        page = (await client.get("/questions/?limit=5")).json()
+        await client.get(f"/questions/?limit=5&cursor={page['next_cursor']}")
+        detail = await client.get(f"/questions/{ids[3]}")
+        await client.get(f"/questions/{ids[3]}", headers={"If-None-Match": detail.headers["etag"]})
+        await client.get(f"/answers/{detail.json()['answers'][0]['id']}")
+        await client.get("/questions/search?q=plans")
+        await client.get(f"/questions/lookup?ids={ids[1]},{ids[8]},{ids[2]}")
+        await client.post(
+            "/answers/lookup",
+            json={"ids": [answer["id"] for answer in detail.json()["answers"][:5]]},
+        )
+        await client.post("/questions/", json={"text": "One more question?"})
+        await client.post(
+            f"/questions/{ids[4]}/answers/",
+            json={"text": "One more answer", "user_id": str(uuid.uuid4())},
+        )
+        await client.post(
+            f"/questions/{ids[5]}/answers/batch",
+            json=[{"text": "Batched answer", "user_id": str(uuid.uuid4())}],
+        )
+        await client.delete(f"/answers/{detail.json()['answers'][1]['id']}")
+        await client.delete(f"/questions/{ids[6]}")
+
+    assert plans.statements
+    assert [str(scan) for scan in await plans.full_scans()] == []
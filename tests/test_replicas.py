@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.backend.async_database import ReplicaRouter, create_session_factory
+
+
+def session_factory(url):
+    return create_session_factory(create_async_engine(url))
+
+
+async def database_name(session):
+    async with session:
+        return (await session.execute(text("PRAGMA database_list"))).all()[0][2]
+
+
+@pytest.mark.anyio
+async def test_replica_router_round_robins(tmp_path):
+    router = ReplicaRouter(
+        primary=session_factory(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}"),
+        replicas=[
+            session_factory(f"sqlite+aiosqlite:///{tmp_path / 'replica_a.db'}"),
+            session_factory(f"sqlite+aiosqlite:///{tmp_path / 'replica_b.db'}"),
+        ],
+        retry_seconds=60,
+    )
+
+    names = [await database_name(await router.session()) for _ in range(4)]
+
+    assert [name.rsplit("/", 1)[-1] for name in names] == [
+        "replica_a.db",
+        "replica_b.db",
+        "replica_a.db",
+        "replica_b.db",
+    ]
+    sticky = await database_name(await router.session(sticky=True))
+    assert sticky.endswith("primary.db")
+
+
+@pytest.mark.anyio
+async def test_replica_router_falls_back_to_primary(tmp_path):
+    router = ReplicaRouter(
+        primary=session_factory(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}"),
+        replicas=[session_factory(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'x.db'}")],
+        retry_seconds=60,
+    )
+
+    assert (await database_name(await router.session())).endswith("primary.db")
+    # The failed replica is skipped without another connection attempt.
+    assert router._down_until[0] > 0
+    assert (await database_name(await router.session())).endswith("primary.db")
+
+
+class _Unreachable:
+    """Session of a replica that drops packets: connecting never finishes."""
+
+    async def connection(self):
+        await asyncio.sleep(60)
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.anyio
+async def test_replica_router_gives_up_on_a_hanging_replica(tmp_path):
+    router = ReplicaRouter(
+        primary=session_factory(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}"),
+        replicas=[_Unreachable],
+        retry_seconds=60,
+        connect_timeout=0.05,
+    )
+
+    started = time.monotonic()
+    assert (await database_name(await router.session())).endswith("primary.db")
+    assert time.monotonic() - started < 1
+    assert router._down_until[0] > time.monotonic()
@@ -0,0 +1,159 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.backend.broker import broker
+from app.backend.cache import answer_key, cache, question_key
+from app.models.Answer import Answer
+from app.models.Question import Question
+from app.tasks import retention
+from app.tasks.retention import purge_expired
+
+
+NOW = datetime.now(timezone.utc)
+
+
+def days_ago(days):
+    return NOW - timedelta(days=days)
+
+
+async def seed(session_factory):
+    """
+    A fresh question with a mix of old and new answers, an old question that
+    is still answered, and two old questions with only old answers.
+    """
+
+    async with session_factory() as database:
+        fresh = Question(text="Fresh question?", created_at=days_ago(1))
+        active = Question(text="Old but active?", created_at=days_ago(400))
+        stale = [Question(text=f"Stale question {n}?", created_at=days_ago(400 + n)) for n in range(2)]
+        database.add_all([fresh, active, *stale])
+        await database.flush()
+
+        answers = [
+            (fresh, 100), (fresh, 90), (fresh, 2),
+            (active, 300), (active, 1),
+            (stale[0], 380), (stale[0], 370), (stale[0], 360),
+            (stale[1], 390),
+        ]
+        for question, age in answers:
+            database.add(
+                Answer(
+                    text=f"{age} days old",
+                    question_id=question.id,
+                    user_id=uuid.uuid4(),
+                    created_at=days_ago(age),
+                )
+            )
+        for question in (fresh, active, *stale):
+            own = [days_ago(age) for q, age in answers if q is question]
+            question.answer_count = len(own)
+            question.last_answer_at = max(own)
+        await database.commit()
+        return fresh.id, active.id, [question.id for question in stale]
+
+
+async def state(session_factory):
+    async with session_factory() as database:
+        questions = {
+            row.id: (row.answer_count, row.last_answer_at)
+            for row in await database.execute(
+                select(Question.id, Question.answer_count, Question.last_answer_at)
+            )
+        }
+        truth = {
+            row.question_id: (row.count, row.latest)
+            for row in await database.execute(
+                select(
+                    Answer.question_id,
+                    func.count(Answer.id).label("count"),
+                    func.max(Answer.created_at).label("latest"),
+                ).group_by(Answer.question_id)
+            )
+        }
+        texts = set(await database.scalars(select(Answer.text)))
+    return questions, truth, texts
+
+
+@pytest.mark.anyio
+async def test_purge_removes_expired_rows_and_keeps_counters_exact(session_factory):
+    fresh, active, stale = await seed(session_factory)
+
+    result = await purge_expired(session_factory, answer_days=30, question_days=365, chunk_size=2, pause=0)
+
+    questions, truth, texts = await state(session_factory)
+    assert set(questions) == {fresh, active}
+    assert texts == {"2 days old", "1 days old"}
+    assert {question_id: count for question_id, (count, _) in questions.items()} == {
+        fresh: 1,
+        active: 1,
+    }
+    for question_id, (count, latest) in truth.items():
+        assert questions[question_id] == (count, latest)
+    assert (result.answers, result.questions) == (7, 2)
+
+
+@pytest.mark.anyio
+async def test_purge_invalidates_cache_and_publishes_deletions(session_factory):
+    fresh, _, stale = await seed(session_factory)
+    async with session_factory() as database:
+        old_answer = await database.scalar(
+            select(Answer.id).where(Answer.question_id == fresh, Answer.text == "90 days old")
+        )
+    for key in (question_key(fresh), answer_key(old_answer), question_key(stale[0])):
+        await cache.set(key, b"{}")
+    subscription = broker.subscribe(question_key(stale[0]))
+
+    try:
+        await purge_expired(session_factory, answer_days=30, question_days=365, chunk_size=2, pause=0)
+
+        for key in (question_key(fresh), answer_key(old_answer), question_key(stale[0])):
+            assert await cache.get(key) is None
+        events = [(await subscription.get(timeout=1)).split("\n")[0] for _ in range(4)]
+    finally:
+        subscription.close()
+    assert events == ["answer.deleted"] * 3 + ["question.deleted"]
+
+
+@pytest.mark.anyio
+async def test_zero_days_keeps_everything(session_factory):
+    await seed(session_factory)
+
+    result = await purge_expired(session_factory, answer_days=0, question_days=0)
+
+    questions, _, texts = await state(session_factory)
+    assert len(questions) == 4 and len(texts) == 9
+    assert (result.answers, result.questions) == (0, 0)
+
+
+@pytest.mark.anyio
+async def test_interrupted_purge_resumes_from_checkpoint(session_factory, monkeypatch, tmp_path):
+    await seed(session_factory)
+    checkpoint = tmp_path / "purge.json"
+    save = retention.Checkpoint.save
+    saves = 0
+
+    def crash_after_two_chunks(self, path):
+        nonlocal saves
+        save(self, path)
+        saves += 1
+        if saves == 2:
+            raise RuntimeError("killed")
+
+    monkeypatch.setattr(retention.Checkpoint, "save", crash_after_two_chunks)
+    with pytest.raises(RuntimeError):
+        await purge_expired(session_factory, 30, 365, 2, 0, checkpoint_path=checkpoint)
+
+    saved = retention.Checkpoint.load(checkpoint)
+    assert (saved.phase, saved.answers) == ("answers", 4)
+
+    monkeypatch.setattr(retention.Checkpoint, "save", save)
+    result = await purge_expired(session_factory, 30, 365, 2, 0, checkpoint_path=checkpoint)
+
+    assert (result.answers, result.questions) == (7, 2)
+    assert not checkpoint.exists()
+    questions, truth, _ = await state(session_factory)
+    for question_id, (count, latest) in truth.items():
+        assert questions[question_id] == (count, latest)
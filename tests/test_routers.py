@@ -48,8 +48,39 @@ async def test_get_questions_returns_created_items(client):
     response = await client.get("/questions/")
     assert response.status_code == 200
     data = response.json()
-    assert len(data) == 2
-    assert {item["text"] for item in data} == {"Question A?", "Question B?"}
+    assert len(data["items"]) == 2
+    assert {item["text"] for item in data["items"]} == {"Question A?", "Question B?"}
+    assert data["next_cursor"] is None
+
+
+@pytest.mark.anyio
+async def test_get_questions_paginates_with_cursor(client):
+    for index in range(5):
+        await create_question(client, f"Paged question {index}?")
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get("/questions/", params=params)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) <= 2
+        seen.extend(item["text"] for item in data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [f"Paged question {index}?" for index in range(5)]
+
+
+@pytest.mark.anyio
+async def test_get_questions_rejects_invalid_cursor(client):
+    response = await client.get("/questions/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
 
 
 @pytest.mark.anyio
@@ -77,6 +108,25 @@ async def test_delete_question_removes_it(client):
     assert get_response.status_code == 404
 
 
+@pytest.mark.anyio
+async def test_delete_question_cascades_to_answers(client):
+    question = await create_question(client, "Cascade me?")
+    answer = await create_answer(client, question_id=question["id"])
+
+    delete_response = await client.delete(f"/questions/{question['id']}")
+    assert delete_response.status_code == 204
+
+    answer_response = await client.get(f"/answers/{answer['id']}")
+    assert answer_response.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_delete_missing_question_returns_404(client):
+    response = await client.delete("/questions/999")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Question with id 999 not found"
+
+
 @pytest.mark.anyio
 async def test_create_answer_requires_existing_question(client):
     non_existing_id = 999
@@ -102,3 +152,67 @@ async def test_answer_endpoints(client):
     get_after_delete = await client.get(f"/answers/{answer['id']}")
     assert get_after_delete.status_code == 404
 
+
+
+@pytest.mark.anyio
+async def test_create_questions_batch_reports_each_item(client):
+    await create_question(client, "Already asked?")
+
+    response = await client.post(
+        "/questions/batch",
+        json=[
+            {"text": "First batch question?"},
+            {"text": "Already asked?"},
+            {"text": "no"},
+            {"text": "First batch question?"},
+            {"text": "Second batch question?"},
+        ],
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["status"] for item in data] == [
+        "created",
+        "duplicate",
+        "invalid",
+        "duplicate",
+        "created",
+    ]
+    assert data[0]["question"]["text"] == "First batch question?"
+    assert data[2]["question"] is None
+
+    listed = (await client.get("/questions/")).json()["items"]
+    assert len(listed) == 3
+
+
+@pytest.mark.anyio
+async def test_create_answers_batch(client):
+    question = await create_question(client, "Batch answers?")
+    user_id = str(uuid.uuid4())
+
+    response = await client.post(
+        f"/questions/{question['id']}/answers/batch",
+        json=[
+            {"text": "One", "user_id": user_id},
+            {"text": "", "user_id": user_id},
+            {"text": "Two", "user_id": "not-a-uuid"},
+            {"text": "Three", "user_id": user_id},
+        ],
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["status"] for item in data] == ["created", "invalid", "invalid", "created"]
+    assert data[3]["answer"]["text"] == "Three"
+    assert data[3]["answer"]["question_id"] == question["id"]
+
+    detail = (await client.get(f"/questions/{question['id']}")).json()
+    assert [answer["text"] for answer in detail["answers"]] == ["One", "Three"]
+
+
+@pytest.mark.anyio
+async def test_create_answers_batch_requires_existing_question(client):
+    payload = [{"text": "Orphan", "user_id": str(uuid.uuid4())}]
+    response = await client.post("/questions/999/answers/batch", json=payload)
+
+    assert response.status_code == 404
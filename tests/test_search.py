@@ -0,0 +1,117 @@
+import base64
+import uuid
+
+import pytest
+
+from app.config import settings
+
+
+async def create_question(client, text, answers=()):
+    question = (await client.post("/questions/", json={"text": text})).json()
+    for answer in answers:
+        await client.post(
+            f"/questions/{question['id']}/answers/",
+            json={"text": answer, "user_id": str(uuid.uuid4())},
+        )
+    return question
+
+
+@pytest.mark.anyio
+async def test_search_ranks_question_matches_above_answer_matches(client):
+    in_answer = await create_question(
+        client, "How do I cook rice?", ["Use a pressure cooker for risotto"]
+    )
+    in_question = await create_question(client, "Which pressure cooker should I buy?")
+    await create_question(client, "Unrelated question here?")
+
+    response = await client.get("/questions/search", params={"q": "pressure cooker"})
+
+    assert response.status_code == 200
+    ids = [item["id"] for item in response.json()["items"]]
+    assert ids == [in_question["id"], in_answer["id"]]
+
+
+@pytest.mark.anyio
+async def test_search_returns_answer_snippets_on_request(client):
+    question = await create_question(
+        client,
+        "What is the best editor?",
+        ["Vim is the best editor for remote work", "Emacs, obviously"],
+    )
+
+    plain = await client.get("/questions/search", params={"q": "vim"})
+    with_answers = await client.get("/questions/search", params={"q": "vim", "answers": True})
+
+    assert plain.json()["items"][0]["answers"] == []
+    [item] = with_answers.json()["items"]
+    assert item["id"] == question["id"]
+    [snippet] = item["answers"]
+    assert "<mark>Vim</mark>" in snippet["snippet"]
+
+
+@pytest.mark.anyio
+async def test_search_pages_with_cursor(client):
+    for index in range(5):
+        await create_question(client, f"Paging search question number {index}?")
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"q": "paging", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = (await client.get("/questions/search", params=params)).json()
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+
+@pytest.mark.anyio
+async def test_search_forgets_deleted_questions_and_answers(client):
+    question = await create_question(
+        client, "Where do penguins live?", ["Penguins live in Antarctica"]
+    )
+
+    await client.delete(f"/questions/{question['id']}")
+
+    for q in ("penguins", "antarctica"):
+        response = await client.get("/questions/search", params={"q": q})
+        assert response.json()["items"] == []
+
+
+@pytest.mark.anyio
+async def test_search_treats_query_syntax_as_text(client):
+    await create_question(client, "Is NEAR a keyword?")
+
+    punctuation = await client.get("/questions/search", params={"q": '"*)(-'})
+    keyword = await client.get("/questions/search", params={"q": "NEAR keyword"})
+
+    assert punctuation.status_code == 200
+    assert punctuation.json()["items"] == []
+    assert len(keyword.json()["items"]) == 1
+
+
+@pytest.mark.anyio
+async def test_search_rejects_foreign_cursor(client):
+    keyset = base64.urlsafe_b64encode(b"2026-01-01T00:00:00|1").decode()
+
+    response = await client.get("/questions/search", params={"q": "x", "cursor": keyset})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_search_ranks_only_the_capped_candidates(client, monkeypatch):
+    monkeypatch.setattr(settings, "search_candidates_max", 2)
+    for index in range(4):
+        await create_question(client, f"Kettle question {index}?", ["Unrelated answer"])
+    await create_question(client, "Tea question?", ["Boil it in a kettle"])
+
+    response = await client.get("/questions/search", params={"q": "kettle"})
+
+    # Two of the question matches plus the one answer match.
+    assert len(response.json()["items"]) == 3
@@ -0,0 +1,68 @@
+import uuid
+
+import pytest
+
+from app.backend.cache import cache
+from app.config import settings
+from app.routers.serialization import (
+    AnswerRow,
+    QuestionListRow,
+    QuestionPageRow,
+    QuestionWithAnswersRow,
+)
+from app.schemas import AnswerResponse, QuestionListItem, QuestionPage, QuestionWithAnswers
+
+
+@pytest.mark.parametrize(
+    "row, schema",
+    [
+        (AnswerRow, AnswerResponse),
+        (QuestionListRow, QuestionListItem),
+        (QuestionPageRow, QuestionPage),
+        (QuestionWithAnswersRow, QuestionWithAnswers),
+    ],
+)
+@pytest.mark.anyio
+async def test_rows_mirror_the_schemas(row, schema):
+    assert list(row.__annotations__) == list(schema.model_fields)
+
+
+async def read_all(client, question_id, answer_id):
+    await cache.clear()
+    return [
+        (await client.get(url)).content
+        for url in (
+            "/questions/?limit=2",
+            f"/questions/{question_id}",
+            f"/answers/{answer_id}",
+        )
+    ]
+
+
+@pytest.mark.anyio
+async def test_fast_json_matches_validated_output(client, monkeypatch, sql_statements):
+    question = (await client.post("/questions/", json={"text": "Serialized «question»?"})).json()
+    await client.post("/questions/", json={"text": "Answerless question?"})
+    for index in range(3):
+        answer = (
+            await client.post(
+                f"/questions/{question['id']}/answers/",
+                json={"text": f"Answer «{index}»", "user_id": str(uuid.uuid4())},
+            )
+        ).json()
+
+    validated = await read_all(client, question["id"], answer["id"])
+    sql_statements.clear()
+    monkeypatch.setattr(settings, "fast_json_enabled", True)
+    fast = await read_all(client, question["id"], answer["id"])
+
+    assert fast == validated
+    assert len(sql_statements) == 1 + 2 + 1
+
+
+@pytest.mark.anyio
+async def test_fast_json_keeps_not_found(client, monkeypatch):
+    monkeypatch.setattr(settings, "fast_json_enabled", True)
+
+    assert (await client.get("/questions/12345")).status_code == 404
+    assert (await client.get("/answers/12345")).status_code == 404
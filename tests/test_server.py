@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from app import server
+from app.config import settings
+
+
+@pytest.mark.anyio
+async def test_options_come_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "server_workers", 3)
+    monkeypatch.setattr(settings, "server_loop", "asyncio")
+    monkeypatch.setattr(settings, "server_http", "h11")
+    monkeypatch.setattr(settings, "server_max_requests", 10_000)
+
+    options = server.uvicorn_options()
+
+    assert options["workers"] == 3
+    assert options["loop"] == "asyncio"
+    assert options["http"] == "h11"
+    assert options["limit_max_requests"] == 10_000
+    assert options["timeout_graceful_shutdown"] >= settings.shutdown_drain_seconds
+
+
+@pytest.mark.anyio
+async def test_workers_default_to_available_cpus(monkeypatch):
+    monkeypatch.setattr(settings, "server_workers", 0)
+    monkeypatch.setattr(settings, "server_max_requests", 0)
+
+    options = server.uvicorn_options()
+
+    assert options["workers"] == len(os.sched_getaffinity(0))
+    assert options["limit_max_requests"] is None
+
+
+@pytest.mark.anyio
+async def test_process_local_backends_are_reported(monkeypatch):
+    monkeypatch.setattr(settings, "event_broker", "memory")
+    monkeypatch.setattr(settings, "cache_enabled", True)
+    monkeypatch.setattr(settings, "idempotency_enabled", True)
+    monkeypatch.setattr(settings, "idempotency_store", "memory")
+
+    assert len(server.process_local_backends()) == 3
+
+    monkeypatch.setattr(settings, "event_broker", "postgres")
+    monkeypatch.setattr(settings, "idempotency_store", "database")
+
+    assert server.process_local_backends() == []
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "setting, value, named",
+    [("event_broker", "memory", "EVENT_BROKER"), ("idempotency_store", "memory", "IDEMPOTENCY_STORE")],
+)
+async def test_process_local_backends_refuse_several_workers(monkeypatch, setting, value, named):
+    monkeypatch.setattr(settings, "server_workers", 2)
+    monkeypatch.setattr(settings, "cache_enabled", True)
+    monkeypatch.setattr(settings, "idempotency_enabled", True)
+    monkeypatch.setattr(settings, "event_broker", "postgres")
+    monkeypatch.setattr(settings, "idempotency_store", "database")
+    monkeypatch.setattr(settings, setting, value)
+    monkeypatch.setattr(server.uvicorn, "run", lambda *args, **kwargs: pytest.fail("server started"))
+
+    with pytest.raises(SystemExit, match=named):
+        server.main()
+
+
+@pytest.mark.anyio
+async def test_shared_backends_start_several_workers(monkeypatch):
+    monkeypatch.setattr(settings, "server_workers", 2)
+    monkeypatch.setattr(settings, "metrics_dir", "/tmp")
+    monkeypatch.setattr(settings, "event_broker", "postgres")
+    monkeypatch.setattr(settings, "idempotency_store", "database")
+    started = []
+    monkeypatch.setattr(server.uvicorn, "run", lambda *args, **kwargs: started.append(kwargs["workers"]))
+
+    server.main()
+
+    assert started == [2]
@@ -0,0 +1,60 @@
+import logging
+import re
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.middleware.timing import RequestTimings, current_timings
+
+
+def timing_entries(response):
+    header = response.headers["server-timing"]
+    return {
+        match.group(1): (float(match.group(2)), match.group(3))
+        for match in re.finditer(r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?', header)
+    }
+
+
+@pytest.mark.anyio
+async def test_server_timing_header_counts_queries(client):
+    question = (await client.post("/questions/", json={"text": "Timed question?"})).json()
+
+    response = await client.get(f"/questions/{question['id']}")
+
+    entries = timing_entries(response)
+    assert set(entries) == {"db", "endpoint", "serialize", "handler", "total"}
+    assert entries["db"][1] == "2 queries"
+    assert entries["total"][0] >= entries["handler"][0] >= entries["endpoint"][0]
+
+
+@pytest.mark.anyio
+async def test_server_timing_measures_response_model_serialization(client):
+    await client.post("/questions/", json={"text": "Serialized question?"})
+
+    response = await client.get("/questions/")
+
+    entries = timing_entries(response)
+    assert entries["db"][1] == "1 queries"
+    assert entries["serialize"][0] > 0
+
+
+@pytest.mark.anyio
+async def test_timing_log_line_uses_route_template(client, caplog):
+    with caplog.at_level(logging.INFO, logger="app.timing"):
+        await client.get("/questions/12345")
+
+    assert "route=/questions/{question_id} status=404" in caplog.text
+
+
+@pytest.mark.anyio
+async def test_failed_query_leaves_no_start_time_behind(engine):
+    token = current_timings.set(RequestTimings(started=0.0))
+    try:
+        async with engine.connect() as connection:
+            with pytest.raises(OperationalError):
+                await connection.execute(text("SELECT * FROM no_such_table"))
+            raw = await connection.get_raw_connection()
+            assert not raw.info.get("query_started")
+    finally:
+        current_timings.reset(token)